@@ -1,9 +1,11 @@
 from django.contrib import admin
 from .models.comment import Comment
-from .models.post import Post, Category
+from .models.post import Post, PostContent, Category
 from .models.user import Role
 from .models.views import View
 from .models.repost_request import RepostRequest
+from .models.task import Task
+from .models.follow import Follow
 
 
 class RoleAdmin(admin.ModelAdmin):
@@ -11,10 +13,16 @@ class RoleAdmin(admin.ModelAdmin):
     list_filter = ('is_blogger', 'is_moderator', 'is_admin')
 
 
+class PostContentInline(admin.StackedInline):
+    model = PostContent
+    can_delete = False
+
+
 class PostAdmin(admin.ModelAdmin):
+    inlines = [PostContentInline]
     list_display = ('id', 'title', 'user_id','get_categories', 'created_at', 'last_updated', 'status')
     list_filter = ('category__category_name', 'status')
-    search_fields = ('title', 'body', 'description')
+    search_fields = ('title', 'content__body', 'description')
 
     def get_categories(self, obj):
         return ", ".join([category.category_name for category in obj.category.all()])
@@ -33,9 +41,20 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'post_id_id', 'author', 'created_at', 'parent_id')
 
 
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('id', 'follower', 'author', 'created_at')
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+
+
 admin.site.register(View)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(RepostRequest, RepostRequestAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Role, RoleAdmin)
 admin.site.register(Post, PostAdmin)
+admin.site.register(Task, TaskAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class NotABoringBlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'not_a_boring_blog'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .db.sqlite import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='not_a_boring_blog.sqlite_pragmas')
+        if settings.METRICS_ENABLED:
+            from .middleware.metrics import install_query_counter
+
+            connection_created.connect(install_query_counter, dispatch_uid='not_a_boring_blog.query_counter')
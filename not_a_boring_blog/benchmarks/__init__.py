@@ -0,0 +1 @@
+"""Performance benchmarks, run them with `python manage.py benchmark --help`."""
@@ -0,0 +1,40 @@
+"""Size and time to last byte of a big PostSerializer response, uncompressed and per encoding.
+
+The response is rendered once; every encoding the middleware can use compresses the same bytes.
+The time to last byte is the compression time plus the transfer time of the compressed body
+over a link of the given bandwidth (the default, 1.6 Mbit/s, is a slow mobile connection).
+"""
+from ..middleware.compression import ENCODERS, available_encodings
+from ..models.post import Post
+from ..renderers import FastJSONRenderer
+from ..serializers.fast import fast_data
+from ..serializers.posts import PostSerializer
+from .rendering import timed
+
+
+class CompressionBenchmark:
+    def __init__(self, posts=1000, iterations=10, bandwidth_mbps=1.6):
+        self.posts = posts
+        self.iterations = iterations
+        self.bandwidth_mbps = bandwidth_mbps
+
+    def transfer_ms(self, size):
+        return size * 8 / (self.bandwidth_mbps * 1000)
+
+    def run(self):
+        posts = PostSerializer.setup_eager_loading(Post.objects.filter(status='published'))[:self.posts]
+        content = FastJSONRenderer().render(fast_data(PostSerializer, posts))
+        encodings = {
+            'identity': {'bytes': len(content), 'compress_ms': None, 'time_to_last_byte_ms': self.transfer_ms(len(content))},
+        }
+        for name in available_encodings(ENCODERS):
+            encoder = ENCODERS[name]
+            size = len(encoder.compress(content))
+            compress_ms = timed(lambda: encoder.compress(content), self.iterations)
+            encodings[name] = {
+                'bytes': size,
+                'ratio': len(content) / size,
+                'compress_ms': compress_ms,
+                'time_to_last_byte_ms': compress_ms['p50'] + self.transfer_ms(size),
+            }
+        return {'posts': len(posts), 'bandwidth_mbps': self.bandwidth_mbps, 'encodings': encodings}
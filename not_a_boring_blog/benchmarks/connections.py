@@ -0,0 +1,90 @@
+"""Connect overhead on the request path.
+
+The requests go through the WSGI handler rather than the test client: the client keeps the
+connection open, the handler closes it at request_finished the way gunicorn does, depending on
+CONN_MAX_AGE. Every mode runs the same requests, only the connection handling differs.
+"""
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from .endpoints import summarize
+
+
+class ConnectionBenchmark:
+    def __init__(self, path, requests=200, warmup=5):
+        self.path = path
+        self.requests = requests
+        self.warmup = warmup
+        self.handler = WSGIHandler()
+        self.connects = 0
+
+    def count_connect(self, sender, connection, **kwargs):
+        self.connects += 1
+
+    def request(self):
+        environ = {'PATH_INFO': self.path, 'REQUEST_METHOD': 'GET', 'wsgi.input': BytesIO()}
+        setup_testing_defaults(environ)
+        statuses = []
+        response = self.handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()  # sends request_finished, which closes the connection or keeps it
+        return statuses[0]
+
+    def time_connect(self):
+        """Milliseconds of opening a connection alone, min/mean/percentiles over the warmup count"""
+        durations = []
+        for _ in range(max(self.warmup, 5)):
+            connection.close()
+            start = time.perf_counter()
+            connection.ensure_connection()
+            durations.append((time.perf_counter() - start) * 1000)
+        connection.close()
+        return summarize(durations)
+
+    def run_mode(self, name, conn_max_age):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        for _ in range(self.warmup):
+            self.request()
+        self.connects = 0
+        latencies, statuses = [], set()
+        connection_created.connect(self.count_connect)
+        try:
+            for _ in range(self.requests):
+                start = time.perf_counter()
+                statuses.add(self.request())
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(self.count_connect)
+        return {
+            'mode': name,
+            'conn_max_age': conn_max_age,
+            'status': sorted(statuses),
+            'requests': self.requests,
+            # with the pool backend a connect is a checkout from the pool
+            'connects': self.connects,
+            'latency_ms': summarize(latencies),
+        }
+
+    def run(self, persistent_max_age=60):
+        original = connection.settings_dict['CONN_MAX_AGE']
+        try:
+            return {
+                'engine': connection.settings_dict['ENGINE'],
+                'connect_ms': self.time_connect(),
+                'modes': [
+                    self.run_mode('per-request', 0),
+                    self.run_mode('persistent', persistent_max_age),
+                ],
+            }
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original
@@ -0,0 +1,192 @@
+"""Seeded synthetic data for the benchmarks.
+
+Every row gets an explicit primary key (1..N per table), so relations are built without reading
+anything back from the database and millions of rows can be streamed in batches. The sequences are
+reset at the end, the endpoints can insert rows afterwards.
+"""
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from ..models.comment import Comment
+from ..models.post import Category, Post, PostContent
+from ..models.repost_request import RepostRequest
+from ..models.user import Role
+from ..models.views import View
+from ..reading_time import count_words, reading_minutes
+
+DEFAULT_SCALE = {
+    'users': 100,
+    'categories': 20,
+    'posts': 1000,
+    'comments': 5000,
+    'repost_requests': 500,
+    'views': 10000,
+}
+BENCHMARK_PASSWORD = 'benchmark-password'
+BATCH_SIZE = 2000
+POST_STATUS = ['published'] * 8 + ['private', 'editing']
+REQUEST_STATUS = ['requested', 'requested', 'approved', 'denied']
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class DataGenerator:
+    """Creates users with roles, categorized posts, comment trees, repost requests and views.
+
+    The same seed and scale always produce the same rows.
+    """
+
+    def __init__(self, seed=42, body_words=300, **scale):
+        self.seed = seed
+        self.body_words = body_words
+        self.scale = {**DEFAULT_SCALE, **{key: value for key, value in scale.items() if value is not None}}
+        self.rng = random.Random(seed)
+        self.vocabulary = [self._word() for _ in range(2000)]
+
+    def _word(self):
+        return ''.join(self.rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(self.rng.randint(2, 10)))
+
+    def _text(self, words):
+        return ' '.join(self.rng.choices(self.vocabulary, k=words))
+
+    def generate(self):
+        """Writes all rows, returns the number of rows per table"""
+        counts = {}
+        with transaction.atomic():
+            counts['users'] = self._insert(User, self._users())
+            counts['roles'] = self._insert(Role, self._roles())
+            counts['categories'] = self._insert(Category, self._categories())
+            counts['posts'] = self._insert_posts()
+            counts['post_categories'] = self._insert(Post.category.through, self._post_categories())
+            counts['comments'] = self._insert(Comment, self._comments())
+            counts['repost_requests'] = self._insert(RepostRequest, self._repost_requests())
+            counts['views'] = self._insert(View, self._views())
+            self._reset_sequences()
+        return counts
+
+    def _insert(self, model, rows):
+        total = 0
+        for batch in batched(rows):
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        return total
+
+    def _insert_posts(self):
+        # bulk_create skips Post.save, the bodies go to their own table right after the posts
+        total = 0
+        for batch in batched(self._posts()):
+            Post.objects.bulk_create([post for post, _ in batch])
+            PostContent.objects.bulk_create([content for _, content in batch])
+            total += len(batch)
+        return total
+
+    def _reset_sequences(self):
+        models = [User, Role, Category, Post, Post.category.through, Comment, RepostRequest, View]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _users(self):
+        # hashing is slow on purpose, all the generated users share one hash
+        password = make_password(BENCHMARK_PASSWORD)
+        for user_id in range(1, self.scale['users'] + 1):
+            yield User(id=user_id, username=f'user{user_id}', email=f'user{user_id}@example.com', password=password)
+
+    def _roles(self):
+        for user_id in range(1, self.scale['users'] + 1):
+            kind = self.rng.random()
+            yield Role(
+                id=user_id,
+                user_id=user_id,
+                is_admin=kind < 0.01,
+                is_moderator=0.01 <= kind < 0.05,
+                is_blogger=kind >= 0.05,
+                bio=self._text(self.rng.randint(5, 30)),
+            )
+
+    def _categories(self):
+        for category_id in range(1, self.scale['categories'] + 1):
+            name = f'Category {category_id}'
+            # bulk_create skips Category.save, the lookup key is set here
+            yield Category(id=category_id, category_name=name, category_key=Category.normalize_name(name))
+
+    def _posts(self):
+        for post_id in range(1, self.scale['posts'] + 1):
+            words = max(1, int(self.rng.gauss(self.body_words, self.body_words / 3)))
+            # the body comes second, the same seed keeps giving the same rows
+            title = self._text(self.rng.randint(3, 10))[:255]
+            body = f'{post_id} {self._text(words)}'
+            post = Post(
+                id=post_id,
+                title=title,
+                user_id_id=self.rng.randint(1, self.scale['users']),
+                status=self.rng.choice(POST_STATUS),
+                min_read=reading_minutes(count_words(body)),
+                description=self._text(self.rng.randint(5, 25))[:200],
+            )
+            yield post, PostContent(post_id=post_id, body=body)
+
+    def _post_categories(self):
+        through = Post.category.through
+        link_id = 0
+        for post_id in range(1, self.scale['posts'] + 1):
+            for category_id in self.rng.sample(range(1, self.scale['categories'] + 1), k=min(3, self.scale['categories'], self.rng.randint(1, 3))):
+                link_id += 1
+                yield through(id=link_id, post_id=post_id, category_id=category_id)
+
+    def _comments(self):
+        # a reply points to one of the recent top level comments and lands on the same post,
+        # which keeps memory flat however many comments are generated
+        recent_top_level = []
+        for comment_id in range(1, self.scale['comments'] + 1):
+            if recent_top_level and self.rng.random() < 0.4:
+                parent_id, post_id = self.rng.choice(recent_top_level)
+            else:
+                parent_id, post_id = None, self.rng.randint(1, self.scale['posts'])
+                recent_top_level.append((comment_id, post_id))
+                if len(recent_top_level) > 1000:
+                    recent_top_level.pop(0)
+            yield Comment(
+                id=comment_id,
+                post_id_id=post_id,
+                parent_id_id=parent_id,
+                author_id=self.rng.randint(1, self.scale['users']),
+                body=self._text(self.rng.randint(3, 60))[:500],
+            )
+
+    def _repost_requests(self):
+        # request k goes to post k % posts, by a requester that differs on every round over the posts,
+        # (requester, post) stays unique as long as there are fewer rounds than users
+        posts, users = self.scale['posts'], self.scale['users']
+        total = min(self.scale['repost_requests'], posts * users)
+        for request_id in range(1, total + 1):
+            post_id = (request_id - 1) % posts + 1
+            requester_id = ((request_id - 1) // posts + post_id) % users + 1
+            yield RepostRequest(
+                id=request_id,
+                requester_id_id=requester_id,
+                post_id_id=post_id,
+                status=self.rng.choice(REQUEST_STATUS),
+            )
+
+    def _views(self):
+        for view_id in range(1, self.scale['views'] + 1):
+            yield View(
+                id=view_id,
+                post_id_id=self.rng.randint(1, self.scale['posts']),
+                user_id_id=self.rng.randint(1, self.scale['users']),
+            )
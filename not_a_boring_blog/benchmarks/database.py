@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def test_database(name=None, keepdb=False):
+    """Runs the benchmark in a test database, the real one is never written to"""
+    if name:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = name
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
@@ -0,0 +1,270 @@
+"""Times every endpoint of not_a_boring_blog/urls.py through the Django test client.
+
+Each call runs in a transaction that is rolled back, so writes (create, update, delete, logout)
+can be repeated on the same fixtures and every iteration measures the same work.
+"""
+import json
+import math
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from .. import urls
+from ..models.comment import Comment
+from ..models.follow import Follow
+from ..models.post import Category, Post
+from ..models.repost_request import RepostRequest
+from ..models.timeline import TimelineEntry
+from ..models.user import Role
+from ..models.views import View
+from .data import BENCHMARK_PASSWORD
+
+
+class Rollback(Exception):
+    pass
+
+
+class Scenario:
+    """One request to time: method, who sends it, url kwargs and body.
+
+    kwargs and data are callables taking the BenchmarkFixtures.
+    """
+
+    def __init__(self, method, user=None, kwargs=None, data=None, query=None):
+        self.method = method
+        self.user = user
+        self.kwargs = kwargs or (lambda fx: {})
+        self.data = data
+        self.query = query
+
+
+class BenchmarkFixtures:
+    """Dedicated users, post, comment and repost request the scenarios point at"""
+
+    def create(self):
+        password = make_password(BENCHMARK_PASSWORD)
+        self.users = {}
+        self.tokens = {}
+        for name, role in [
+            ('admin', {'is_admin': True}),
+            ('moderator', {'is_moderator': True}),
+            ('author', {'is_blogger': True}),
+            ('reader', {'is_blogger': True}),
+        ]:
+            user = User.objects.create(username=f'bench_{name}', email=f'bench_{name}@example.com', password=password)
+            Role.objects.create(user=user, bio=f'Benchmark {name}', **role)
+            self.users[name] = user
+            self.tokens[name] = Token.objects.create(user=user).key
+
+        self.category = Category.objects.create(category_name='Benchmark Category')
+        self.other_category = Category.objects.create(category_name='Benchmark Other Category')
+        self.post = Post.objects.create(
+            title='Benchmark post',
+            body='Benchmark post body',
+            user_id=self.users['author'],
+            status='published',
+            description='Benchmark post description',
+        )
+        self.post.category.add(self.category)
+        self.comment = Comment.objects.create(post_id=self.post, author=self.users['reader'], body='Benchmark comment')
+        Comment.objects.create(
+            post_id=self.post, author=self.users['author'], body='Benchmark reply', parent_id=self.comment
+        )
+        self.repost_request = RepostRequest.objects.create(
+            requester_id=self.users['reader'], post_id=self.post, status='requested'
+        )
+        View.objects.create(post_id=self.post, user_id=self.users['moderator'])
+        Follow.objects.create(follower=self.users['reader'], author=self.users['author'])
+        TimelineEntry.objects.create(user=self.users['reader'], post=self.post, created_at=self.post.created_at)
+        return self
+
+
+def post_body(fx):
+    return {
+        'title': 'Benchmark new post',
+        'category': [fx.category.id],
+        'status': 'published',
+        'description': 'Benchmark new description',
+        'body': 'Benchmark new unique body',
+    }
+
+
+# url name -> scenarios, an url that accepts several methods has one scenario per method
+SCENARIOS = {
+    'create_category': [Scenario('post', 'author', data=lambda fx: {'category_name': 'Benchmark New Category'})],
+    'list_categories': [Scenario('get')],
+    'category_posts': [Scenario('get', kwargs=lambda fx: {'category_name': 'category 1'})],
+    'recategorize_posts': [Scenario('put', 'moderator', data=lambda fx: {
+        'from_category': fx.category.id, 'to_category': fx.other_category.id})],
+    'post-list': [Scenario('get', 'admin')],
+    'post-detail': [
+        Scenario('get', kwargs=lambda fx: {'pk': fx.post.id}),
+        Scenario('put', 'author', kwargs=lambda fx: {'pk': fx.post.id}, data=post_body),
+        Scenario('delete', 'author', kwargs=lambda fx: {'pk': fx.post.id}),
+    ],
+    'post-create': [Scenario('post', 'author', data=post_body)],
+    'get-public-posts': [Scenario('get')],
+    'only-user-posts': [Scenario('get', kwargs=lambda fx: {'username': 'user1'})],
+    'my-posts': [Scenario('get', 'author')],
+    'timeline': [Scenario('get', 'reader')],
+    'hide-post': [Scenario('put', 'moderator', kwargs=lambda fx: {'pk': fx.post.id}, data=lambda fx: {'status': 'editing'})],
+    'comments': [Scenario('get', kwargs=lambda fx: {'post_id': fx.post.id})],
+    'create_comment': [Scenario('post', 'reader', kwargs=lambda fx: {'post_id': fx.post.id},
+                                data=lambda fx: {'body': 'Benchmark new comment'})],
+    'create_reply': [Scenario('post', 'reader', kwargs=lambda fx: {'comment_id': fx.comment.id},
+                              data=lambda fx: {'body': 'Benchmark new reply'})],
+    'update_comment': [
+        Scenario('get', 'reader', kwargs=lambda fx: {'comment_id': fx.comment.id}),
+        Scenario('put', 'reader', kwargs=lambda fx: {'comment_id': fx.comment.id},
+                 data=lambda fx: {'body': 'Benchmark updated comment'}),
+        Scenario('delete', 'reader', kwargs=lambda fx: {'comment_id': fx.comment.id}),
+    ],
+    'moderator_rm_comment': [Scenario('delete', 'moderator', kwargs=lambda fx: {'comment_id': fx.comment.id})],
+    'change_password': [Scenario('put', 'reader', data=lambda fx: {
+        'current_password': BENCHMARK_PASSWORD, 'new_password': 'new-password', 'confirm_password': 'new-password'})],
+    'update_role': [Scenario('put', 'admin', kwargs=lambda fx: {'username': 'bench_reader'},
+                             data=lambda fx: {'role': {'is_moderator': True}})],
+    'users_list': [Scenario('get')],
+    'register': [Scenario('post', data=lambda fx: {
+        'username': 'bench_new_user', 'email': 'bench_new_user@example.com', 'password': 'password'})],
+    'update_user': [Scenario('put', 'reader', data=lambda fx: {'email': 'bench_reader_new@example.com'})],
+    'update_bio': [
+        Scenario('get', 'reader'),
+        Scenario('put', 'reader', data=lambda fx: {'bio': 'Benchmark updated bio'}),
+    ],
+    'login': [Scenario('post', data=lambda fx: {'username': 'bench_reader', 'password': BENCHMARK_PASSWORD})],
+    'logout': [Scenario('get', 'reader')],
+    'follow': [
+        Scenario('post', 'moderator', kwargs=lambda fx: {'username': 'bench_author'}),
+        Scenario('delete', 'reader', kwargs=lambda fx: {'username': 'bench_author'}),
+    ],
+    'request_repost': [Scenario('post', 'moderator', kwargs=lambda fx: {'post_id': fx.post.id})],
+    'requests_received': [Scenario('get', 'author')],
+    'requests_sent': [Scenario('get', 'reader')],
+    'request_update': [Scenario('put', 'author', kwargs=lambda fx: {'request_id': fx.repost_request.id},
+                                data=lambda fx: {'status': 'approved'})],
+    'bulk_request_update': [Scenario('put', 'author', data=lambda fx: {'status': 'approved', 'post_id': fx.post.id})],
+    'delete_repost_request': [Scenario('delete', 'reader', kwargs=lambda fx: {'request_id': fx.repost_request.id})],
+    'create_post_view': [Scenario('post', 'reader', kwargs=lambda fx: {'post_id': fx.post.id})],
+    'post_views': [Scenario('get', kwargs=lambda fx: {'post_id': fx.post.id})],
+    'async-list-categories': [Scenario('get')],
+    'async-post-detail': [Scenario('get', kwargs=lambda fx: {'pk': fx.post.id})],
+    'async-public-posts': [Scenario('get')],
+    'async-comments': [Scenario('get', kwargs=lambda fx: {'post_id': fx.post.id})],
+    'async-post-views': [Scenario('get', kwargs=lambda fx: {'post_id': fx.post.id})],
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(values):
+    values = sorted(values)
+    return {
+        'min': values[0],
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p90': percentile(values, 0.90),
+        'p99': percentile(values, 0.99),
+        'max': values[-1],
+    }
+
+
+class EndpointBenchmark:
+    def __init__(self, fixtures, iterations=20, warmup=2, only=None):
+        self.fixtures = fixtures
+        self.iterations = iterations
+        self.warmup = warmup
+        self.only = only
+        self.client = Client()
+
+    def url_names(self):
+        return [pattern.name for pattern in urls.urlpatterns if pattern.name]
+
+    def request(self, scenario, path):
+        # login hands out a session cookie, the scenarios authenticate with the token only
+        self.client.cookies.clear()
+        headers = {}
+        if scenario.user:
+            headers['HTTP_AUTHORIZATION'] = f'Token {self.fixtures.tokens[scenario.user]}'
+        data = scenario.data(self.fixtures) if scenario.data else None
+        if scenario.method == 'get':
+            return self.client.get(path, scenario.query, **headers)
+        return getattr(self.client, scenario.method)(
+            path, data=json.dumps(data) if data is not None else None, content_type='application/json', **headers
+        )
+
+    def time_once(self, scenario, path):
+        # the query log is capped, an emptied log keeps the captured count right
+        connection.queries_log.clear()
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = self.request(scenario, path)
+                    elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        return elapsed * 1000, len(queries), response.status_code
+
+    def run_scenario(self, name, scenario):
+        path = reverse(f'{urls.app_name}:{name}', kwargs=scenario.kwargs(self.fixtures))
+        for _ in range(self.warmup):
+            self.time_once(scenario, path)
+        latencies, query_counts, statuses = [], [], set()
+        for _ in range(self.iterations):
+            latency, query_count, status_code = self.time_once(scenario, path)
+            latencies.append(latency)
+            query_counts.append(query_count)
+            statuses.add(status_code)
+        return {
+            'name': name,
+            'method': scenario.method.upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'iterations': self.iterations,
+            'latency_ms': summarize(latencies),
+            'queries': summarize(query_counts),
+        }
+
+    def run(self):
+        results, missing = [], []
+        for name in self.url_names():
+            if self.only and name not in self.only:
+                continue
+            scenarios = SCENARIOS.get(name)
+            if not scenarios:
+                missing.append(name)
+                continue
+            for scenario in scenarios:
+                results.append(self.run_scenario(name, scenario))
+        return results, missing
+
+
+def compare(previous, current):
+    """Yields (endpoint, previous p50, current p50, ratio, previous queries, current queries)"""
+    old = {(r['name'], r['method']): r for r in previous['endpoints']}
+    for result in current['endpoints']:
+        before = old.get((result['name'], result['method']))
+        if before is None:
+            continue
+        old_p50 = before['latency_ms']['p50']
+        new_p50 = result['latency_ms']['p50']
+        yield (
+            f"{result['method']} {result['name']}",
+            old_p50,
+            new_p50,
+            new_p50 / old_p50 if old_p50 else float('inf'),
+            before['queries']['max'],
+            result['queries']['max'],
+        )
@@ -0,0 +1,67 @@
+"""Serializing, encoding and decoding time of a big PostSerializer response, DRF against ours.
+
+Serializing times PostSerializer(posts, many=True).data against fast_data on the same loaded
+posts. The posts are then serialized once, every iteration renders the same data (and parses
+the same bytes), so only the JSON library differs between those timings.
+"""
+import time
+from io import BytesIO
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ..models.post import Post
+from ..parsers import FastJSONParser
+from ..renderers import FastJSONRenderer, orjson
+from ..serializers.fast import fast_data
+from ..serializers.posts import PostSerializer
+from .endpoints import summarize
+
+
+def timed(function, iterations):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return summarize(durations)
+
+
+class RenderingBenchmark:
+    def __init__(self, posts=1000, iterations=20):
+        self.posts = posts
+        self.iterations = iterations
+
+    def run(self):
+        posts = list(PostSerializer.setup_eager_loading(Post.objects.filter(status='published'))[:self.posts])
+        data = PostSerializer(posts, many=True).data
+        serializers = {
+            'drf': timed(lambda: PostSerializer(posts, many=True).data, self.iterations),
+            'fast': timed(lambda: fast_data(PostSerializer, posts), self.iterations),
+        }
+
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        if fast.render(fast_data(PostSerializer, posts)) != stdlib.render(data):
+            raise AssertionError('fast_data output differs from PostSerializer.data')
+        content = stdlib.render(data)
+        if fast.render(data) != content:
+            raise AssertionError('FastJSONRenderer output differs from JSONRenderer')
+        renderers = {
+            'json': timed(lambda: stdlib.render(data), self.iterations),
+            'fast': timed(lambda: fast.render(data), self.iterations),
+        }
+        parsers = {
+            'json': timed(lambda: JSONParser().parse(BytesIO(content)), self.iterations),
+            'fast': timed(lambda: FastJSONParser().parse(BytesIO(content)), self.iterations),
+        }
+        return {
+            'posts': len(data),
+            'bytes': len(content),
+            'orjson': orjson.__version__ if orjson else None,
+            'serialize_ms': serializers,
+            'render_ms': renderers,
+            'parse_ms': parsers,
+            'serialize_speedup': serializers['drf']['p50'] / serializers['fast']['p50'],
+            'render_speedup': renderers['json']['p50'] / renderers['fast']['p50'],
+            'parse_speedup': parsers['json']['p50'] / parsers['fast']['p50'],
+        }
@@ -0,0 +1,109 @@
+"""Concurrent readers and writers on one SQLite file, with SQLite's defaults and with SQLITE_PRAGMAS.
+
+Writer threads record post views (the create_post_view insert), reader threads run the
+get_post_views count and a page of published posts. Every thread has its own connection, the
+way the threads of a gunicorn worker do. The database has to be a file: an in-memory one has
+no journal and a single connection.
+"""
+import threading
+import time
+
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+
+from ..models.post import Post
+from ..models.views import View
+from .endpoints import summarize
+
+# SQLite's own defaults, journal_mode is set explicitly since WAL stays on the file once set
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Worker(threading.Thread):
+    def __init__(self, operation, start_barrier, stop):
+        super().__init__(daemon=True)
+        self.operation = operation
+        self.start_barrier = start_barrier
+        self.stop = stop
+        self.latencies = []
+        self.errors = []
+
+    def run(self):
+        try:
+            self.start_barrier.wait()
+            while not self.stop.is_set():
+                start = time.perf_counter()
+                try:
+                    self.operation()
+                except OperationalError as error:  # "database is locked"
+                    self.errors.append(str(error))
+                else:
+                    self.latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+
+class SQLiteLoadBenchmark:
+    def __init__(self, post, user, readers=4, writers=2, duration=5):
+        self.post = post
+        self.user = user
+        self.readers = readers
+        self.writers = writers
+        self.duration = duration
+
+    def write(self):
+        View.objects.create(post_id=self.post, user_id=self.user)
+
+    def read(self):
+        View.objects.filter(post_id=self.post.id).count()
+        list(Post.objects.filter(status='published').order_by('-created_at')[:10])
+
+    def run_mode(self, name, pragmas):
+        connection.close()
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            # the journal mode can only change while no other connection is open
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            start_barrier = threading.Barrier(self.readers + self.writers + 1)
+            stop = threading.Event()
+            readers = [Worker(self.read, start_barrier, stop) for _ in range(self.readers)]
+            writers = [Worker(self.write, start_barrier, stop) for _ in range(self.writers)]
+            for worker in readers + writers:
+                worker.start()
+            start_barrier.wait()
+            time.sleep(self.duration)
+            stop.set()
+            for worker in readers + writers:
+                worker.join()
+        connection.close()
+        return {
+            'mode': name,
+            'journal_mode': journal_mode,
+            'reads': self.report(readers),
+            'writes': self.report(writers),
+        }
+
+    def report(self, workers):
+        latencies = [latency for worker in workers for latency in worker.latencies]
+        errors = [error for worker in workers for error in worker.errors]
+        return {
+            'threads': len(workers),
+            'operations': len(latencies),
+            'per_second': round(len(latencies) / self.duration, 1),
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+            'latency_ms': summarize(latencies) if latencies else None,
+        }
+
+    def run(self, tuned_pragmas):
+        return {
+            'readers': self.readers,
+            'writers': self.writers,
+            'duration_s': self.duration,
+            'modes': [
+                self.run_mode('default', DEFAULT_PRAGMAS),
+                self.run_mode('tuned', tuned_pragmas),
+            ],
+        }
@@ -0,0 +1,95 @@
+"""Cold start of a server process: import time per module, boot time and memory.
+
+Each run is a fresh interpreter started with -X importtime that does what a WSGI worker does
+before its first request: django.setup(), the WSGI handler with its middleware and the URLconf
+with every view. The -X importtime lines give the time spent importing each module; its "self"
+time excludes the modules it imported, so summing it per top-level package attributes every
+microsecond once. The resident memory is read once the boot is done.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from .endpoints import summarize
+
+BOOT = '''
+import json, os, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+end = time.perf_counter()
+rss_kb = None
+if os.path.exists('/proc/self/status'):
+    with open('/proc/self/status') as status:
+        rss_kb = next((int(line.split()[1]) for line in status if line.startswith('VmRSS:')), None)
+if rss_kb is None:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'setup_ms': (setup - start) * 1000, 'boot_ms': (end - start) * 1000, 'rss_kb': rss_kb}))
+'''
+
+IMPORT_TIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(text):
+    """[(module, self_us, cumulative_us)] of the -X importtime output, in import completion order"""
+    modules = []
+    for line in text.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def boot(settings_module):
+    """(boot measures, parsed imports) of one fresh process"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if process.returncode:
+        raise RuntimeError(f'The server process failed to boot:\n{process.stderr[-2000:]}')
+    return json.loads(process.stdout.strip().splitlines()[-1]), parse_importtime(process.stderr)
+
+
+class StartupProfile:
+    def __init__(self, settings_module, runs=3, top=20):
+        self.settings_module = settings_module
+        self.runs = runs
+        self.top = top
+
+    def run(self):
+        measures = defaultdict(list)
+        # module -> self time of every run, the median smooths out a slow disk read
+        modules = defaultdict(list)
+        for _ in range(self.runs):
+            boot_measures, imports = boot(self.settings_module)
+            for name, value in boot_measures.items():
+                measures[name].append(value)
+            for module, self_us, _ in imports:
+                modules[module].append(self_us / 1000)
+
+        self_ms = {module: summarize(times)['p50'] for module, times in modules.items()}
+        packages = defaultdict(float)
+        for module, ms in self_ms.items():
+            packages[module.partition('.')[0]] += ms
+        return {
+            'settings': self.settings_module,
+            'runs': self.runs,
+            'setup_ms': summarize(measures['setup_ms']),
+            'boot_ms': summarize(measures['boot_ms']),
+            'rss_mb': summarize([kb / 1024 for kb in measures['rss_kb']]),
+            'modules': len(self_ms),
+            'import_ms': sum(self_ms.values()),
+            'packages': dict(sorted(packages.items(), key=lambda item: -item[1])[:self.top]),
+            'slowest_modules': dict(sorted(self_ms.items(), key=lambda item: -item[1])[:self.top]),
+        }
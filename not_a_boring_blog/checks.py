@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# cache backends each process has its own copy of
+PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_replica_pin_cache(app_configs, **kwargs):
+    """With replicas, the token clients are pinned to the primary in the cache: every worker has to see the pin"""
+    if not settings.DATABASE_REPLICAS or settings.CACHES['default']['BACKEND'] not in PROCESS_CACHES:
+        return []
+    return [Error(
+        'DATABASE_REPLICA_URLS needs a cache shared by the worker processes.',
+        hint='Set CACHE_URL: the read after a write by a token client may otherwise go to a replica that misses it.',
+        id='not_a_boring_blog.E001',
+    )]
@@ -0,0 +1,118 @@
+"""PostgreSQL backend taking its connections from an in-process pool.
+
+Closing a connection (end of request with CONN_MAX_AGE = 0, or a failed health check) hands it
+back to the pool instead of disconnecting, so threaded and async workers reuse a bounded set of
+server connections and skip the connect + TLS handshake. Pool options go in OPTIONS:
+"pool_max_size" (default 10), "pool_timeout" seconds to wait for a free connection (default 30)
+and "pool_check_after" seconds of idleness after which a connection is checked before reuse
+(default 30).
+"""
+import threading
+
+from django.db.backends.postgresql import base, creation
+
+from ...pool import ConnectionPool, PoolTimeout
+
+POOL_OPTIONS = {'pool_max_size': 10, 'pool_timeout': 30, 'pool_check_after': 30}
+
+IDLE = 0  # connection.info.transaction_status outside of a transaction, psycopg2 and psycopg
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def close_pools(alias=None):
+    """Disconnects the idle connections of the pools (of one alias)"""
+    with _pools_lock:
+        for key in [key for key in _pools if alias is None or key[0] == alias]:
+            _pools.pop(key).close_all()
+
+
+def check_connection(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection.rollback()  # outside of autocommit the check opened a transaction
+        return True
+    except base.Database.Error:
+        return False
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # the idle connections would keep the test database from being dropped
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        for option in POOL_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def connect_to_server(self, conn_params):
+        connection = self.Database.connect(**conn_params)
+        if not base.is_psycopg3:
+            # same as the parent: skips psycopg2's json decoding of jsonb values
+            base.psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def get_pool(self, conn_params):
+        # one pool per alias and connection parameters, shared by the threads of the process
+        key = (self.alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+        pool = _pools.get(key)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(key)
+                if pool is None:
+                    options = {**POOL_OPTIONS, **{
+                        name: value for name, value in self.settings_dict['OPTIONS'].items() if name in POOL_OPTIONS
+                    }}
+                    pool = _pools[key] = ConnectionPool(
+                        lambda: self.connect_to_server(conn_params),
+                        max_size=options['pool_max_size'],
+                        timeout=options['pool_timeout'],
+                        check=check_connection,
+                        check_after=options['pool_check_after'],
+                    )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        # the parent's steps, with the connection taken from the pool
+        options = self.settings_dict['OPTIONS']
+        isolation_level = options.get('isolation_level')
+        try:
+            self.isolation_level = base.IsolationLevel(
+                base.IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise base.ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.get()
+        except PoolTimeout as error:
+            raise self.Database.OperationalError(str(error)) from error
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            connection = self.connection
+            discard = bool(connection.closed)
+            if not discard and connection.info.transaction_status != IDLE:
+                # never hand out a connection in the middle of a transaction
+                try:
+                    connection.rollback()
+                except self.Database.Error:
+                    discard = True
+            self.pool.put(connection, discard=discard)
@@ -0,0 +1,70 @@
+"""A small thread-safe connection pool, independent of the database driver."""
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Hands out at most max_size connections, callers wait up to timeout seconds for a free one.
+
+    Returned connections are kept idle (last returned, first reused) and the ones idle longer
+    than check_after seconds are checked with check(connection) before being handed out again.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=30, check=None, check_after=30):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check = check
+        self.check_after = check_after
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = []  # (connection, returned at)
+
+    def get(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'No database connection free after {self.timeout}s, all {self.max_size} are in use')
+        try:
+            while True:
+                with self.lock:
+                    connection, returned_at = self.idle.pop() if self.idle else (None, None)
+                if connection is None:
+                    return self.connect()
+                if self.usable(connection, returned_at):
+                    return connection
+                self.discard(connection)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def usable(self, connection, returned_at):
+        if getattr(connection, 'closed', False):
+            return False
+        if self.check is None or time.monotonic() - returned_at < self.check_after:
+            return True
+        return self.check(connection)
+
+    def put(self, connection, discard=False):
+        try:
+            if discard or getattr(connection, 'closed', False):
+                self.discard(connection)
+            else:
+                with self.lock:
+                    self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            self.discard(connection)
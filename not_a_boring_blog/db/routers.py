@@ -0,0 +1,57 @@
+"""Read replica routing.
+
+Reads go to one of the DATABASE_REPLICAS only inside a request that allows it, see
+ReplicaRoutingMiddleware: safe methods (GET, HEAD, OPTIONS) of a client that has not written
+recently. Everything else (writes, reads of unsafe requests, management commands, the auth
+tables) uses the primary, "default".
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+# tokens, sessions and users are read right after being written (login, then the first request)
+PRIMARY_APP_LABELS = {'auth', 'authtoken', 'sessions', 'contenttypes'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_reads_allowed():
+    return _replica_reads.get()
+
+
+@contextmanager
+def replica_reads(allowed=True):
+    """Allows (or forbids) reading from the replicas inside the block"""
+    token = _replica_reads.set(allowed)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replicas():
+    # a replica on the primary's own database (a TEST MIRROR in the tests) is left out, it is
+    # another connection to the same rows, outside of the transaction of the primary
+    primary_name = connections[PRIMARY].settings_dict['NAME']
+    return [alias for alias in settings.DATABASE_REPLICAS if connections[alias].settings_dict['NAME'] != primary_name]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not _replica_reads.get() or model._meta.app_label in PRIMARY_APP_LABELS:
+            return PRIMARY
+        return random.choice(replicas() or [PRIMARY])
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
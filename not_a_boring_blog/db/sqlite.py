@@ -0,0 +1,25 @@
+"""The SQLITE_PRAGMAS (tuned SQLite profile) applied to every new SQLite connection.
+
+With the default rollback journal a writer locks the whole file while it commits: readers
+wait for it and give up with "database is locked" after the timeout. In WAL mode readers
+read the last committed state while a writer writes, only writers wait for each other, up
+to busy_timeout.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(connection, pragmas):
+    """Runs PRAGMA name = value on a DB-API sqlite3 connection, returns what SQLite answered"""
+    applied = {}
+    for name, value in pragmas.items():
+        cursor = connection.execute(f'PRAGMA {name} = {value}')
+        row = cursor.fetchone()
+        cursor.close()
+        applied[name] = row[0] if row else value
+    return applied
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver, see NotABoringBlogConfig.ready"""
+    if connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS:
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
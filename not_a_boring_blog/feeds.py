@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from .metrics import CACHE_REQUESTS
+from .models.post import Post
+from .models.repost_request import RepostRequest
+
+# Cached public feed of a user (own published posts + approved reposts), see GetUserPublicPosts.
+# Keys are built on the user id so that renaming a user does not orphan the entry.
+FEED_CACHE_PREFIX = 'user_feed'
+
+
+def feed_cache_key(user_id):
+    return f'{FEED_CACHE_PREFIX}:{user_id}'
+
+
+def get_cached_feed(user_id):
+    data = cache.get(feed_cache_key(user_id))
+    CACHE_REQUESTS.inc((FEED_CACHE_PREFIX, 'miss' if data is None else 'hit'))
+    return data
+
+
+def set_cached_feed(user_id, data):
+    timeout = settings.FEED_CACHE_TIMEOUT
+    if timeout:
+        cache.set(feed_cache_key(user_id), data, timeout)
+
+
+def invalidate_user_feeds(user_ids):
+    """Drops the cached feed of every given user, exactly once per user"""
+    keys = {feed_cache_key(user_id) for user_id in user_ids if user_id is not None}
+    if keys:
+        cache.delete_many(keys)
+
+
+def feed_users_for_post(post):
+    """Returns the ids of the users whose feed shows the post: the author and the approved reposters"""
+    reposters = RepostRequest.objects.filter(post_id=post.id, status='approved').values_list('requester_id', flat=True)
+    return {post.user_id_id, *reposters}
+
+
+def feed_users_for_posts(post_ids):
+    """Returns the ids of the users whose feed shows any of the posts"""
+    authors = Post.objects.filter(id__in=post_ids).order_by().values_list('user_id', flat=True)
+    reposters = (
+        RepostRequest.objects.filter(post_id__in=post_ids, status='approved').order_by().values_list('requester_id', flat=True)
+    )
+    return {*authors, *reposters}
+
+
+def invalidate_post_feeds(post):
+    invalidate_user_feeds(feed_users_for_post(post))
@@ -0,0 +1,35 @@
+from rest_framework.exceptions import ValidationError
+
+# ?ordering= values -> order_by of the post lists, ties keep the default order
+READING_TIME_ORDERINGS = {
+    'min_read': ('min_read', '-last_updated', '-created_at'),
+    '-min_read': ('-min_read', '-last_updated', '-created_at'),
+}
+
+
+def filter_reading_time(queryset, request):
+    """Post queryset narrowed by ?min_read= and ?max_read= (minutes) and sorted by ?ordering=min_read|-min_read.
+
+    Invalid values are a 400 rather than being ignored, so a typo does not silently return every post.
+    """
+    errors = {}
+    for param, lookup in (('min_read', 'min_read__gte'), ('max_read', 'min_read__lte')):
+        value = request.query_params.get(param)
+        if value is None:
+            continue
+        try:
+            minutes = int(value)
+            if minutes < 0:
+                raise ValueError
+        except ValueError:
+            errors[param] = ['A whole number of minutes is required.']
+            continue
+        queryset = queryset.filter(**{lookup: minutes})
+    ordering = request.query_params.get('ordering')
+    if ordering is not None and ordering not in READING_TIME_ORDERINGS:
+        errors['ordering'] = [f'Expected one of: {", ".join(READING_TIME_ORDERINGS)}.']
+    if errors:
+        raise ValidationError(errors)
+    if ordering is not None:
+        queryset = queryset.order_by(*READING_TIME_ORDERINGS[ordering])
+    return queryset
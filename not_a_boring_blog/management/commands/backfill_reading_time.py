@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models.post import Post, PostContent
+from ...reading_time import count_words_batch, reading_minutes
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes Post.min_read from the word count of the bodies, chunk by chunk in id order, '
+        'and writes only the posts whose reading time changed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='posts read and updated per transaction')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive')
+        contents = PostContent.objects.order_by('post_id').values_list('post_id', 'body', 'post__min_read')
+        checked = updated = 0
+        last_id = 0
+        while True:
+            chunk = list(contents.filter(post_id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            post_ids, bodies, stored = zip(*chunk)
+            # the words of the whole chunk are counted in one vectorized pass
+            changed = [
+                Post(id=post_id, min_read=reading_minutes(words))
+                for post_id, words, minutes in zip(post_ids, count_words_batch(bodies), stored)
+                if reading_minutes(words) != minutes
+            ]
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ['min_read'])
+            checked += len(chunk)
+            updated += len(changed)
+            last_id = post_ids[-1]
+        self.stdout.write(f'{checked} posts checked, {updated} updated')
@@ -0,0 +1,96 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...benchmarks.data import DEFAULT_SCALE, DataGenerator
+from ...benchmarks.database import test_database
+from ...benchmarks.endpoints import BenchmarkFixtures, EndpointBenchmark, compare
+from ...models.post import Post
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a throwaway test database with synthetic data and times every API endpoint '
+        '(latency percentiles and query counts), the results are written as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=default,
+                                help=f'number of {name.replace("_", " ")} to generate (default {default})')
+        parser.add_argument('--body-words', type=int, default=300, help='average words per post body')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=20, help='timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='url name to run, can be repeated (default: all)')
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+        parser.add_argument('--compare', help='JSON results of a previous run to compare the p50 latencies with')
+        parser.add_argument('--test-db-name', help='file name of the test database (SQLite defaults to in-memory)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='keep the test database, a later run with --keepdb reuses its data')
+
+    def handle(self, *args, **options):
+        scale = {name: options[name] for name in DEFAULT_SCALE}
+        with test_database(options['test_db_name'], options['keepdb']):
+            counts = None
+            if not (options['keepdb'] and Post.objects.exists()):
+                self.stderr.write(f'Generating data {scale} ...')
+                counts = DataGenerator(seed=options['seed'], body_words=options['body_words'], **scale).generate()
+            fixtures = BenchmarkFixtures().create()
+            benchmark = EndpointBenchmark(
+                fixtures, iterations=options['iterations'], warmup=options['warmup'], only=options['endpoints']
+            )
+            self.stderr.write('Timing endpoints ...')
+            results, missing = benchmark.run()
+
+        for name in missing:
+            self.stderr.write(self.style.WARNING(f'No benchmark scenario for {name}'))
+
+        report = {
+            'meta': {
+                'git_commit': git_commit(),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed': options['seed'],
+                'scale': scale,
+                'rows': counts,
+                'iterations': options['iterations'],
+            },
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.print_comparison(options['compare'], report)
+
+    def print_comparison(self, path, report):
+        try:
+            with open(path) as file:
+                previous = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Cannot read {path}: {error}')
+        self.stderr.write(f'{"endpoint":45} {"p50 before":>11} {"p50 now":>9} {"ratio":>7} {"queries":>9}')
+        for name, before, now, ratio, old_queries, new_queries in compare(previous, report):
+            self.stderr.write(
+                f'{name:45} {before:11.2f} {now:9.2f} {ratio:7.2f} {old_queries:>4}->{new_queries:<4}'
+            )
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ...benchmarks.compression import CompressionBenchmark
+from ...benchmarks.data import DataGenerator
+from ...benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders a list of published posts (1000 by default) in a throwaway test database and reports its size '
+        'and time to last byte uncompressed and with every encoding of the compression middleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='posts in the response')
+        parser.add_argument('--body-words', type=int, default=300, help='average words per post body')
+        parser.add_argument('--iterations', type=int, default=10, help='timed compressions per encoding')
+        parser.add_argument('--bandwidth', type=float, default=1.6, help='link bandwidth in Mbit/s')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+
+    def handle(self, *args, **options):
+        with test_database():
+            # about 80% of the generated posts are published, generate enough for the list
+            DataGenerator(
+                seed=options['seed'], body_words=options['body_words'], users=50, categories=20,
+                posts=options['posts'] * 5 // 4 + 10, comments=0, repost_requests=0, views=0,
+            ).generate()
+            report = CompressionBenchmark(
+                posts=options['posts'], iterations=options['iterations'], bandwidth_mbps=options['bandwidth'],
+            ).run()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        self.stderr.write(f'{report["posts"]} posts at {report["bandwidth_mbps"]} Mbit/s')
+        for name, result in report['encodings'].items():
+            compress = f'compress p50 {result["compress_ms"]["p50"]:6.2f} ms' if result['compress_ms'] else ' ' * 25
+            self.stderr.write(
+                f'{name:8} {result["bytes"]:9} bytes  {compress}  time to last byte {result["time_to_last_byte_ms"]:8.0f} ms'
+            )
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+
+from ...benchmarks.connections import ConnectionBenchmark
+from ...benchmarks.database import test_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the same request with a connection opened per request (CONN_MAX_AGE = 0) and with a '
+        'persistent one, in a throwaway test database, and prints the connect cost alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='url to request (default: the category list)')
+        parser.add_argument('--requests', type=int, default=200, help='timed requests per mode')
+        parser.add_argument('--warmup', type=int, default=5, help='untimed requests per mode')
+        parser.add_argument('--conn-max-age', type=int, default=settings.DB_CONN_MAX_AGE or 60,
+                            help='CONN_MAX_AGE of the persistent mode')
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+
+    def handle(self, *args, **options):
+        test_db_name = None
+        if connection.vendor == 'sqlite':
+            # an in-memory database is never closed, a file shows the real connect
+            handle, test_db_name = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+        path = options['path'] or reverse('not_a_boring_blog:list_categories')
+        try:
+            with test_database(test_db_name):
+                benchmark = ConnectionBenchmark(path, requests=options['requests'], warmup=options['warmup'])
+                report = benchmark.run(persistent_max_age=options['conn_max_age'])
+        finally:
+            if test_db_name and os.path.exists(test_db_name):
+                os.remove(test_db_name)
+
+        output = json.dumps({'path': path, **report}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        self.stderr.write(f'connect alone: p50 {report["connect_ms"]["p50"]:.3f} ms')
+        for mode in report['modes']:
+            self.stderr.write(
+                f'{mode["mode"]:12} p50 {mode["latency_ms"]["p50"]:8.3f} ms  p90 {mode["latency_ms"]["p90"]:8.3f} ms  '
+                f'connects {mode["connects"]}/{mode["requests"]}'
+            )
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from ...benchmarks.data import DataGenerator
+from ...benchmarks.database import test_database
+from ...benchmarks.rendering import RenderingBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Serializes a list of published posts (1000 by default) in a throwaway test database and times '
+        'serializing it with PostSerializer and with fast_data, and rendering and parsing it with DRF\'s '
+        'JSONRenderer/JSONParser and with the orjson based classes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='posts in the response')
+        parser.add_argument('--body-words', type=int, default=300, help='average words per post body')
+        parser.add_argument('--iterations', type=int, default=20, help='timed renders and parses per class')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+
+    def handle(self, *args, **options):
+        with test_database():
+            # about 80% of the generated posts are published, generate enough for the list
+            DataGenerator(
+                seed=options['seed'], body_words=options['body_words'], users=50, categories=20,
+                posts=options['posts'] * 5 // 4 + 10, comments=0, repost_requests=0, views=0,
+            ).generate()
+            report = RenderingBenchmark(posts=options['posts'], iterations=options['iterations']).run()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        self.stderr.write(f'{report["posts"]} posts, {report["bytes"]} bytes')
+        for kind, baseline in [('serialize', 'drf'), ('render', 'json'), ('parse', 'json')]:
+            timings = report[f'{kind}_ms']
+            self.stderr.write(
+                f'{kind:9} {baseline:4} p50 {timings[baseline]["p50"]:7.2f} ms  fast p50 {timings["fast"]["p50"]:7.2f} ms  '
+                f'x{report[f"{kind}_speedup"]:.1f}'
+            )
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...benchmarks.data import DataGenerator
+from ...benchmarks.database import test_database
+from ...benchmarks.endpoints import BenchmarkFixtures
+from ...benchmarks.sqlite import SQLiteLoadBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs concurrent reader and writer threads on a throwaway SQLite file, with SQLite\'s default '
+        'journal and with the tuned SQLITE_PRAGMAS, and prints throughput, latencies and lock errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='writer threads')
+        parser.add_argument('--duration', type=float, default=5, help='seconds per mode')
+        parser.add_argument('--posts', type=int, default=200, help='posts to generate')
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'The default database is {connection.vendor}, not SQLite')
+        tuned_pragmas = settings.SQLITE_PRAGMAS or {
+            'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 5000,
+        }
+        handle, test_db_name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        try:
+            with test_database(test_db_name):
+                DataGenerator(seed=42, users=20, categories=5, posts=options['posts'], comments=0,
+                              repost_requests=0, views=0).generate()
+                fixtures = BenchmarkFixtures().create()
+                benchmark = SQLiteLoadBenchmark(
+                    fixtures.post, fixtures.users['reader'],
+                    readers=options['readers'], writers=options['writers'], duration=options['duration'],
+                )
+                report = benchmark.run(tuned_pragmas)
+        finally:
+            for suffix in ['', '-wal', '-shm', '-journal']:
+                if os.path.exists(test_db_name + suffix):
+                    os.remove(test_db_name + suffix)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        for mode in report['modes']:
+            for kind in ['reads', 'writes']:
+                result = mode[kind]
+                latency = result['latency_ms']
+                self.stderr.write(
+                    f'{mode["mode"]:8} {kind:6} {result["per_second"]:9.1f}/s  '
+                    f'p50 {latency["p50"] if latency else 0:8.3f} ms  p99 {latency["p99"] if latency else 0:8.3f} ms  '
+                    f'errors {result["errors"]}'
+                )
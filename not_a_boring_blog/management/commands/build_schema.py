@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...schema import artifact_path, etag, generate_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the OpenAPI schema (YAML and JSON) into SCHEMA_DIR, served by /api/schema/ '
+        'without introspecting the views on every request. Run it on every deploy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='write nothing, exit with an error when the built schema is missing or differs from the code',
+        )
+
+    def handle(self, *args, **options):
+        documents = generate_schema()
+        if options['check']:
+            stale = [
+                format for format, content in documents.items()
+                if not artifact_path(format).exists() or artifact_path(format).read_bytes() != content
+            ]
+            if stale:
+                raise CommandError(f'The built schema is out of date ({", ".join(stale)}), run manage.py build_schema')
+            self.stdout.write('The built schema is up to date')
+            return
+        write_schema(documents)
+        for format, content in documents.items():
+            self.stdout.write(f'{artifact_path(format)}: {len(content)} bytes, ETag {etag(content)}')
+        # each server process keeps the schema it read first
+        self.stdout.write('Restart the server to serve the new schema')
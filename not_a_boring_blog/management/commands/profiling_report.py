@@ -0,0 +1,75 @@
+import json
+import pstats
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks.endpoints import summarize
+from ...middleware.profiling import LOG_NAME
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarizes the requests sampled by ProfilingMiddleware: latency and database time per view, '
+        'the slowest requests and their slowest queries, or the cProfile stats of one request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PROFILING_DIR, help='profiling directory (default PROFILING_DIR)')
+        parser.add_argument('--view', help='only the requests of this view name')
+        parser.add_argument('--slowest', type=int, default=10, help='number of slowest requests to list')
+        parser.add_argument('--profile', help='request id, prints the top functions of its cProfile dump')
+        parser.add_argument('--sort', default='cumulative', help='pstats sort key for --profile')
+        parser.add_argument('--limit', type=int, default=30, help='functions printed for --profile')
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir'])
+        if options['profile']:
+            return self.print_profile(directory / f"{options['profile']}.prof", options['sort'], options['limit'])
+
+        records = [record for record in self.read_records(directory)
+                   if not options['view'] or record['view'] == options['view']]
+        if not records:
+            raise CommandError(f'No sampled requests in {directory}')
+
+        by_view = defaultdict(list)
+        for record in records:
+            by_view[record['view'] or record['path']].append(record)
+        self.stdout.write(f'{"view":45} {"count":>6} {"p50 ms":>9} {"p90 ms":>9} {"db p50":>9} {"queries":>8}')
+        for view, view_records in sorted(by_view.items(), key=lambda item: -len(item[1])):
+            wall = summarize([record['wall_ms'] for record in view_records])
+            db = summarize([record['db_ms'] for record in view_records])
+            queries = max(record['queries'] for record in view_records)
+            self.stdout.write(
+                f'{view:45} {len(view_records):6} {wall["p50"]:9.1f} {wall["p90"]:9.1f} {db["p50"]:9.1f} {queries:8}'
+            )
+
+        self.stdout.write(f'\nSlowest {options["slowest"]} requests:')
+        for record in sorted(records, key=lambda record: record['wall_ms'], reverse=True)[:options['slowest']]:
+            profile = f' profile={record["id"]}' if record['profile'] else ''
+            self.stdout.write(
+                f'{record["wall_ms"]:9.1f} ms  db {record["db_ms"]:.1f} ms/{record["queries"]} queries  '
+                f'{record["status"]} {record["method"]} {record["path"]}{profile}'
+            )
+            for query in record['slow_queries'][:3]:
+                self.stdout.write(f'    {query["ms"]:8.2f} ms  {query["sql"][:150]}')
+
+    def read_records(self, directory):
+        # the rotated files first, oldest (highest suffix) to newest
+        paths = sorted(directory.glob(f'{LOG_NAME}.*'), key=lambda path: -int(path.suffix[1:]))
+        paths.append(directory / LOG_NAME)
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def print_profile(self, path, sort, limit):
+        if not path.exists():
+            raise CommandError(f'No profile at {path}')
+        stats = pstats.Stats(str(path), stream=self.stdout)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
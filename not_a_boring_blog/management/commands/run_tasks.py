@@ -0,0 +1,31 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...tasks import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the background tasks stored by the requests, batch by batch, until stopped (SIGTERM or Ctrl+C '
+        'finish the batch being run first). Several workers can run side by side.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='exit once no task is ready instead of waiting for more')
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help='seconds to wait when no task is ready (default TASK_POLL_INTERVAL)',
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        if poll_interval is not None and poll_interval < 0:
+            raise CommandError('--poll-interval must not be negative')
+        worker = Worker(poll_interval=poll_interval)
+        if not options['once']:
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, worker.stop)
+            self.stderr.write(f'Worker {worker.name} waiting for tasks')
+        results = worker.run(once=options['once'])
+        self.stdout.write(f"{results['done']} tasks done, {results['retried']} retried, {results['failed']} failed")
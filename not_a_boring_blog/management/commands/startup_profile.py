@@ -0,0 +1,44 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks.startup import StartupProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Boots fresh server processes (django.setup(), WSGI handler, URLconf) under -X importtime and reports '
+        'the boot time, the resident memory once booted and the import time per package and per module.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='processes booted, the medians are reported')
+        parser.add_argument('--top', type=int, default=20, help='packages and modules listed')
+        parser.add_argument(
+            '--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE'),
+            help='settings of the booted processes (default: DJANGO_SETTINGS_MODULE)',
+        )
+        parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be positive')
+        try:
+            report = StartupProfile(options['settings_module'], runs=options['runs'], top=options['top']).run()
+        except RuntimeError as error:
+            raise CommandError(str(error))
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        self.stderr.write(
+            f'boot p50 {report["boot_ms"]["p50"]:.0f} ms (django.setup() {report["setup_ms"]["p50"]:.0f} ms), '
+            f'RSS {report["rss_mb"]["p50"]:.1f} MB, {report["modules"]} modules imported in {report["import_ms"]:.0f} ms'
+        )
+        for package, ms in report['packages'].items():
+            self.stderr.write(f'{ms:8.1f} ms  {package}')
@@ -0,0 +1,36 @@
+"""Post bodies rendered to safe HTML on the server.
+
+The body is Markdown. It is rendered with Python-Markdown and cleaned with nh3 (an allowlist of
+tags and attributes, no scripts, no event handlers, no javascript: links), once per edit: the
+HTML is stored next to the body with the key it was rendered for, the renderer version and a
+hash of the body. A stored HTML whose key differs from the current one (an older renderer, a body
+written by bulk_create or a migration) is rendered again the next time it is read.
+
+Without Markdown or nh3 the body is only escaped and split into paragraphs, never passed through
+unsanitized; the key then names that renderer, so the HTML is rendered again once both are installed.
+Both are imported by the first render only, most server processes only read stored HTML.
+"""
+import hashlib
+from importlib.util import find_spec
+
+from django.utils.html import linebreaks
+
+# found without being imported
+MARKDOWN = find_spec('markdown') is not None and find_spec('nh3') is not None
+# bump when the output of render_body changes, the stored HTML is then rendered again on read
+RENDERER_VERSION = 1
+RENDERER = f'{RENDERER_VERSION}-markdown' if MARKDOWN else f'{RENDERER_VERSION}-text'
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'sane_lists']
+
+
+def html_key(body):
+    """Key of the HTML of this body with the current renderer"""
+    return f'{RENDERER}:{hashlib.blake2b(body.encode(), digest_size=16).hexdigest()}'
+
+
+def render_body(body):
+    if not MARKDOWN:
+        return linebreaks(body, autoescape=True)
+    import markdown
+    import nh3
+    return nh3.clean(markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS))
@@ -0,0 +1,249 @@
+"""In-process metrics in the Prometheus text format.
+
+Counters, gauges and histograms live in plain dicts keyed by a tuple of label values, an update is
+a dict lookup under a lock. With METRICS_DIR set every process (gunicorn worker) writes a snapshot
+of its metrics to METRICS_DIR/metrics_<pid>.json at most every METRICS_FLUSH_INTERVAL seconds and
+the /metrics view adds up the snapshots of all the processes: counters and histograms of every
+process (dead workers included, so totals never go down), gauges of the live ones. The directory
+should be emptied before the server starts.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def samples(self, values):
+        """Yields (suffix, labels dict, value) of the given values"""
+        for labels, value in sorted(values.items()):
+            yield '', dict(zip(self.labelnames, labels)), value
+
+    def merge(self, total, values):
+        for labels, value in values.items():
+            total[labels] = total.get(labels, 0) + value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, labels=(), value=0):
+        with self.lock:
+            self.values[labels] = value
+
+    def set_callback(self, callback):
+        """callback() returns the value of a gauge without labels, it is read when the metrics are collected"""
+        self.callback = callback
+
+    def collect(self):
+        if self.callback is not None:
+            self.set((), self.callback())
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        # per labels: one count per bucket (not cumulative) and +Inf, then the sum
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self, values):
+        for labels, counts in sorted(values.items()):
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                yield '_bucket', {**labels, 'le': str(bound)}, cumulative
+            yield '_sum', labels, counts[-1]
+            yield '_count', labels, cumulative
+
+    def merge(self, total, values):
+        for labels, counts in values.items():
+            current = total.get(labels)
+            total[labels] = list(counts) if current is None else [a + b for a, b in zip(current, counts)]
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_sample(name, labels, value):
+    if labels:
+        label_text = ','.join(f'{key}="{escape(label)}"' for key, label in labels.items())
+        return f'{name}{{{label_text}}} {value}'
+    return f'{name} {value}'
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    # multiprocess snapshots
+
+    def directory(self):
+        directory = settings.METRICS_DIR
+        return Path(directory) if directory else None
+
+    def snapshot(self):
+        snapshot = {}
+        for name, metric in self.metrics.items():
+            with metric.lock:
+                snapshot[name] = [
+                    [list(labels), list(value) if isinstance(value, list) else value]
+                    for labels, value in metric.values.items()
+                ]
+        return snapshot
+
+    def flush(self):
+        """Writes the snapshot of this process, atomically"""
+        directory = self.directory()
+        if directory is None:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'metrics_{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, path)
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def other_snapshots(self):
+        directory = self.directory()
+        if directory is None or not directory.exists():
+            return
+        for path in directory.glob('metrics_*.json'):
+            pid = int(path.stem.split('_')[1])
+            if pid == os.getpid():
+                continue
+            try:
+                yield pid, json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # removed or being replaced
+
+    def collect(self):
+        """Returns {name: values} added up over the processes"""
+        for metric in self.metrics.values():
+            if isinstance(metric, Gauge):
+                metric.collect()
+        totals = {}
+        for name, metric in self.metrics.items():
+            totals[name] = {}
+            metric.merge(totals[name], dict(metric.values))
+        for pid, snapshot in self.other_snapshots():
+            alive = None
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                if isinstance(metric, Gauge):
+                    if metric.callback is not None:
+                        continue  # computed at collection, the same in every process
+                    alive = pid_alive(pid) if alive is None else alive
+                    if not alive:
+                        continue
+                metric.merge(totals[name], {tuple(labels): value for labels, value in values})
+        return totals
+
+    def render(self):
+        self.maybe_flush()
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for suffix, labels, value in metric.samples(values):
+                lines.append(format_sample(name + suffix, labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'http_requests_total', 'Requests handled, per view, method and status.', ['view', 'method', 'status']
+)
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, per view.', ['view']
+)
+REQUEST_QUERIES = registry.histogram(
+    'http_request_db_queries', 'Database queries run by a request, per view.', ['view'], buckets=QUERY_BUCKETS
+)
+CACHE_REQUESTS = registry.counter(
+    'cache_requests_total', 'Application cache lookups, per cache and result (hit or miss).', ['cache', 'result']
+)
+# the callbacks of the queue gauges count the pending tasks, they are set by tasks.py
+VIEW_BUFFER_DEPTH = registry.gauge(
+    'view_ingestion_buffer_depth', 'Post views waiting to be written to the database.', callback=lambda: 0,
+)
+TASK_QUEUE_DEPTH = registry.gauge('task_queue_depth', 'Background tasks waiting to be run.', callback=lambda: 0)
+TASK_RUNS = registry.counter(
+    'task_runs_total', 'Background tasks run, per task and result (done, retried or failed).', ['task', 'result']
+)
+TASK_DURATION = registry.histogram(
+    'task_batch_duration_seconds', 'Time spent running a batch of tasks, per task.', ['task']
+)
@@ -0,0 +1,219 @@
+"""Content-negotiated response compression: brotli, zstd or gzip, whichever the client prefers.
+
+Django's GZipMiddleware only knows gzip and compresses at level 6 whatever the size. Here:
+- the encoding is the one with the highest q in Accept-Encoding, ties going to the first of
+  COMPRESSION_ENCODINGS; br needs the brotli package, zstd the zstandard package;
+- bodies smaller than COMPRESSION_MIN_SIZE are sent as they are (a few hundred bytes do not
+  shrink enough to pay for the encoder);
+- streaming responses are compressed chunk by chunk and flushed after every chunk, the client
+  gets each part as soon as it is produced;
+- a response with cache_compressed = True (the cached feeds) keeps its compressed body in the
+  cache, keyed on the encoding and a hash of the uncompressed body, so an unchanged feed is
+  compressed once per COMPRESSION_CACHE_TIMEOUT instead of once per request;
+- under ASGI a body to compress is compressed (and its cache entry read) in a worker thread, the
+  event loop goes on serving the other requests meanwhile; the chunks of an async streaming
+  response, each small, are still compressed on the loop.
+
+Only GET and HEAD responses are compressed: a compressed response holding a secret (a login
+token) and text sent by the client leaks the secret through its size (BREACH).
+"""
+import gzip
+import hashlib
+import re
+import zlib
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from ..metrics import CACHE_REQUESTS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_CACHE_PREFIX = 'compressed'
+COMPRESSIBLE_TYPES = {'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'}
+ACCEPT_ENCODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def compress(self, content):
+        # mtime=0: the same body always gives the same bytes
+        return gzip.compress(content, compresslevel=6, mtime=0)
+
+    def compressor(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def compress(self, content):
+        # quality 5 of 11: about gzip's speed, the higher ones are for static files compressed once
+        return brotli.compress(content, quality=5)
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=5)
+        return compressor.process, compressor.flush, compressor.finish
+
+
+class ZstdEncoder:
+    name = 'zstd'
+
+    def compress(self, content):
+        return zstandard.ZstdCompressor(level=3).compress(content)
+
+    def compressor(self):
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        return (
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH),
+        )
+
+
+ENCODERS = {'gzip': GzipEncoder(), 'br': brotli and BrotliEncoder(), 'zstd': zstandard and ZstdEncoder()}
+
+
+def available_encodings(names):
+    """The known encodings of names whose library is installed, in the same order"""
+    return tuple(name for name in names if ENCODERS.get(name))
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding, encodings):
+    """The encoding to use for an Accept-Encoding header, None when the client accepts none of ours"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if match is None:
+            continue
+        try:
+            quality = float(match[2]) if match[2] else 1.0
+        except ValueError:
+            continue
+        accepted[match[1].lower()] = quality
+    wildcard = accepted.get('*', 0)
+    best, best_quality = None, 0
+    for name in encodings:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compressible(content_type):
+    media_type = content_type.partition(';')[0].strip().lower()
+    return (
+        media_type.startswith('text/') or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith('+json') or media_type.endswith('+xml')
+    )
+
+
+def compressed_cache_key(encoding, content):
+    return f'{COMPRESSED_CACHE_PREFIX}:{encoding}:{hashlib.blake2b(content, digest_size=16).hexdigest()}'
+
+
+def compress_streaming(encoder, streaming_content):
+    compress, flush, finish = encoder.compressor()
+    for chunk in streaming_content:
+        data = compress(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_streaming(encoder, streaming_content):
+    compress, flush, finish = encoder.compressor()
+    async for chunk in streaming_content:
+        data = compress(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    """Compresses the responses with the encoding the client prefers, removed when COMPRESSION_ENCODINGS is empty"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.encodings = available_encodings(settings.COMPRESSION_ENCODINGS)
+        if not self.encodings:
+            raise MiddlewareNotUsed
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming or len(response.content) < self.min_size:
+            return self.process_response(request, response)
+        # the encoders and the cache calls block, off the event loop (not thread sensitive: no ORM call)
+        return await sync_to_async(self.process_response, thread_sensitive=False)(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD') or not compressible(response.get('Content-Type', '')):
+            return response
+        # the response depends on Accept-Encoding whether or not this one is compressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.has_header('Content-Encoding') or 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        encoding = negotiate(request.headers.get('Accept-Encoding', ''), self.encodings)
+        if encoding is None:
+            return response
+        encoder = ENCODERS[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_streaming(encoder, response.streaming_content)
+            else:
+                response.streaming_content = compress_streaming(encoder, response.streaming_content)
+            # the length is only known once the last chunk is compressed
+            response.headers.pop('Content-Length', None)
+        else:
+            content = self.compress(encoder, response)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # the compressed bytes differ from the ones a strong ETag was computed on
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compress(self, encoder, response):
+        timeout = settings.COMPRESSION_CACHE_TIMEOUT
+        if not getattr(response, 'cache_compressed', False) or not timeout:
+            return encoder.compress(response.content)
+        key = compressed_cache_key(encoder.name, response.content)
+        content = cache.get(key)
+        CACHE_REQUESTS.inc((COMPRESSED_CACHE_PREFIX, 'miss' if content is None else 'hit'))
+        if content is None:
+            content = encoder.compress(response.content)
+            cache.set(key, content, timeout)
+        return content
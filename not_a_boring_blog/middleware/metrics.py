@@ -0,0 +1,82 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from ..metrics import REQUEST_LATENCY, REQUEST_QUERIES, REQUESTS, registry
+
+
+class QueryCounter:
+    """Number of statements run for the request being served"""
+
+    def __init__(self):
+        self.count = 0
+
+
+# Counter of the current request. A ContextVar reaches the threads sync_to_async runs the ORM in under ASGI,
+# where a wrapper installed on the connections of the event loop's thread would count nothing.
+current_counter = ContextVar('query_counter', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper installed once per connection, no timing, so it stays cheap"""
+    counter = current_counter.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    """connection_created receiver (see apps.py): every connection, in whichever thread, counts its statements"""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class MetricsMiddleware:
+    """Records request count, latency and query count per view name, removed when METRICS_ENABLED is off"""
+    sync_capable = True
+    async_capable = True  # no thread hop in front of the async views under ASGI
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        try:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            elapsed = time.perf_counter() - start
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, elapsed, counter.count)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_counter.set(counter)
+        try:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            elapsed = time.perf_counter() - start
+        finally:
+            current_counter.reset(token)
+        self.record(request, response, elapsed, counter.count)
+        return response
+
+    def record(self, request, response, elapsed, queries):
+        match = request.resolver_match
+        # view names, not paths: the label values stay a small fixed set
+        view = match.view_name if match else 'unmatched'
+        REQUESTS.inc((view, request.method, str(response.status_code)))
+        REQUEST_LATENCY.observe((view,), elapsed)
+        REQUEST_QUERIES.observe((view,), queries)
+        registry.maybe_flush()
@@ -0,0 +1,153 @@
+"""Sampled per-request profiling.
+
+A fraction of the requests (PROFILING_SAMPLE_RATE) is measured: wall time, time spent in the
+database, number of queries and the slowest statements. The numbers are sent back in a
+Server-Timing header and appended to a rotating JSON lines file in PROFILING_DIR, which
+`python manage.py profiling_report` summarizes.
+
+With PROFILING_CPROFILE_THRESHOLD_MS set, sampled requests also run under cProfile and the
+pstats dump of the ones slower than the threshold is kept next to the log.
+"""
+import cProfile
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+LOG_NAME = 'requests.jsonl'
+
+
+class QueryTimer:
+    """Execute wrapper timing every statement run on the connections it is installed on"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            self.statements.append((elapsed, sql))
+
+    def slowest(self, limit):
+        return [
+            {'sql': sql, 'ms': round(elapsed * 1000, 3)}
+            for elapsed, sql in sorted(self.statements, key=lambda statement: statement[0], reverse=True)[:limit]
+        ]
+
+
+class ProfileStore:
+    """Rotating JSON lines log of the sampled requests plus their pstats dumps"""
+
+    def __init__(self, directory, max_bytes, backup_count, max_profiles):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_profiles = max_profiles
+        self.logger = logging.getLogger(f'{__name__}.{self.directory}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(
+                self.directory / LOG_NAME, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+
+    def write(self, record):
+        self.logger.info(json.dumps(record))
+
+    def save_profile(self, profiler, request_id):
+        name = f'{request_id}.prof'
+        profiler.dump_stats(self.directory / name)
+        self.prune_profiles()
+        return name
+
+    def prune_profiles(self):
+        profiles = sorted(self.directory.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:-self.max_profiles or None]:
+            path.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Measures a sample of the requests, removed from the chain when PROFILING_SAMPLE_RATE is 0.
+
+    Synchronous only (cProfile follows one thread): under ASGI Django runs it, and everything
+    after it, in a thread, so it is meant for a diagnosis run rather than left on.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.cprofile_threshold = settings.PROFILING_CPROFILE_THRESHOLD_MS
+        self.slow_queries = settings.PROFILING_SLOW_QUERIES
+        self.store = ProfileStore(
+            settings.PROFILING_DIR,
+            max_bytes=settings.PROFILING_LOG_MAX_BYTES,
+            backup_count=settings.PROFILING_LOG_BACKUP_COUNT,
+            max_profiles=settings.PROFILING_MAX_PROFILES,
+        )
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        profiler = cProfile.Profile() if self.cprofile_threshold is not None else None
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            start = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+            wall = time.perf_counter() - start
+
+        wall_ms = wall * 1000
+        db_ms = timer.total * 1000
+        request_id = uuid.uuid4().hex
+        profile = None
+        if profiler and wall_ms >= self.cprofile_threshold:
+            profile = self.store.save_profile(profiler, request_id)
+
+        match = request.resolver_match
+        self.store.write({
+            'id': request_id,
+            'time': datetime.now(timezone.utc).isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'wall_ms': round(wall_ms, 3),
+            'db_ms': round(db_ms, 3),
+            'queries': timer.count,
+            'slow_queries': timer.slowest(self.slow_queries),
+            'profiled': profiler is not None,
+            'profile': profile,
+        })
+
+        timings = [f'total;dur={wall_ms:.1f}', f'db;desc="{timer.count} queries";dur={db_ms:.1f}']
+        if response.has_header('Server-Timing'):
+            timings.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(timings)
+        return response
@@ -0,0 +1,88 @@
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from ..db.routers import replica_reads
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_primary'
+PIN_CACHE_PREFIX = 'db_primary'
+
+
+def client_key(request):
+    """Identifies the client by its credentials (token header or session), None for anonymous clients"""
+    credentials = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return f'{PIN_CACHE_PREFIX}:{hashlib.sha256(credentials.encode()).hexdigest()}'
+
+
+class ReplicaRoutingMiddleware:
+    """Lets safe requests read from the replicas, unless the client wrote within REPLICA_PIN_SECONDS.
+
+    After a successful unsafe request the client is pinned to the primary twice: with a cookie
+    (browsers) and with a cache entry keyed on its credentials (token clients, hence the shared cache
+    required by checks.check_replica_pin_cache). Reads right after a write then see it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def pinned(self, request):
+        if PIN_COOKIE in request.COOKIES:
+            return True
+        key = client_key(request)
+        return key is not None and cache.get(key) is not None
+
+    async def apinned(self, request):
+        if PIN_COOKIE in request.COOKIES:
+            return True
+        key = client_key(request)
+        return key is not None and await cache.aget(key) is not None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                self.pin(request, response)
+            return response
+
+        with replica_reads(not self.pinned(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+            if response.status_code < 400:
+                await self.apin(request, response)
+            return response
+
+        # the flag is a context variable, the ORM calls of the view run in a copy of this context
+        with replica_reads(not await self.apinned(request)):
+            return await self.get_response(request)
+
+    def pin(self, request, response):
+        seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        key = client_key(request)
+        if key is not None:
+            cache.set(key, True, seconds)
+
+    async def apin(self, request, response):
+        seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        key = client_key(request)
+        if key is not None:
+            await cache.aset(key, True, seconds)
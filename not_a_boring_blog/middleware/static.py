@@ -0,0 +1,161 @@
+"""Serves the collected static files (STATIC_ROOT) from the application, before any view runs.
+
+- a file under its hashed name (listed in the staticfiles.json manifest) never changes: it is
+  cached for a year and marked immutable, browsers do not even revalidate it; the other names
+  are cached STATIC_MAX_AGE seconds and revalidated with their ETag;
+- the .br and .gz variants written by collectstatic (see staticfiles.py) are sent as they are to
+  the clients accepting them, nothing is compressed per request;
+- under WSGI the body is a FileResponse, handed to the server's wsgi.file_wrapper: gunicorn sends
+  it with sendfile(), without copying it through Python.
+
+What a path resolves to is looked up once per process, the following requests for it touch the
+disk only to open the file. Restart the server after collectstatic.
+"""
+import mimetypes
+import os
+import posixpath
+from pathlib import Path
+from typing import NamedTuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+from .compression import negotiate
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Content-Encoding -> suffix of the variant, in the order of preference
+VARIANTS = {'br': '.br', 'gzip': '.gz'}
+
+
+class Representation(NamedTuple):
+    path: str
+    size: int
+    etag: str
+
+
+class StaticFile(NamedTuple):
+    content_type: str
+    last_modified: str
+    cache_control: str
+    # Content-Encoding (None for the plain file) -> representation
+    representations: dict
+
+    @property
+    def encodings(self):
+        return tuple(encoding for encoding in self.representations if encoding is not None)
+
+
+def representation(path, encoding=None):
+    stat = os.stat(path)
+    # changes with the file, distinct per encoding: the bytes differ
+    etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}' + (f'-{encoding}' if encoding else '')
+    return Representation(str(path), stat.st_size, f'"{etag}"')
+
+
+class StaticFilesMiddleware:
+    """Answers the GET and HEAD requests under STATIC_URL with the file of STATIC_ROOT.
+
+    Removed when the static files are on S3, when STATIC_SERVE is off or when STATIC_URL is on another host.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.USE_S3_SETUP or not settings.STATIC_SERVE or '//' in settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+        self.root = Path(settings.STATIC_ROOT).resolve()
+        # name under STATIC_URL -> StaticFile, found files only: bounded by STATIC_ROOT whatever the clients ask for
+        self.files = {}
+        self.immutable_names = None
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.match(request)
+        if static_file is None:
+            return self.get_response(request)
+        return self.respond(request, static_file, stream=True)
+
+    async def __acall__(self, request):
+        static_file = self.match(request)
+        if static_file is None:
+            return await self.get_response(request)
+        # Django's ASGI handler has no file wrapper, a file is sent from memory
+        return self.respond(request, static_file, stream=False)
+
+    def match(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return None
+        name = request.path_info[len(self.prefix):]
+        static_file = self.files.get(name)
+        if static_file is None:
+            static_file = self.find(name)
+            if static_file is not None:
+                self.files[name] = static_file
+        return static_file
+
+    def find(self, name):
+        if '\x00' in name:
+            return None
+        path = (self.root / name).resolve()
+        # no way out of STATIC_ROOT with ../ or a symlink
+        if self.root not in path.parents or not path.is_file():
+            return None
+        content_type, encoding = mimetypes.guess_type(posixpath.basename(name))
+        if encoding is not None or content_type is None:
+            content_type = 'application/octet-stream'
+        elif content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        representations = {None: representation(path)}
+        for encoding, suffix in VARIANTS.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                representations[encoding] = representation(variant, encoding)
+        return StaticFile(
+            content_type=content_type,
+            last_modified=http_date(path.stat().st_mtime),
+            cache_control=IMMUTABLE if name in self.hashed_names() else f'public, max-age={settings.STATIC_MAX_AGE}',
+            representations=representations,
+        )
+
+    def hashed_names(self):
+        if self.immutable_names is None:
+            # the manifest of CompressedManifestStaticFilesStorage, empty with another storage
+            self.immutable_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self.immutable_names
+
+    def respond(self, request, static_file, stream):
+        encoding = None
+        if static_file.encodings:
+            encoding = negotiate(request.headers.get('Accept-Encoding', ''), static_file.encodings)
+        chosen = static_file.representations[encoding]
+
+        if chosen.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=static_file.content_type)
+            response.headers['Content-Length'] = str(chosen.size)
+        elif stream:
+            response = FileResponse(
+                open(chosen.path, 'rb'), content_type=static_file.content_type, filename=os.path.basename(request.path_info),
+            )
+        else:
+            with open(chosen.path, 'rb') as file:
+                response = HttpResponse(file.read(), content_type=static_file.content_type)
+
+        if encoding is not None and response.status_code == 200:
+            response.headers['Content-Encoding'] = encoding
+        if static_file.encodings:
+            response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['ETag'] = chosen.etag
+        response.headers['Last-Modified'] = static_file.last_modified
+        response.headers['Cache-Control'] = static_file.cache_control
+        return response
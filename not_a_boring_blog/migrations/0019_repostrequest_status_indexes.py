@@ -0,0 +1,21 @@
+# Generated by Django 4.2.4 on 2026-10-19 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0018_alter_post_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repostrequest',
+            index=models.Index(fields=['post_id', 'status', 'created_at'], name='repost_post_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repostrequest',
+            index=models.Index(fields=['requester_id', 'status', 'created_at'], name='repost_requester_status_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-19 11:28
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_repost_requests(apps, schema_editor):
+    # the old read-then-insert could race, keep the first request of every (requester, post) pair
+    RepostRequest = apps.get_model('not_a_boring_blog', 'RepostRequest')
+    duplicates = (
+        RepostRequest.objects.values('requester_id', 'post_id')
+        .annotate(first_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for duplicate in duplicates.iterator():
+        RepostRequest.objects.filter(
+            requester_id=duplicate['requester_id'],
+            post_id=duplicate['post_id'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0019_repostrequest_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_repost_requests, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='repostrequest',
+            constraint=models.UniqueConstraint(fields=('requester_id', 'post_id'), name='unique_repost_request_per_post'),
+        ),
+    ]
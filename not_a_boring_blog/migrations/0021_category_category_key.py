@@ -0,0 +1,37 @@
+# Generated by Django 4.2.4 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+def fill_category_keys(apps, schema_editor):
+    Category = apps.get_model('not_a_boring_blog', 'Category')
+    used = set()
+    for category in Category.objects.order_by('id'):
+        key = category.category_name.strip().casefold()
+        if key in used:
+            # "AI" and "Ai" could both exist before, the later one keeps a distinct key
+            key = f'{key}-{category.id}'
+        used.add(key)
+        category.category_key = key
+        category.save(update_fields=['category_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0020_repostrequest_unique_per_post'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='category_key',
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(fill_category_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='category_key',
+            field=models.CharField(editable=False, max_length=255, unique=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.4 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def move_bodies(apps, schema_editor):
+    Post = apps.get_model('not_a_boring_blog', 'Post')
+    PostContent = apps.get_model('not_a_boring_blog', 'PostContent')
+    db_alias = schema_editor.connection.alias
+    # in id order and in batches, a big table is never loaded whole
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.using(db_alias).filter(id__gt=last_id).order_by('id').values_list('id', 'body')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        PostContent.objects.using(db_alias).bulk_create([PostContent(post_id=post_id, body=body) for post_id, body in batch])
+        last_id = batch[-1][0]
+
+
+def restore_bodies(apps, schema_editor):
+    Post = apps.get_model('not_a_boring_blog', 'Post')
+    PostContent = apps.get_model('not_a_boring_blog', 'PostContent')
+    db_alias = schema_editor.connection.alias
+    contents = PostContent.objects.using(db_alias).order_by('post_id').values_list('post_id', 'body')
+    for post_id, body in contents.iterator(chunk_size=BATCH_SIZE):
+        Post.objects.using(db_alias).filter(id=post_id).update(body=body)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0021_category_category_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostContent',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='not_a_boring_blog.post')),
+                ('body', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(move_bodies, restore_bodies),
+        # a default, so that the column can be added back to existing rows when migrating backwards
+        migrations.AlterField(
+            model_name='post',
+            name='body',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='body',
+        ),
+    ]
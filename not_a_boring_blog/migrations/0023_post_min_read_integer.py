@@ -0,0 +1,72 @@
+# Generated by Django 4.2.4 on 2026-10-19 14:05
+
+import re
+
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+BATCH_SIZE = 1000
+
+
+def parse_minutes(text):
+    """Leading integer of the free text ("5", "5 min"), 1 when there is none"""
+    match = re.match(r'\s*(\d+)', text or '')
+    return max(1, int(match.group(1))) if match else 1
+
+
+def convert_min_read(apps, schema_editor):
+    # the free text is only parsed here, backfill_reading_time recomputes the minutes from the bodies
+    Post = apps.get_model('not_a_boring_blog', 'Post')
+    db_alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.using(db_alias).filter(id__gt=last_id).order_by('id').only('id', 'min_read_text')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.min_read = parse_minutes(post.min_read_text)
+        Post.objects.using(db_alias).bulk_update(batch, ['min_read'])
+        last_id = batch[-1].id
+
+
+def restore_min_read(apps, schema_editor):
+    Post = apps.get_model('not_a_boring_blog', 'Post')
+    db_alias = schema_editor.connection.alias
+    Post.objects.using(db_alias).update(min_read_text=Cast('min_read', models.CharField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0022_postcontent'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='post',
+            old_name='min_read',
+            new_name='min_read_text',
+        ),
+        # a default, so that the column can be added back to existing rows when migrating backwards
+        migrations.AlterField(
+            model_name='post',
+            name='min_read_text',
+            field=models.CharField(default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='min_read',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(convert_min_read, restore_min_read),
+        migrations.RemoveField(
+            model_name='post',
+            name='min_read_text',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'min_read'], name='post_status_min_read_idx'),
+        ),
+    ]
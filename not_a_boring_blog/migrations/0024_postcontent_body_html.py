@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0023_post_min_read_integer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcontent',
+            name='body_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='postcontent',
+            name='html_key',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+    ]
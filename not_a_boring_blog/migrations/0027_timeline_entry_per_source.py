@@ -0,0 +1,25 @@
+# Generated by Django 4.2.4 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('not_a_boring_blog', '0026_follow_timelineentry'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='timelineentry',
+            name='unique_timeline_entry',
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('reposted_by', None)), fields=('user', 'post'), name='unique_timeline_post'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post', 'reposted_by'), name='unique_timeline_repost'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Follow(models.Model):
+    """A user following an author: the author's published posts and approved reposts go to the user's timeline"""
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'author'], name='unique_follow'),
+        ]
+        indexes = [
+            # the fan-out of a post walks the followers of its author
+            models.Index(fields=['author', 'follower'], name='follow_author_follower_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.follower_id} -> {self.author_id}'
@@ -1,15 +1,60 @@
 # The above code defines two Django models, Category and Post, with various fields and relationships.
-from django.db import models
+from django.db import models, transaction
 from .user import Role
 from django.contrib.auth.models import User
+from ..markup import html_key, render_body
+from ..reading_time import count_words, reading_minutes
+
 
 class Category(models.Model):
     """Category model"""
     category_name = models.CharField(max_length=255, unique=True)
+    # case-insensitive lookup key, "AI", "ai" and "Ai" are the same category
+    category_key = models.CharField(max_length=255, unique=True, editable=False)
 
     def __str__(self):
         return self.category_name
 
+    def save(self, *args, **kwargs):
+        self.category_key = self.normalize_name(self.category_name)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def normalize_name(name):
+        return name.strip().casefold()
+
+    def move_posts(self, target, post_ids=None, chunk_size=1000, on_moved=None):
+        """Moves posts from this category to target, chunk_size posts per transaction.
+
+        Works on the m2m through table only (no m2m_changed signals), so merging a category
+        into another across many posts costs two queries per chunk. on_moved(post_ids) is called
+        with the ids of every chunk inside its transaction. Returns the number of moved posts.
+        """
+        through = Post.category.through
+        links = through.objects.filter(category_id=self.pk)
+        if post_ids is not None:
+            links = links.filter(post_id__in=post_ids)
+
+        moved = 0
+        last_post_id = 0
+        while True:
+            chunk = list(
+                links.filter(post_id__gt=last_post_id).order_by('post_id').values_list('post_id', flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            with transaction.atomic():
+                through.objects.bulk_create(
+                    [through(post_id=post_id, category_id=target.pk) for post_id in chunk],
+                    ignore_conflicts=True,
+                )
+                through.objects.filter(category_id=self.pk, post_id__in=chunk).delete()
+                if on_moved is not None:
+                    on_moved(chunk)
+            moved += len(chunk)
+            last_post_id = chunk[-1]
+        return moved
+
 
 class Post(models.Model):
     """Post model"""
@@ -20,28 +65,109 @@ class Post(models.Model):
     ]
     category = models.ManyToManyField(Category, related_name='posts') # on_delete=models.CASCADE is not applied in ManyToMany
     title = models.CharField(max_length=255)
-    body = models.TextField()
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
     status = models.CharField(max_length=20, choices=STATUS)
     created_at = models.DateTimeField(auto_now_add=True) # the field will be automatically set to the current timestamp when a new object is created. It will not change when the object is updated in the future.
     last_updated = models.DateTimeField(auto_now=True) # the field will be automatically updated to the current timestamp every time the object is saved (updated), regardless of whether it's a new object or an existing one
-    min_read = models.CharField(max_length=50)
+    # minutes, computed from the word count of the body on save
+    min_read = models.PositiveIntegerField(default=1, editable=False)
     description = models.CharField(max_length=200)
 
     class Meta:
         ordering = ['-last_updated', '-created_at']
+        indexes = [
+            # ?min_read=, ?max_read= and ?ordering=min_read on the published posts
+            models.Index(fields=['status', 'min_read'], name='post_status_min_read_idx'),
+            # the recent posts of the followed authors read along with a timeline
+            models.Index(fields=['user_id', 'status', 'created_at'], name='post_user_status_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    @property
+    def body(self):
+        """The body, kept in PostContent: select_related('content') loads it with the post"""
+        return self.content.body
+
+    @body.setter
+    def body(self, value):
+        # Post(body=...) and post.body = ... work as with a column, save() writes the content row
+        try:
+            content = self.content
+        except PostContent.DoesNotExist:
+            content = self.content = PostContent(post=self)
+        if content._state.adding or content.body != value:
+            content.body = value
+            self._content_changed = True
+
+    def save(self, *args, **kwargs):
+        if not getattr(self, '_content_changed', False):
+            return super().save(*args, **kwargs)
+        self.min_read = reading_minutes(count_words(self.content.body))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'min_read' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'min_read']
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            content = self.content
+            content.post = self
+            # a new content row is inserted right away, no UPDATE attempt first
+            content.save(force_insert=content._state.adding, using=kwargs.get('using'))
+        self._content_changed = False
     
     def update_categories(self, categories):
-        post_categories = self.category.all()
-        list_categories = [category.id for category in post_categories]
-        
-        for category in post_categories:
-            if category.id not in categories:
-                self.category.remove(category)
-        
-        for category in categories:
-            if category not in list_categories:
-                self.category.add(category)
+        """Sets the categories of the post (ids or Category instances).
+
+        The diff is done by the database: one DELETE of the links that are not wanted anymore
+        and one INSERT of the wanted ones, which skips the links that already exist.
+        """
+        through = Post.category.through
+        category_ids = {int(getattr(category, 'pk', category)) for category in categories}
+
+        with transaction.atomic():
+            through.objects.filter(post_id=self.pk).exclude(category_id__in=category_ids).delete()
+            through.objects.bulk_create(
+                [through(post_id=self.pk, category_id=category_id) for category_id in category_ids],
+                ignore_conflicts=True,
+            )
+
+
+class PostContent(models.Model):
+    """The body of a post, apart from the post row.
+
+    Feeds, counts and status filters scan the small post rows only; the post detail reads the
+    body through one join (select_related('content')), the lists never read this table.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='content')
+    body = models.TextField()
+    # the sanitized HTML of the body and the key it was rendered for, see markup.py
+    body_html = models.TextField(default='', editable=False)
+    html_key = models.CharField(max_length=64, default='', editable=False)
+
+    def __str__(self):
+        return str(self.pk)
+
+    def save(self, *args, **kwargs):
+        self.render_html()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'body' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'body_html', 'html_key'}
+        super().save(*args, **kwargs)
+
+    def render_html(self):
+        """Renders the body unless the stored HTML is already the one of this body and renderer.
+
+        Returns True when it rendered.
+        """
+        key = html_key(self.body)
+        if key == self.html_key:
+            return False
+        self.body_html, self.html_key = render_body(self.body), key
+        return True
+
+    def rendered_html(self):
+        """The HTML of the body, rendered and stored first when it is missing or stale"""
+        if self.render_html() and not self._state.adding:
+            type(self).objects.filter(pk=self.pk).update(body_html=self.body_html, html_key=self.html_key)
+        return self.body_html
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, connections, router
+from django.utils import timezone
 from .post import Post
 from django.contrib.auth.models import User
 
@@ -18,4 +19,36 @@ class RepostRequest(models.Model):
 
     class Meta:
         ordering = ['-status', 'created_at']
+        indexes = [
+            # inbox of the post author: joined through post_id, filtered by status
+            models.Index(fields=['post_id', 'status', 'created_at'], name='repost_post_status_idx'),
+            # requests sent by a user, filtered by status
+            models.Index(fields=['requester_id', 'status', 'created_at'], name='repost_requester_status_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['requester_id', 'post_id'], name='unique_repost_request_per_post'),
+        ]
 
+
+    @classmethod
+    def create_requested(cls, requester_id, post_id):
+        """Creates a 'requested' repost request in one INSERT ... SELECT round trip.
+
+        The row is selected from the post table, so nothing is inserted (and False is returned)
+        when the post does not exist. A second request for the same post raises IntegrityError
+        from the unique constraint.
+        """
+        connection = connections[router.db_for_write(cls)]
+        qn = connection.ops.quote_name
+        columns = ', '.join(
+            qn(cls._meta.get_field(name).column) for name in ('requester_id', 'post_id', 'status', 'created_at')
+        )
+        post_pk = qn(Post._meta.pk.column)
+        sql = (
+            f'INSERT INTO {qn(cls._meta.db_table)} ({columns}) '
+            f'SELECT %s, {post_pk}, %s, %s FROM {qn(Post._meta.db_table)} WHERE {post_pk} = %s'
+        )
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [requester_id, 'requested', created_at, post_id])
+            return cursor.rowcount == 1
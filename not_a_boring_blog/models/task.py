@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+PENDING = 'pending'
+RUNNING = 'running'
+FAILED = 'failed'
+
+
+class Task(models.Model):
+    """Work deferred out of a request, run by the run_tasks worker (see tasks.py).
+
+    A task is deleted once it ran; the ones out of attempts stay here as 'failed' with their last error.
+    """
+    STATUS = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # not run before, pushed back after a failure
+    run_after = models.DateTimeField(default=timezone.now)
+    # the claim of the worker running it, locked_at is when it was claimed
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # the worker's poll: the ready tasks, oldest first
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,31 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .post import Post
+
+
+class TimelineEntry(models.Model):
+    """A post in the home timeline of a user, written when the post is published or reposted (see timelines.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    # the followed user who reposted the post, None for a post of a followed author
+    reposted_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+    # the order of the timeline: the creation of the post, or the approval of the repost
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # one entry per way a post reached the timeline: from its author, and from each reposter, so
+            # unfollowing one of them leaves the entries that came through the others
+            models.UniqueConstraint(
+                fields=['user', 'post'], condition=models.Q(reposted_by=None), name='unique_timeline_post',
+            ),
+            models.UniqueConstraint(fields=['user', 'post', 'reposted_by'], name='unique_timeline_repost'),
+        ]
+        indexes = [
+            # a page of a timeline is one range of this index
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
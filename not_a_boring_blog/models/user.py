@@ -9,6 +9,8 @@ class Role(models.Model):
     is_blogger = models.BooleanField(default=False)
     is_admin = models.BooleanField(default=False)
     bio = models.CharField(max_length=500)
+    # kept up to date by follow and unfollow, decides between fan-out on write and on read (timelines.py)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.user.username
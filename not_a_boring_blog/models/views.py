@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from .user import User
 from .post import Post
 
@@ -7,4 +8,5 @@ class View(models.Model):
     """View model - registers views on posts"""
     post_id = models.ForeignKey(Post, on_delete=models.CASCADE)
     user_id = models.ForeignKey(User, on_delete=models.CASCADE)
-    timestamp = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    # the time of the request, the view is written later by the record_views task
+    timestamp = models.DateTimeField(default=timezone.now)
\ No newline at end of file
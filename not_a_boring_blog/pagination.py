@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class RepostRequestCursorPagination(CursorPagination):
+    """Cursor pagination for the repost request inboxes.
+
+    Pages are read with a keyset on created_at, so deep pages cost the same
+    as the first one.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,25 @@
+"""JSON parsing with orjson when it is installed, see renderers.py"""
+import codecs
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        # orjson reads UTF-8 and, like STRICT_JSON, rejects NaN and Infinity
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # the json module reports the error (or reads what orjson cannot, integers over 64 bits)
+            return super().parse(BytesIO(content), media_type, parser_context)
@@ -0,0 +1,39 @@
+"""Reading time of a post, in whole minutes, from the word count of its body.
+
+A word is a run of UTF-8 bytes above 0x20: spaces and control characters separate words. The
+count done on save and the vectorized count of the backfill use that same definition, they
+always agree. count_words_batch counts a whole batch of bodies with NumPy: the bodies are joined
+with a space in front of each, a word starts at every word byte that follows a separator, and
+the starts are attributed to their body with one binary search over the body ends. Without NumPy
+the bodies are counted one by one. NumPy is imported by the first batch only, it would add a tenth
+of a second to the boot of every server process that never counts a batch.
+"""
+import math
+
+WORDS_PER_MINUTE = 200
+# every byte up to the space separates words, bytes.split() only knows the ASCII whitespace
+SEPARATORS = bytes.maketrans(bytes(range(0x21)), b' ' * 0x21)
+
+
+def count_words(text):
+    return len(text.encode().translate(SEPARATORS).split())
+
+
+def reading_minutes(words):
+    """At least one minute, a started minute counts"""
+    return max(1, math.ceil(words / WORDS_PER_MINUTE))
+
+
+def count_words_batch(texts):
+    """[count_words(text) for text in texts], in one pass over all the texts"""
+    try:
+        import numpy as np
+    except ImportError:
+        return [count_words(text) for text in texts]
+    encoded = [text.encode() for text in texts]
+    data = np.frombuffer(b' ' + b' '.join(encoded), dtype=np.uint8)
+    # position of the space after each body, counted from the leading space
+    ends = np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) + 1)
+    word = data > 0x20
+    starts = np.flatnonzero(word[1:] > word[:-1])
+    return np.diff(np.searchsorted(starts, ends), prepend=0).tolist()
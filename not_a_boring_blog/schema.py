@@ -0,0 +1,67 @@
+"""The OpenAPI schema, generated once by "manage.py build_schema" instead of on every request.
+
+Generating the schema introspects every view and serializer and parses the long HTML docstrings
+of the views, hundreds of milliseconds of CPU per request. build_schema writes the YAML and JSON
+documents to SCHEMA_DIR at deploy time; the server reads each file once, keeps its bytes in
+memory and serves them with a strong ETag, the hash of the bytes, so an unchanged schema
+costs clients a 304.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+# format of the negotiated renderer -> renderer writing the artifact
+RENDERERS = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+
+# mkstemp creates the files 0600: readable by the server whatever user it runs as
+ARTIFACT_MODE = 0o644
+
+# format -> (content, etag) of the artifacts read by this process
+_artifacts = {}
+
+
+def artifact_path(format):
+    return Path(settings.SCHEMA_DIR) / f'openapi.{format}'
+
+
+def etag(content):
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def generate_schema():
+    """{format: bytes} of the schema generated from the code"""
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return {format: renderer().render(schema) for format, renderer in RENDERERS.items()}
+
+
+def write_schema(documents):
+    directory = Path(settings.SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for format, content in documents.items():
+        # written aside and renamed, a server starting meanwhile never reads half a file
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(content)
+        os.chmod(temporary, ARTIFACT_MODE)
+        os.replace(temporary, artifact_path(format))
+
+
+def load_schema(format):
+    """(content, etag) of the built schema in this format, None when it has not been built or cannot be read"""
+    artifact = _artifacts.get(format)
+    if artifact is None:
+        try:
+            content = artifact_path(format).read_bytes()
+        except OSError:
+            return None
+        artifact = _artifacts[format] = (content, etag(content))
+    return artifact
+
+
+def clear_schema_cache():
+    _artifacts.clear()
@@ -9,19 +9,24 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class CategoriesSerializer(serializers.ModelSerializer):
-    num_posts = serializers.SerializerMethodField()
-    num_published_posts = serializers.SerializerMethodField()
+    # both counts are annotated on the queryset, see ListCategories
+    num_posts = serializers.IntegerField(read_only=True)
+    num_published_posts = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Category
         fields = ['id', 'category_name', 'num_posts', 'num_published_posts']
 
-    def get_num_posts(self, obj):
-        return obj.posts.count()
 
-    def get_num_published_posts(self, obj):
-        return obj.posts.filter(status='published').count()
+class CategoryFilterSerializer(serializers.Serializer):
+    category_id = serializers.CharField(max_length=255)
 
+class RecategorizePostsSerializer(serializers.Serializer):
+    from_category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    to_category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    post_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
 
-class CategoryFilterSerializer(serializers.Serializer):
-    category_id = serializers.CharField(max_length=255)
\ No newline at end of file
+    def validate(self, data):
+        if data['from_category'] == data['to_category']:
+            raise serializers.ValidationError("from_category and to_category must be different.")
+        return data
@@ -1,5 +1,10 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from ..models.comment import Comment
+from .sparse import SparseFieldsMixin
+
+# the replies with their authors
+REPLIES = Prefetch('replies', queryset=Comment.objects.select_related('author'))
 
 
 class ReplyCommentSerializer(serializers.ModelSerializer):
@@ -34,18 +39,28 @@ class ReplyDetailsSerializer(serializers.ModelSerializer):
         return obj.author.username
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     replies = ReplyDetailsSerializer(many=True)
     author_username = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(format="%d-%B-%Y %H:%M", required=False)
+    replies_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Comment
-        fields = ['id', 'post_id', 'author_username', 'body', 'created_at', 'author', 'replies']
+        fields = ['id', 'post_id', 'author_username', 'body', 'created_at', 'author', 'replies', 'replies_count']
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['replies_count'] = instance.replies.count()
-        return representation
+    sparse_select = {'author_username': ['author__username']}
+    sparse_prefetch = {'replies': [REPLIES], 'replies_count': [REPLIES]}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is not None:
+            return cls.sparse_queryset(queryset, fields)
+        # the replies are prefetched with their authors, replies_count is then counted in memory
+        return queryset.select_related('author').prefetch_related(REPLIES)
 
     def get_author_username(self, obj):
         return obj.author.username
+
+    def get_replies_count(self, obj):
+        return obj.replies.count()
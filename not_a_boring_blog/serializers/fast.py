@@ -0,0 +1,222 @@
+"""Read-only fast path for list responses: serializer_class(rows, many=True).data without the per-row DRF machinery.
+
+For every serializer class a field plan is built once: one plain function per readable field,
+chosen from the field type (attribute lookup plus str/int for the simple model fields, the pk
+of a foreign key, the bound get_<name> of a SerializerMethodField, a nested plan for nested
+serializers). Rendering a row is then a dict built from those calls, with the same values, in
+the same order, as Serializer.to_representation. Field types without a shortcut fall back to
+their own get_attribute/to_representation, so the output stays the same either way.
+
+Limits: serializers overriding to_representation are rendered by DRF, and the plans are shared
+between requests, so get_<name> methods must not read self.context.
+"""
+from collections.abc import Mapping
+from contextvars import ContextVar
+from operator import attrgetter, itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models.manager import BaseManager
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations, serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
+
+SKIP = object()
+# to_representation of these is a plain conversion of the model value
+CONVERTERS = {
+    fields.CharField: str,
+    fields.EmailField: str,
+    fields.SlugField: str,
+    fields.URLField: str,
+    fields.IntegerField: int,
+    fields.ReadOnlyField: None,
+}
+# these convert with their own to_representation, after the None check
+FIELD_CONVERTERS = (fields.DateField, fields.ChoiceField, fields.BooleanField)
+
+_plans = {}
+# the timezone of DateTimeField, looked up once per fast_data call instead of once per value
+current_timezone = ContextVar('current_timezone', default=None)
+
+
+def without_none(get, convert=None):
+    if convert is None:
+        return get
+
+    def value(row):
+        attribute = get(row)
+        return None if attribute is None else convert(attribute)
+    return value
+
+
+def related(get):
+    """The related object (None when missing, as DRF's get_attribute)"""
+    def value(row):
+        try:
+            return get(row)
+        except ObjectDoesNotExist:
+            return None
+    return value
+
+
+def generic(field):
+    """Serializer.to_representation for one field, the fallback of every shortcut"""
+    def value(row):
+        try:
+            attribute = field.get_attribute(row)
+        except SkipField:
+            return SKIP
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        return None if check_for_none is None else field.to_representation(attribute)
+    return value
+
+
+def datetime_converter(field):
+    """DateTimeField.to_representation for aware datetimes in the current timezone, DRF's for the rest"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or hasattr(field, 'timezone'):
+        return field.to_representation
+    iso_8601 = output_format.lower() == ISO_8601
+
+    def convert(value):
+        field_timezone = current_timezone.get()
+        if field_timezone is None or isinstance(value, str) or not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone)
+        if not iso_8601:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def overrides_representation(serializer_class):
+    return serializer_class.to_representation not in (
+        serializers.Serializer.to_representation, serializers.ListSerializer.to_representation
+    )
+
+
+class FieldPlan:
+    def __init__(self, serializer, mapping=False):
+        self.mapping = mapping
+        self.model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+        self.skips = False  # a generic getter can skip its field
+        self.getters = tuple((field.field_name, self.compile(field)) for field in serializer._readable_fields)
+
+    def attribute(self, name):
+        return itemgetter(name) if self.mapping else attrgetter(name)
+
+    def compile(self, field):
+        if isinstance(field, fields.SerializerMethodField):
+            return getattr(field.parent, field.method_name)
+
+        source_attrs = field.source_attrs
+        if len(source_attrs) != 1 or self.model is None:
+            return self.generic(field)
+        source = source_attrs[0]
+        column = model_field(self.model, source)
+        # a model column, or a key of the .values() dict
+        concrete = self.mapping or (column is not None and column.concrete)
+
+        if isinstance(field, serializers.ListSerializer) and not self.mapping and column is not None:
+            if overrides_representation(type(field.child)):
+                return self.generic(field)
+            child = FieldPlan(field.child).render
+            get = related(attrgetter(source))
+
+            def value(row):
+                items = get(row)
+                if items is None:
+                    return None
+                if isinstance(items, BaseManager):
+                    items = items.all()
+                return [child(item) for item in items]
+            return value
+
+        if isinstance(field, serializers.BaseSerializer) and not self.mapping and column is not None:
+            if overrides_representation(type(field)):
+                return self.generic(field)
+            return without_none(related(attrgetter(source)), FieldPlan(field).render)
+
+        if isinstance(field, relations.ManyRelatedField) and not self.mapping and column is not None:
+            child_relation = field.child_relation
+            convert = str if type(child_relation) is relations.StringRelatedField else child_relation.to_representation
+            get = attrgetter(source)
+            # prefetch_related('<many to many field>') caches the rows under the field name
+            prefetched = source if column.many_to_many and column.concrete else None
+
+            def value(row):
+                if row.pk is None:
+                    return []
+                cache = getattr(row, '_prefetched_objects_cache', None)
+                items = cache[prefetched] if cache and prefetched in cache else get(row).all()
+                return [convert(item) for item in items]
+            return value
+
+        if type(field) is relations.PrimaryKeyRelatedField and field.pk_field is None and concrete:
+            # the pk only optimization of RelatedField: the foreign key column, no query
+            if self.mapping:
+                return itemgetter(source)
+            if column.many_to_one or column.one_to_one:
+                return attrgetter(column.attname)
+            return self.generic(field)
+
+        if type(field) in CONVERTERS and concrete:
+            return without_none(self.attribute(source), CONVERTERS[type(field)])
+
+        if type(field) is fields.DateTimeField and concrete:
+            return without_none(self.attribute(source), datetime_converter(field))
+
+        if type(field) in FIELD_CONVERTERS and concrete:
+            return without_none(self.attribute(source), field.to_representation)
+
+        return self.generic(field)
+
+    def generic(self, field):
+        self.skips = True
+        return generic(field)
+
+    def render(self, row):
+        if not self.skips:
+            return {name: get(row) for name, get in self.getters}
+        representation = {}
+        for name, get in self.getters:
+            value = get(row)
+            if value is not SKIP:
+                representation[name] = value
+        return representation
+
+
+def get_plan(serializer_class, mapping=False, fields=None):
+    """The FieldPlan of the class (of the given fields only, see serializers/sparse.py), None when it cannot have one"""
+    key = (serializer_class, mapping, fields)
+    if key not in _plans:
+        kwargs = {} if fields is None else {'fields': fields}
+        _plans[key] = None if overrides_representation(serializer_class) else FieldPlan(serializer_class(**kwargs), mapping)
+    return _plans[key]
+
+
+def fast_data(serializer_class, rows, fields=None):
+    """serializer_class(rows, many=True, fields=fields).data, from model instances or .values(*sources) dicts"""
+    if isinstance(rows, BaseManager):
+        rows = rows.all()
+    rows = list(rows)
+    plan = get_plan(serializer_class, bool(rows) and isinstance(rows[0], Mapping), fields)
+    if plan is None or not settings.FAST_SERIALIZERS:
+        kwargs = {} if fields is None else {'fields': fields}
+        return serializer_class(rows, many=True, **kwargs).data
+    render = plan.render
+    token = current_timezone.set(timezone.get_current_timezone() if settings.USE_TZ else None)
+    try:
+        return [render(row) for row in rows]
+    finally:
+        current_timezone.reset(token)
@@ -1,15 +1,16 @@
 from rest_framework import serializers
-from ..models.post import Category, Post
+from ..models.post import Category, Post, PostContent
 from rest_framework.exceptions import ValidationError
 from datetime import date, datetime
 from django.utils.html import strip_tags
 from ..models.user import Role, User
 from .category import CategorySerializer
+from .sparse import SparseFieldsMixin
 from datetime import datetime
         
 class UniqueBodyValidator:
     def __call__(self, value):
-        if Post.objects.filter(body=value).exists():
+        if PostContent.objects.filter(body=value).exists():
             raise ValidationError(f'Post with the same body already exists! Please choose another text')
 
 
@@ -37,13 +38,21 @@ class DateField(serializers.ReadOnlyField):
 
 class PostUpdateSerializer(serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), many=True)
+    body = serializers.CharField()
 
     class Meta:
         model = Post
         fields = ['title', 'category', 'status', 'min_read', 'description', 'body', 'created_at', 'last_updated']
 
+    def update(self, instance, validated_data):
+        categories = validated_data.pop('category', None)
+        instance = super().update(instance, validated_data)
+        if categories is not None:
+            instance.update_categories(categories)
+        return instance
 
-class PostSerializer(serializers.ModelSerializer):
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     last_updated = serializers.DateTimeField(format="%d-%B-%Y %H:%M", validators=[DateValidator()], required=False)
     title = serializers.CharField(required=True, max_length=255)
     created_at = serializers.DateTimeField(format="%d-%B-%Y %H:%M", validators=[DateValidator()], required=False)
@@ -51,10 +60,19 @@ class PostSerializer(serializers.ModelSerializer):
     user_id = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
     author = serializers.SerializerMethodField()
     bio = serializers.SerializerMethodField()
+    sparse_select = {'author': ['user_id__username'], 'bio': ['user_id__role__bio']}
+    sparse_prefetch = {'category': ['category']}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is not None:
+            return cls.sparse_queryset(queryset, fields)
+        # author, role and categories are read for every post, loaded up front they cost
+        # two queries for the whole list instead of three per post
+        return queryset.select_related('user_id__role').prefetch_related('category')
 
     def get_bio(self, obj):
-        role = Role.objects.get(user=obj.user_id)
-        return role.bio
+        return obj.user_id.role.bio
     def get_author(self, obj):
         return obj.user_id.username
 
@@ -68,8 +86,31 @@ class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        # no body: the lists never read the content table, see PostDetailSerializer
         fields = ['id', 'title', 'user_id', 'author','bio', 'category', 'status',
-                  'min_read', 'description', 'body', 'created_at', 'last_updated']
+                  'min_read', 'description', 'created_at', 'last_updated']
+
+
+class PostDetailSerializer(PostSerializer):
+    body = serializers.CharField(source='content.body', read_only=True)
+    # rendered once per edit and stored, see markup.py
+    body_html = serializers.CharField(source='content.rendered_html', read_only=True)
+    optional_fields = ('body_html',)
+
+    class Meta(PostSerializer.Meta):
+        fields = ['id', 'title', 'user_id', 'author','bio', 'category', 'status',
+                  'min_read', 'description', 'body', 'body_html', 'created_at', 'last_updated']
+
+    # rendered_html() compares the stored key with the body before returning the stored HTML
+    sparse_select = {**PostSerializer.sparse_select, 'body': ['content__body'],
+                     'body_html': ['content__body', 'content__body_html', 'content__html_key']}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is not None:
+            return cls.sparse_queryset(queryset, fields)
+        # the body is joined like the author, one query for the post and one for its categories
+        return super().setup_eager_loading(queryset).select_related('content')
 
 
 class PostCreateSerializer(serializers.ModelSerializer):
@@ -85,6 +126,12 @@ class PostCreateSerializer(serializers.ModelSerializer):
     def validate_description(self, value):
         return strip_tags(value)
 
+    def create(self, validated_data):
+        categories = validated_data.pop('category', [])
+        post = super().create(validated_data)
+        post.update_categories(categories)
+        return post
+
 
 class HidePostSerializer(serializers.ModelSerializer):
     status = serializers.CharField(default='editing')
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..models.repost_request import RepostRequest
+from ..models.repost_request import RepostRequest, STATUS
 
 
 class RepostSerializer(serializers.ModelSerializer):
@@ -16,12 +16,31 @@ class RepostSerializer(serializers.ModelSerializer):
 
 
 class RepostRequestListSerializer(serializers.ModelSerializer):
+    # read from the select_related post and requester, no extra query per row
+    post_title = serializers.CharField(source='post_id.title', read_only=True)
+    requester_username = serializers.CharField(source='requester_id.username', read_only=True)
+
     class Meta:
         model = RepostRequest
-        fields = ['id', 'post_id', 'requester_id', 'status', 'created_at']
+        fields = ['id', 'post_id', 'post_title', 'requester_id', 'requester_username', 'status', 'created_at']
+
+
+class RepostRequestFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=STATUS, required=False)
 
 
 class UpdateRepostRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = RepostRequest
-        fields = ['status']
\ No newline at end of file
+        fields = ['status']
+
+class BulkUpdateRepostRequestSerializer(serializers.Serializer):
+    '''Selects the requests either by id or as "all pending requests of a post"'''
+    status = serializers.ChoiceField(choices=['approved', 'denied'])
+    request_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000)
+    post_id = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if ('request_ids' in data) == ('post_id' in data):
+            raise serializers.ValidationError("Provide either request_ids or post_id.")
+        return data
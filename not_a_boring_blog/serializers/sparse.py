@@ -0,0 +1,81 @@
+"""Sparse fieldsets: ?fields=title,author keeps only these fields of a list response, ?omit=body drops these,
+?include=body_html adds an optional field.
+
+The fields left out are not only dropped from the JSON, they are not read at all: the queryset
+loads the columns of the remaining fields (.only()) and joins or prefetches only the relations
+they go through, so leaving out "bio" skips the Role join and leaving out "body" keeps the post
+bodies in the database.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+def split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """Serializer keeping only the fields named in fields= (the dynamic fields pattern of the DRF docs)"""
+    # field name -> column lookups through foreign keys it reads, e.g. 'author': ['user_id__username'];
+    # a field listed in neither dict reads its own column
+    sparse_select = {}
+    # field name -> prefetch_related lookups it reads
+    sparse_prefetch = {}
+    # fields left out unless named in ?include=, for the ones that cost more than reading a column
+    optional_fields = ()
+
+    def __init__(self, *args, fields=None, include=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in set(self.optional_fields) - set(include):
+            self.fields.pop(name)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        """The field names ?fields= and ?omit= select, in the serializer's order, None when neither is given"""
+        selected, omitted = split(request.query_params.get('fields', '')), split(request.query_params.get('omit', ''))
+        if not selected and not omitted:
+            return None
+        names = list(cls().fields)
+        unknown = [name for name in selected + omitted if name not in names]
+        if unknown:
+            raise ValidationError({'fields': [f'Unknown field: {name}.' for name in unknown]})
+        return tuple(name for name in names if (not selected or name in selected) and name not in omitted)
+
+    @classmethod
+    def included_fields(cls, request):
+        """The optional field names ?include= asks for"""
+        names = split(request.query_params.get('include', ''))
+        unknown = [name for name in names if name not in cls.optional_fields]
+        if unknown:
+            raise ValidationError({'include': [f'Unknown field: {name}.' for name in unknown]})
+        return tuple(names)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, fields):
+        """queryset loading only what the fields read"""
+        opts = queryset.model._meta
+        sources = {name: field.source for name, field in cls().fields.items()}
+        columns, related, prefetch = {opts.pk.name}, set(), {}
+        for name in fields:
+            for lookup in cls.sparse_prefetch.get(name, ()):
+                # a relation read by several fields is prefetched once
+                prefetch.setdefault(getattr(lookup, 'prefetch_to', lookup), lookup)
+            for lookup in cls.sparse_select.get(name, ()):
+                columns.add(lookup)
+                related.add(lookup.rpartition('__')[0])
+            if name in cls.sparse_select or name in cls.sparse_prefetch:
+                continue
+            try:
+                column = opts.get_field(sources[name])
+            except FieldDoesNotExist:
+                continue  # an annotation or a property
+            if column.concrete and not column.many_to_many:
+                columns.add(column.name)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch.values())
+        return queryset.only(*columns)
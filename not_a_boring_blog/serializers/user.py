@@ -2,6 +2,7 @@ from rest_framework import serializers
 from ..models.user import Role
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
+from .sparse import SparseFieldsMixin
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -27,12 +28,20 @@ class BioSerializer(serializers.ModelSerializer):
         fields = ['bio']
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     role = BioSerializer()
+    sparse_select = {'role': ['role__bio']}
+
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role']
 
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is not None:
+            return cls.sparse_queryset(queryset, fields)
+        return queryset.select_related('role')  # the bio comes with the same query
+
 
 class CustomUserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(max_length=255)
@@ -0,0 +1,78 @@
+"""Static files served by the application itself, for single-node deployments without S3 or nginx.
+
+collectstatic with CompressedManifestStaticFilesStorage copies every file twice: under its name
+and under a name holding a hash of its content (admin/css/base.5af66c1b1797.css), the hashed
+names being listed in staticfiles.json. Next to every compressible file it writes a .gz and,
+with brotli installed, a .br, compressed at the highest levels once instead of on every request.
+StaticFilesMiddleware (middleware/static.py) serves them.
+"""
+import gzip
+import mimetypes
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .middleware.compression import compressible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def compress_gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+# suffix of the variant -> compression, in the order the middleware prefers them
+PRECOMPRESSORS = {'.br': brotli and compress_brotli, '.gz': compress_gzip}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # below this size compression saves a few bytes at most
+    min_compress_size = 256
+    # a variant is kept when it is at most this fraction of the original
+    max_compress_ratio = 0.95
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # not collected (collectstatic not run yet, the tests): the plain name, served with a short cache
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | {self.hashed_files[name] for name in paths if name in self.hashed_files}
+        for name in sorted(names):
+            for variant in self.write_variants(name):
+                yield name, variant, True
+
+    def write_variants(self, name):
+        """Writes the precompressed variants of a file, returns their names"""
+        content_type, encoding = mimetypes.guess_type(posixpath.basename(name))
+        if encoding is not None or content_type is None or not compressible(content_type):
+            return []
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < self.min_compress_size:
+            return []
+        variants = []
+        for suffix, compress in PRECOMPRESSORS.items():
+            if compress is None:
+                continue
+            compressed = compress(content)
+            if len(compressed) > len(content) * self.max_compress_ratio:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+            variants.append(name + suffix)
+        return variants
@@ -0,0 +1,283 @@
+"""Background tasks stored in the database, run by "manage.py run_tasks".
+
+A request enqueues a task with enqueue(name, payload): one INSERT in the request's transaction, so
+a rolled back request leaves no task behind. A worker claims the oldest ready task together with the
+other ready tasks of the same name, up to the batch size of the task, and hands all their payloads
+to the task function in one call: the views of a thousand requests are written by a few queries.
+
+Claiming marks the tasks 'running' with an UPDATE conditioned on them still being 'pending', so two
+workers never run the same task. On PostgreSQL the candidates are read with SELECT ... FOR UPDATE
+SKIP LOCKED and concurrent workers take different batches instead of waiting on each other. SQLite
+has no row locks: a transaction that reads then writes would have to upgrade its lock, and two
+workers doing so deadlock ("database is locked") instead of waiting. There the batch is claimed by
+a single UPDATE whose subquery picks the tasks, outside any transaction, which waits for the lock.
+
+A batch runs in a transaction with the deletion of its tasks, deleted first so that on SQLite the
+transaction takes the write lock before it reads anything. When it raises, its tasks are retried
+after TASK_RETRY_DELAY seconds, doubled on every attempt, and are left 'failed' after the task's
+max_attempts. A task still 'running' TASK_LOCK_TIMEOUT seconds after its claim (its worker died) is
+pending again.
+"""
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, close_old_connections, connections, router, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .metrics import TASK_DURATION, TASK_QUEUE_DEPTH, TASK_RUNS, VIEW_BUFFER_DEPTH, registry
+from .models.follow import Follow
+from .models.post import Post
+from .models.repost_request import RepostRequest
+from .models.task import FAILED, PENDING, RUNNING, Task
+from .models.views import View
+from .timelines import backfill, fan_out, is_fanned_out
+
+
+class TaskType(NamedTuple):
+    function: Callable
+    batch_size: int
+    max_attempts: int
+
+
+# name -> TaskType, filled by @task
+TASK_TYPES = {}
+
+# seconds a worker waits after a database error, doubled on each error in a row up to ERROR_DELAY_MAX
+ERROR_DELAY = 0.1
+ERROR_DELAY_MAX = 30
+
+
+def task(name, batch_size=100, max_attempts=None):
+    """Registers function(payloads) as the task name; it receives the payloads of up to batch_size tasks"""
+    def register(function):
+        TASK_TYPES[name] = TaskType(function, batch_size, max_attempts or settings.TASK_MAX_ATTEMPTS)
+        return function
+    return register
+
+
+def enqueue(name, payload, delay=0):
+    """Stores a task for the workers, run delay seconds from now at the earliest"""
+    if name not in TASK_TYPES:
+        raise ValueError(f'Unknown task: {name}')
+    return Task.objects.create(name=name, payload=payload, run_after=timezone.now() + timedelta(seconds=delay))
+
+
+def enqueue_many(name, payloads):
+    """Stores one task per payload with a single INSERT"""
+    if name not in TASK_TYPES:
+        raise ValueError(f'Unknown task: {name}')
+    now = timezone.now()
+    return Task.objects.bulk_create([Task(name=name, payload=payload, run_after=now) for payload in payloads])
+
+
+def pending_count(name=None):
+    tasks = Task.objects.filter(status=PENDING)
+    if name is not None:
+        tasks = tasks.filter(name=name)
+    return tasks.count()
+
+
+def requeue_stale():
+    """Makes the tasks of dead workers pending again, returns their number"""
+    expired = timezone.now() - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    return Task.objects.filter(status=RUNNING, locked_at__lt=expired).update(status=PENDING, locked_by='')
+
+
+def claim(worker):
+    """Claims the next batch: the oldest ready task and the ready ones of the same name.
+
+    Returns (name, tasks), (None, []) when no task is ready.
+    """
+    now = timezone.now()
+    token = f'{worker}/{uuid.uuid4().hex[:12]}'
+    using = router.db_for_write(Task)
+    ready = Task.objects.filter(status=PENDING, run_after__lte=now).order_by('run_after', 'id')
+    if connections[using].features.has_select_for_update_skip_locked:
+        ready = ready.select_for_update(skip_locked=True)
+        with transaction.atomic(using=using):
+            name = ready.values_list('name', flat=True).first()
+            if name is None:
+                return None, []
+            ids = list(ready.filter(name=name).values_list('id', flat=True)[:batch_size_of(name)])
+            # still pending: another worker may have claimed some since they were read
+            Task.objects.filter(id__in=ids, status=PENDING).update(
+                status=RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1,
+            )
+    else:
+        name = ready.values_list('name', flat=True).first()
+        if name is None:
+            return None, []
+        # one statement, reading and writing under the same lock; another worker may have claimed
+        # the oldest tasks since the name was read, the batch is then made of the next ones or empty
+        Task.objects.filter(
+            id__in=ready.filter(name=name).values('id')[:batch_size_of(name)], status=PENDING,
+        ).update(status=RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1)
+    return name, list(Task.objects.filter(locked_by=token).order_by('run_after', 'id'))
+
+
+def batch_size_of(name):
+    return TASK_TYPES[name].batch_size if name in TASK_TYPES else 1
+
+
+def run_batch(name, tasks):
+    """Runs claimed tasks of one name, returns their result: 'done', 'retried' or 'failed'"""
+    ids = [claimed.pk for claimed in tasks]
+    task_type = TASK_TYPES.get(name)
+    started = time.perf_counter()
+    try:
+        if task_type is None:
+            raise LookupError(f'Unknown task: {name}')
+        with transaction.atomic():
+            Task.objects.filter(id__in=ids).delete()
+            task_type.function([claimed.payload for claimed in tasks])
+    except Exception:
+        error = traceback.format_exc()
+        # the attempts of a batch are the same unless a retried task joined new ones
+        attempts = max(claimed.attempts for claimed in tasks)
+        if task_type is None or attempts >= task_type.max_attempts:
+            Task.objects.filter(id__in=ids).update(status=FAILED, locked_by='', last_error=error)
+            result = 'failed'
+        else:
+            delay = settings.TASK_RETRY_DELAY * 2 ** (attempts - 1)
+            Task.objects.filter(id__in=ids).update(
+                status=PENDING, locked_by='', last_error=error, run_after=timezone.now() + timedelta(seconds=delay),
+            )
+            result = 'retried'
+    else:
+        result = 'done'
+    TASK_RUNS.inc((name, result), len(tasks))
+    TASK_DURATION.observe((name,), time.perf_counter() - started)
+    return result
+
+
+class Worker:
+    """Runs the tasks batch by batch, polling the table every poll_interval seconds when idle"""
+
+    def __init__(self, name=None, poll_interval=None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = settings.TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+        # result -> number of tasks
+        self.results = {'done': 0, 'retried': 0, 'failed': 0}
+        self.stopping = False
+
+    def stop(self, *args):
+        """Stops after the batch being run, usable as a signal handler"""
+        self.stopping = True
+
+    def run(self, once=False):
+        """Runs until stop(), or until no task is ready with once"""
+        idle = True
+        # database errors in a row, the worker waits longer after each one
+        errors = 0
+        while not self.stopping:
+            # like the end of a request: drops the connections past CONN_MAX_AGE or broken
+            close_old_connections()
+            try:
+                if idle:
+                    requeue_stale()
+                idle = not self.run_once()
+            except OperationalError:
+                # database locked or unreachable: a task claimed meanwhile is requeued after TASK_LOCK_TIMEOUT
+                errors += 1
+                time.sleep(min(ERROR_DELAY_MAX, ERROR_DELAY * 2 ** (errors - 1)))
+                continue
+            errors = 0
+            registry.maybe_flush()
+            if idle:
+                if once:
+                    break
+                time.sleep(self.poll_interval)
+        close_old_connections()
+        registry.flush()
+        return self.results
+
+    def run_once(self):
+        """Claims and runs one batch, returns False when no task was ready"""
+        name, tasks = claim(self.name)
+        if not tasks:
+            return False
+        self.results[run_batch(name, tasks)] += len(tasks)
+        return True
+
+
+TASK_QUEUE_DEPTH.set_callback(pending_count)
+VIEW_BUFFER_DEPTH.set_callback(lambda: pending_count('record_views'))
+
+
+# tasks
+
+@task('record_views', batch_size=500)
+def record_views(payloads):
+    """Writes the views accepted by create_post_view, {'post', 'user', 'at'} each.
+
+    A view of a post or by a user deleted in the meantime is dropped, and so is a view within the
+    cooldown (min_read minutes) of the previous view of the same post by the same user: two
+    requests in a row both pass the check of the view before either is written.
+    """
+    views = sorted(
+        (datetime.fromisoformat(payload['at']), payload['post'], payload['user']) for payload in payloads
+    )
+    post_ids = {post_id for _, post_id, _ in views}
+    user_ids = {user_id for _, _, user_id in views}
+    cooldowns = {
+        post_id: timedelta(minutes=min_read)
+        for post_id, min_read in Post.objects.filter(id__in=post_ids).values_list('id', 'min_read')
+    }
+    users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+    last_views = {
+        (post_id, user_id): last
+        for post_id, user_id, last in View.objects.filter(post_id__in=cooldowns, user_id__in=users)
+        .values('post_id', 'user_id').annotate(last=Max('timestamp')).values_list('post_id', 'user_id', 'last')
+    }
+    new_views = []
+    for at, post_id, user_id in views:
+        if post_id not in cooldowns or user_id not in users:
+            continue
+        last = last_views.get((post_id, user_id))
+        if last is None or at - last > cooldowns[post_id]:
+            new_views.append(View(post_id_id=post_id, user_id_id=user_id, timestamp=at))
+            last_views[post_id, user_id] = at
+    View.objects.bulk_create(new_views)
+
+
+@task('fan_out_posts', batch_size=20)
+def fan_out_posts(payloads):
+    """Writes published posts, {'post'} each, into the timelines of the followers of their authors"""
+    posts = Post.objects.filter(id__in={payload['post'] for payload in payloads}, status='published')
+    for post_id, author_id, created_at in posts.values_list('id', 'user_id', 'created_at'):
+        if is_fanned_out(author_id):
+            fan_out(author_id, post_id, created_at)
+
+
+@task('fan_out_reposts', batch_size=20)
+def fan_out_reposts(payloads):
+    """Writes approved reposts, {'post', 'reposter', 'at'} each, into the timelines of the reposters' followers"""
+    approved = set(
+        RepostRequest.objects.filter(
+            post_id__in={payload['post'] for payload in payloads},
+            requester_id__in={payload['reposter'] for payload in payloads},
+            status='approved', post_id__status='published',
+        ).values_list('post_id', 'requester_id')
+    )
+    for payload in payloads:
+        # denied or deleted since, or the post is not published anymore
+        if (payload['post'], payload['reposter']) in approved and is_fanned_out(payload['reposter']):
+            fan_out(payload['reposter'], payload['post'], datetime.fromisoformat(payload['at']), payload['reposter'])
+
+
+@task('backfill_timelines', batch_size=50)
+def backfill_timelines(payloads):
+    """Copies the recent posts of newly followed authors, {'follower', 'author'} each, into the followers' timelines"""
+    for payload in payloads:
+        # unfollowed since, or read with the timelines
+        followed = Follow.objects.filter(follower_id=payload['follower'], author_id=payload['author']).exists()
+        if followed and is_fanned_out(payload['author']):
+            backfill(payload['follower'], payload['author'])
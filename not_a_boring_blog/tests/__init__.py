@@ -3,4 +3,23 @@ from not_a_boring_blog.tests.tests_category import *
 from not_a_boring_blog.tests.tests_comment import *
 from not_a_boring_blog.tests.tests_views import *
 from not_a_boring_blog.tests.tests_user import *
-from not_a_boring_blog.tests.tests_repost import *
\ No newline at end of file
+from not_a_boring_blog.tests.tests_repost import *
+from not_a_boring_blog.tests.tests_benchmark import *
+from not_a_boring_blog.tests.tests_profiling import *
+from not_a_boring_blog.tests.tests_metrics import *
+from not_a_boring_blog.tests.tests_db import *
+from not_a_boring_blog.tests.tests_replicas import *
+from not_a_boring_blog.tests.tests_sqlite import *
+from not_a_boring_blog.tests.tests_async import *
+from not_a_boring_blog.tests.tests_renderers import *
+from not_a_boring_blog.tests.tests_fast_serializer import *
+from not_a_boring_blog.tests.tests_compression import *
+from not_a_boring_blog.tests.tests_sparse import *
+from not_a_boring_blog.tests.tests_post_content import *
+from not_a_boring_blog.tests.tests_reading_time import *
+from not_a_boring_blog.tests.tests_body_html import *
+from not_a_boring_blog.tests.tests_schema import *
+from not_a_boring_blog.tests.tests_startup import *
+from not_a_boring_blog.tests.tests_static import *
+from not_a_boring_blog.tests.tests_tasks import *
+from not_a_boring_blog.tests.tests_timeline import *
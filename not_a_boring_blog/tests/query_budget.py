@@ -0,0 +1,96 @@
+"""Query budgets of the API endpoints.
+
+QUERY_BUDGETS declares, per url name and method, the most queries one request may run (token
+authentication and role checks included). List endpoints are checked with one row and with
+LIST_SIZE rows: the count has to stay within the budget and must not grow with the list, a query
+per row fails with the SQL of both runs.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LIST_SIZE = 10
+
+QUERY_BUDGETS = {
+    'create_category': {'POST': 4},
+    'list_categories': {'GET': 1},
+    'category_posts': {'GET': 2},
+    'recategorize_posts': {'PUT': 12},
+    'post-list': {'GET': 4},
+    'post-detail': {'GET': 4, 'PUT': 14, 'DELETE': 13},
+    'post-create': {'POST': 13},
+    'get-public-posts': {'GET': 2},
+    'only-user-posts': {'GET': 3},
+    'my-posts': {'GET': 3},
+    'hide-post': {'PUT': 5},
+    'timeline': {'GET': 5},
+    'comments': {'GET': 2},
+    'create_comment': {'POST': 3},
+    'create_reply': {'POST': 4},
+    'update_comment': {'GET': 3, 'PUT': 4, 'DELETE': 6},
+    'moderator_rm_comment': {'DELETE': 6},
+    'change_password': {'PUT': 9},
+    'update_role': {'PUT': 7},
+    'users_list': {'GET': 1},
+    'register': {'POST': 4},
+    'update_user': {'PUT': 4},
+    'update_bio': {'GET': 2, 'PUT': 4},
+    'login': {'POST': 4},
+    'logout': {'GET': 2},
+    'follow': {'POST': 7, 'DELETE': 7},
+    'request_repost': {'POST': 4},
+    'requests_received': {'GET': 2},
+    'requests_sent': {'GET': 2},
+    'request_update': {'PUT': 4},
+    'bulk_request_update': {'PUT': 6},
+    'delete_repost_request': {'DELETE': 3},
+    'create_post_view': {'POST': 4},
+    'post_views': {'GET': 2},
+    'async-list-categories': {'GET': 1},
+    'async-post-detail': {'GET': 3},
+    'async-public-posts': {'GET': 2},
+    'async-comments': {'GET': 2},
+    'async-post-views': {'GET': 2},
+}
+
+
+def query_budget(url_name, method='GET'):
+    return QUERY_BUDGETS[url_name][method.upper()]
+
+
+def format_queries(queries):
+    return '\n'.join(f'  {number}. {query["sql"]}' for number, query in enumerate(queries, start=1))
+
+
+class QueryBudgetMixin:
+    """TestCase mixin checking the QUERY_BUDGETS
+
+    request is a callable sending the request and returning the response,
+    add_rows(count) adds count more rows to the list the endpoint returns.
+    """
+
+    def capture_queries(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        self.assertLess(response.status_code, 400, getattr(response, 'data', response))
+        return list(queries.captured_queries)
+
+    def assertQueryBudget(self, url_name, request, method='GET'):
+        method = method.upper()
+        budget = query_budget(url_name, method)
+        queries = self.capture_queries(request)
+        if len(queries) > budget:
+            self.fail(
+                f'{method} {url_name} ran {len(queries)} queries, the budget is {budget}:\n{format_queries(queries)}'
+            )
+        return queries
+
+    def assertListQueryBudget(self, url_name, request, add_rows, size=LIST_SIZE):
+        """Runs the request with the rows of the test (one) and again after add_rows(size - 1)"""
+        one = self.assertQueryBudget(url_name, request)
+        add_rows(size - 1)
+        many = self.assertQueryBudget(url_name, request)
+        if len(many) > len(one):
+            self.fail(
+                f'GET {url_name} ran {len(one)} queries for 1 row and {len(many)} for {size} rows, '
+                f'queries are run per row.\n1 row:\n{format_queries(one)}\n{size} rows:\n{format_queries(many)}'
+            )
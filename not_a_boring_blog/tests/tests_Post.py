@@ -1,16 +1,40 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 from rest_framework import status
 from ..models.post import Category, Post
 from django.contrib.auth.models import User
-from ..serializers.posts import PostSerializer
+from ..serializers.posts import PostDetailSerializer, PostSerializer
 from ..permissions import IsAdminRole, IsModeratorRole
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
 from ..models.user import Role
 import json
+from django.core.cache import cache
+from ..models.repost_request import RepostRequest
+from .query_budget import QueryBudgetMixin
+
+
+def add_posts(count, user=None, status='published'):
+    """Adds count posts, each by its own new author (unless user is given) and in its own new category"""
+    posts = []
+    for _ in range(count):
+        number = Post.objects.count() + 1
+        author = user
+        if author is None:
+            author = User.objects.create(username=f'author{number}', password='password')
+            Role.objects.create(user=author, is_blogger=True, bio=f'bio {number}')
+        post = Post.objects.create(
+            title=f'Budget post {number}',
+            body=f'Budget body {number}',
+            user_id=author,
+            status=status,
+            description='Budget description',
+        )
+        post.category.add(Category.objects.create(category_name=f'Budget Category {number}'))
+        posts.append(post)
+    return posts
 
-class PostListTest(TestCase):
+class PostListTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         
@@ -24,7 +48,6 @@ class PostListTest(TestCase):
             body='Test Body',
             user_id=self.admin,
             status='published',
-            min_read='5 mins',
             description='Test Description',
         )
         self.post.category.add(self.category)
@@ -41,6 +64,11 @@ class PostListTest(TestCase):
         expected_data = PostSerializer(instance=[self.post], many=True).data
         self.assertEqual(response.data, expected_data)
     
+    def test_list_query_budget(self):
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.admin_token.key}'}
+        url = reverse('not_a_boring_blog:post-list')
+        self.assertListQueryBudget('post-list', lambda: self.client.get(url, **headers), add_posts)
+
     def test_list_unauthorized(self):
         url = reverse('not_a_boring_blog:post-list')
         response = self.client.get(url)
@@ -76,7 +104,6 @@ class PostDetailTest(TestCase):
             body='Test Body',
             user_id=self.moderator,
             status='published',
-            min_read='5 mins',
             description='Test Description'
         )
         self.post.category.add(self.category)
@@ -85,7 +112,6 @@ class PostDetailTest(TestCase):
             body='Test Body2',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Test Description2'
         )
         self.post2.category.add(self.category)
@@ -95,7 +121,7 @@ class PostDetailTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        expected_data = PostSerializer(instance=self.post2).data
+        expected_data = PostDetailSerializer(instance=self.post2).data
         self.assertEqual(response.data, expected_data)
     
     def test_put_blogger(self):
@@ -108,7 +134,6 @@ class PostDetailTest(TestCase):
             'body': self.post2.body,
             'user_id': self.post2.user_id_id,
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': 'Test Description2+',
             'category': [self.category.pk]
             }
@@ -118,6 +143,15 @@ class PostDetailTest(TestCase):
         expected_data = Post.objects.get(pk = self.post2.pk) 
         self.assertEqual(response.data['title'], expected_data.title)
     
+    def test_update_categories(self):
+        category2 = Category.objects.create(category_name='Test Category 2')
+        category3 = Category.objects.create(category_name='Test Category 3')
+        self.post2.category.add(category2)
+        # one DELETE of the dropped links and one INSERT of the wanted ones
+        with self.assertNumQueries(4):  # + savepoint and release of the transaction
+            self.post2.update_categories([category2.id, category3.id])
+        self.assertCountEqual(self.post2.category.all(), [category2, category3])
+
     def test_put_admin(self):
         headers = {
             'HTTP_AUTHORIZATION': f'Token {self.admin_token.key}',
@@ -128,7 +162,6 @@ class PostDetailTest(TestCase):
             'body': self.post2.body,
             'user_id': self.post2.user_id_id,
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': 'Test Description admin',
             'category': [self.category.pk]
             }
@@ -142,7 +175,6 @@ class PostDetailTest(TestCase):
             'body': self.post2.body,
             'user_id': self.post2.user_id_id,
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': 'Test Description unregistered',
             'category': [self.category.pk]
             }
@@ -159,7 +191,6 @@ class PostDetailTest(TestCase):
             'body': self.post2.body,
             'user_id': self.post2.user_id_id,
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': 'Test Description registered not owner user',
             'category': [self.category.pk]
             }
@@ -214,7 +245,6 @@ class PostCreateTest(TestCase):
             body='Test post Body',
             user_id=self.user,
             status='published',
-            min_read='5 mins',
             description='Test post Description'
         )
         self.post.category.add(self.category)
@@ -223,7 +253,6 @@ class PostCreateTest(TestCase):
             title='Test post Post2',
             body='Test post  Body2',
             status='published',
-            min_read='5 mins',
             description='Test post Description2',
             user_id=self.blogger
         )
@@ -239,7 +268,6 @@ class PostCreateTest(TestCase):
             'title': self.post2.title,
             'body': 'Some test body',
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': self.post2.description,
             'category': [self.category.pk]
             }
@@ -256,7 +284,6 @@ class PostCreateTest(TestCase):
             'title': self.post2.title,
             'body': 'Some test body from admin',
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': self.post2.description,
             'category': [self.category.pk]
             }
@@ -273,7 +300,6 @@ class PostCreateTest(TestCase):
             'title': self.post2.title,
             'body': 'Some test body from moderator',
             'status': self.post2.status,
-            'min_read': self.post2.min_read,
             'description': self.post2.description,
             'category': [self.category.pk]
             }
@@ -286,7 +312,6 @@ class PostCreateTest(TestCase):
             'title': self.post.title,
             'body': 'Some test body2',
             'status': self.post.status,
-            'min_read': self.post.min_read,
             'description': self.post.description,
             'category': [self.category.pk]
             }
@@ -296,7 +321,7 @@ class PostCreateTest(TestCase):
 
 
 
-class GetPublicPostsTest(TestCase):
+class GetPublicPostsTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='testuser', password='testpassword')
@@ -319,7 +344,6 @@ class GetPublicPostsTest(TestCase):
             body='Test get public Body by admin',
             user_id=self.admin,
             status='published',
-            min_read='5 mins',
             description='Test get public Description',
         )
         self.post.category.add(self.category)
@@ -338,10 +362,15 @@ class GetPublicPostsTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_query_budget(self):
+        self.assertListQueryBudget('get-public-posts', lambda: self.client.get(self.url), add_posts)
+
 
 
-class GetUserPublicPostsTest(TestCase):
+@override_settings(FEED_CACHE_TIMEOUT=60)
+class GetUserPublicPostsTest(QueryBudgetMixin, TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create(username='testuser', password='testpassword')
         
@@ -359,7 +388,6 @@ class GetUserPublicPostsTest(TestCase):
             body='Test get public only user Body by admin',
             user_id=self.admin,
             status='published',
-            min_read='5 mins',
             description='Test get public only user Description',
         )
         self.post.category.add(self.category)
@@ -369,7 +397,6 @@ class GetUserPublicPostsTest(TestCase):
             body='Test get public only user Body by blogger',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Test get public only user Description by blogger',
         )
         self.post2.category.add(self.category)
@@ -395,9 +422,42 @@ class GetUserPublicPostsTest(TestCase):
         response = self.client.get(self.url, **headers)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_unknown_user(self):
+        url = reverse('not_a_boring_blog:only-user-posts', kwargs={'username': 'nobody'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_budget(self):
+        def add_rows(count):
+            # half own posts, half approved reposts of posts by others
+            add_posts(count // 2, user=self.blogger)
+            for post in add_posts(count - count // 2):
+                RepostRequest.objects.create(requester_id=self.blogger, post_id=post, status='approved')
+            cache.clear()
+
+        self.assertListQueryBudget('only-user-posts', lambda: self.client.get(self.url), add_rows)
+
+    def test_feed_cache_dropped_on_new_post(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        body = {
+            'title': 'Another post by blogger',
+            'body': 'Another body by blogger',
+            'category': [self.category.id],
+            'description': 'Another description',
+            'status': 'published',
+        }
+        self.client.post(reverse('not_a_boring_blog:post-create'), data=json.dumps(body), **headers)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 2)
+
 
 
-class GetUserPostsTest(TestCase):
+class GetUserPostsTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='testuser', password='testpassword')
@@ -416,7 +476,6 @@ class GetUserPostsTest(TestCase):
             body='Test get all user Body by admin',
             user_id=self.admin,
             status='published',
-            min_read='5 mins',
             description='Test get all user Description',
         )
         self.post.category.add(self.category)
@@ -426,7 +485,6 @@ class GetUserPostsTest(TestCase):
             body='Test get all user Body by blogger',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Test get all user Description by blogger',
         )
         self.post2.category.add(self.category)
@@ -440,6 +498,12 @@ class GetUserPostsTest(TestCase):
         response = self.client.get(self.url, **headers)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_query_budget(self):
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}'}
+        self.assertListQueryBudget(
+            'my-posts', lambda: self.client.get(self.url, **headers), lambda count: add_posts(count, user=self.blogger)
+        )
+
     def test_get_all_user_posts_by_unregistered_user(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
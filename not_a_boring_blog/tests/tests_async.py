@@ -0,0 +1,128 @@
+import asyncio
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models.comment import Comment
+from ..models.post import Category, Post
+from ..models.user import Role
+from ..models.views import View
+from .query_budget import QueryBudgetMixin
+
+
+def url(name, **kwargs):
+    return reverse(f'not_a_boring_blog:{name}', kwargs=kwargs)
+
+
+class AsyncReadEndpointsTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Blogger bio')
+        self.token = Token.objects.create(user=self.blogger)
+        self.reader = User.objects.create(username='reader', password='reader')
+        Role.objects.create(user=self.reader, is_blogger=True)
+        self.reader_token = Token.objects.create(user=self.reader)
+
+        self.category = Category.objects.create(category_name='Async')
+        self.post = self.add_post('Published post', 'published')
+        self.draft = self.add_post('Draft post', 'editing')
+        comment = Comment.objects.create(post_id=self.post, author=self.reader, body='Comment')
+        Comment.objects.create(post_id=self.post, author=self.blogger, body='Reply', parent_id=comment)
+        View.objects.create(post_id=self.post, user_id=self.reader)
+
+    def add_post(self, title, status='published'):
+        post = Post.objects.create(
+            title=title, body=f'{title} body', user_id=self.blogger, status=status,
+            description=f'{title} description',
+        )
+        post.category.add(self.category)
+        return post
+
+    def test_same_responses_as_drf_views(self):
+        for sync_name, async_name, kwargs in [
+            ('get-public-posts', 'async-public-posts', {}),
+            ('post-detail', 'async-post-detail', {'pk': self.post.id}),
+            ('comments', 'async-comments', {'post_id': self.post.id}),
+            ('post_views', 'async-post-views', {'post_id': self.post.id}),
+            ('list_categories', 'async-list-categories', {}),
+        ]:
+            with self.subTest(async_name):
+                expected = self.client.get(url(sync_name, **kwargs), format='json')
+                response = self.client.get(url(async_name, **kwargs))
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_served_by_async_client(self):
+        response = await self.async_client.get(url('async-public-posts'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post['title'] for post in response.json()], ['Published post'])
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*[
+            self.async_client.get(url('async-post-detail', pk=self.post.id)) for _ in range(20)
+        ])
+        self.assertEqual({response.status_code for response in responses}, {200})
+
+    async def test_unpublished_post_only_for_author(self):
+        path = url('async-post-detail', pk=self.draft.id)
+        response = await self.async_client.get(path, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Draft post')
+        response = await self.async_client.get(path, headers={'Authorization': f'Token {self.reader_token.key}'})
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(path)
+        self.assertEqual(response.status_code, 403)
+        response = await self.async_client.get(path, headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_not_found(self):
+        response = await self.async_client.get(url('async-post-detail', pk=0))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(url('async-post-views', post_id=0))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(url('async-post-views', post_id=self.draft.id))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'No views found for this post'})
+
+    async def test_read_only(self):
+        response = await self.async_client.delete(url('async-post-detail', pk=self.post.id))
+        self.assertEqual(response.status_code, 405)
+
+    def test_query_budgets(self):
+        def add_posts(count):
+            for number in range(count):
+                self.add_post(f'Post {number}')
+
+        def add_comments(count):
+            for number in range(count):
+                comment = Comment.objects.create(post_id=self.post, author=self.reader, body=f'Comment {number}')
+                Comment.objects.create(post_id=self.post, author=self.blogger, body='Reply', parent_id=comment)
+
+        def add_categories(count):
+            for number in range(count):
+                Category.objects.create(category_name=f'Async {number}')
+
+        self.assertQueryBudget('async-post-detail', lambda: self.client.get(url('async-post-detail', pk=self.post.id)))
+        self.assertQueryBudget('async-post-views', lambda: self.client.get(url('async-post-views', post_id=self.post.id)))
+        self.assertListQueryBudget('async-public-posts', lambda: self.client.get(url('async-public-posts')), add_posts)
+        self.assertListQueryBudget(
+            'async-comments', lambda: self.client.get(url('async-comments', post_id=self.post.id)), add_comments
+        )
+        self.assertListQueryBudget(
+            'async-list-categories', lambda: self.client.get(url('async-list-categories')), add_categories
+        )
+
+    def test_middleware_async_capable(self):
+        # a sync-only middleware would put every request back on a thread under ASGI;
+        # the profiling middleware is the exception, it is only on for diagnosis
+        for path in settings.MIDDLEWARE:
+            if path.endswith('ProfilingMiddleware'):
+                continue
+            with self.subTest(path):
+                self.assertTrue(getattr(import_string(path), 'async_capable', False))
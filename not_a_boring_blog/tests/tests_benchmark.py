@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from .. import urls
+from ..benchmarks.data import DataGenerator
+from ..benchmarks.endpoints import BenchmarkFixtures, EndpointBenchmark, SCENARIOS
+from ..models.comment import Comment
+from ..models.post import Post
+from ..models.repost_request import RepostRequest
+from .query_budget import QUERY_BUDGETS, QueryBudgetMixin
+
+
+class DataGeneratorTest(TestCase):
+    def test_generate_is_seeded(self):
+        counts = DataGenerator(seed=1, users=10, categories=3, posts=20, comments=50, repost_requests=30, views=40,
+                               body_words=20).generate()
+        self.assertEqual(counts['posts'], 20)
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(RepostRequest.objects.count(), 30)
+        self.assertTrue(Comment.objects.filter(parent_id__isnull=False).exists())
+        # replies are on the post of their parent
+        for reply in Comment.objects.filter(parent_id__isnull=False).select_related('parent_id'):
+            self.assertEqual(reply.post_id_id, reply.parent_id.post_id_id)
+
+    def test_same_seed_same_rows(self):
+        first = [(post.title, content.body) for post, content in DataGenerator(seed=7, users=5, posts=10)._posts()]
+        second = [(post.title, content.body) for post, content in DataGenerator(seed=7, users=5, posts=10)._posts()]
+        self.assertEqual(first, second)
+
+class EndpointBenchmarkTest(TestCase):
+    def test_every_endpoint_runs(self):
+        DataGenerator(seed=1, users=10, categories=3, posts=20, comments=50, repost_requests=30, views=40,
+                      body_words=20).generate()
+        benchmark = EndpointBenchmark(BenchmarkFixtures().create(), iterations=1, warmup=0)
+        results, missing = benchmark.run()
+        self.assertEqual(missing, [])
+        self.assertEqual(len(results), sum(len(scenarios) for scenarios in SCENARIOS.values()))
+        for result in results:
+            self.assertTrue(all(code < 500 for code in result['status']), result)
+            self.assertGreater(result['latency_ms']['p50'], 0)
+
+
+class QueryBudgetCoverageTest(QueryBudgetMixin, TestCase):
+    def test_every_endpoint_within_budget(self):
+        # the benchmark scenarios call every endpoint, each call rolled back
+        DataGenerator(seed=1, users=10, categories=3, posts=20, comments=50, repost_requests=30, views=40,
+                      body_words=20).generate()
+        benchmark = EndpointBenchmark(BenchmarkFixtures().create())
+        for name in benchmark.url_names():
+            self.assertIn(name, QUERY_BUDGETS, f'{name} has no query budget')
+            for scenario in SCENARIOS[name]:
+                path = reverse(f'{urls.app_name}:{name}', kwargs=scenario.kwargs(benchmark.fixtures))
+                with transaction.atomic():
+                    self.assertQueryBudget(name, lambda: benchmark.request(scenario, path), scenario.method)
+                    transaction.set_rollback(True)
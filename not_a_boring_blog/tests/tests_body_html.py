@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .. import markup
+from ..markup import html_key, render_body
+from ..models.post import Post, PostContent
+from ..models.user import Role
+
+BODY = '# Title\n\nSome **bold** text <script>alert(1)</script> [link](javascript:alert(1)) <img src="a.png" onerror="x()">'
+
+
+def url(pk, query=''):
+    return reverse('not_a_boring_blog:post-detail', kwargs={'pk': pk}) + query
+
+
+class RenderBodyTest(SimpleTestCase):
+    def test_markdown_sanitized(self):
+        html = render_body(BODY)
+        self.assertIn('<h1>Title</h1>', html)
+        self.assertIn('<strong>bold</strong>', html)
+        for unsafe in ('<script', 'alert(1)</', 'javascript:', 'onerror'):
+            self.assertNotIn(unsafe, html)
+
+    def test_without_markdown(self):
+        with mock.patch.object(markup, 'MARKDOWN', False):
+            html = render_body('<b>one</b>\n\ntwo')
+        self.assertEqual(html, '<p>&lt;b&gt;one&lt;/b&gt;</p>\n\n<p>two</p>')
+
+    def test_key(self):
+        self.assertEqual(html_key('body'), html_key('body'))
+        self.assertNotEqual(html_key('body'), html_key('body '))
+        with mock.patch.object(markup, 'RENDERER', '2-markdown'):
+            self.assertTrue(html_key('body').startswith('2-markdown:'))
+
+
+class BodyHTMLTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Bio')
+        self.post = Post.objects.create(
+            title='Post', body=BODY, user_id=self.blogger, status='published', description='Description',
+        )
+
+    def get(self, query='?include=body_html'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url(self.post.pk, query))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+
+    def test_rendered_on_write(self):
+        content = PostContent.objects.get(pk=self.post.pk)
+        self.assertEqual(content.body_html, render_body(BODY))
+        self.assertEqual(content.html_key, html_key(BODY))
+        self.post.body = 'Edited'
+        self.post.save()
+        self.assertEqual(PostContent.objects.get(pk=self.post.pk).body_html, '<p>Edited</p>')
+
+    def test_optional_field(self):
+        data, _ = self.get('')
+        self.assertNotIn('body_html', data)
+        data, updates = self.get()
+        self.assertEqual(data['body_html'], render_body(BODY))
+        self.assertEqual(updates, [])
+
+    def test_unknown_include(self):
+        response = self.client.get(url(self.post.pk, '?include=body_html,secret'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'include': ['Unknown field: secret.']})
+
+    def test_stale_rendered_once_on_read(self):
+        PostContent.objects.filter(pk=self.post.pk).update(body_html='old', html_key='0-markdown:old')
+        data, updates = self.get()
+        self.assertEqual(data['body_html'], render_body(BODY))
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(PostContent.objects.get(pk=self.post.pk).html_key, html_key(BODY))
+        _, updates = self.get()
+        self.assertEqual(updates, [])
+
+    def test_renderer_version_bump(self):
+        with mock.patch.object(markup, 'RENDERER', '2-markdown'):
+            _, updates = self.get()
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(PostContent.objects.get(pk=self.post.pk).html_key.startswith('2-markdown:'))
+
+    def test_bulk_created_rendered_on_read(self):
+        post = Post.objects.create(
+            title='Bulk', body='unused', user_id=self.blogger, status='published', description='Description',
+        )
+        PostContent.objects.filter(pk=post.pk).delete()
+        PostContent.objects.bulk_create([PostContent(post=post, body='*bulk*')])
+        response = self.client.get(url(post.pk, '?include=body_html'))
+        self.assertEqual(response.json()['body_html'], '<p><em>bulk</em></p>')
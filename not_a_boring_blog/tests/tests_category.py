@@ -8,7 +8,11 @@ from ..permissions import IsAdminRole, IsModeratorRole
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
 from ..models.user import Role
+from ..models.repost_request import RepostRequest
+from ..feeds import feed_cache_key
+from django.core.cache import cache
 import json
+from .query_budget import QueryBudgetMixin
 
 
 class CreateCategoryTest(TestCase):
@@ -76,7 +80,7 @@ class CreateCategoryTest(TestCase):
     
 
 
-class ListCategoriesTest(TestCase):
+class ListCategoriesTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         
@@ -115,3 +119,195 @@ class ListCategoriesTest(TestCase):
     def test_list_categories_as_unauthorized_user(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_post_counts(self):
+        for number, post_status in enumerate(['published', 'editing']):
+            post = Post.objects.create(
+                title=f'Post {number}', body=f'Body {number}', user_id=self.blogger, status=post_status,
+                description='Description',
+            )
+            post.category.add(self.category1)
+        response = self.client.get(self.url)
+        counts = {category['category_name']: (category['num_posts'], category['num_published_posts'])
+                  for category in response.data}
+        self.assertEqual(counts, {'Category1': (2, 1), 'Category2': (0, 0)})
+
+    def test_query_budget(self):
+        def add_rows(count):
+            for number in range(count):
+                category = Category.objects.create(category_name=f'Budget Category {number}')
+                post = Post.objects.create(
+                    title=f'Budget post {number}', body=f'Budget body {number}', user_id=self.blogger,
+                    status='published', description='Budget description',
+                )
+                post.category.add(category)
+
+        Category.objects.filter(pk=self.category2.pk).delete()
+        self.assertListQueryBudget('list_categories', lambda: self.client.get(self.url), add_rows)
+
+
+class RecategorizePostsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.moderator = User.objects.create(username="moderator", password="passwordmoderator")
+        self.moderator_token = Token.objects.create(user=self.moderator)
+        self.moderator_role = Role.objects.create(user=self.moderator, is_moderator=True)
+
+        self.blogger = User.objects.create(username="blogger", password="passwordblogger")
+        self.blogger_token = Token.objects.create(user=self.blogger)
+        self.blogger_role = Role.objects.create(user=self.blogger, is_blogger=True)
+
+        self.category1 = Category.objects.create(category_name='Category1')
+        self.category2 = Category.objects.create(category_name='Category2')
+        self.posts = []
+        for i in range(5):
+            post = Post.objects.create(
+                title=f'Test Post {i}',
+                body=f'Test Body {i}',
+                user_id=self.blogger,
+                status='published',
+                description='Test Description',
+            )
+            post.category.add(self.category1)
+            self.posts.append(post)
+        # already in both categories, must not be linked twice
+        self.posts[0].category.add(self.category2)
+
+        self.url = reverse('not_a_boring_blog:recategorize_posts')
+
+    def test_merge_category_by_moderator(self):
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.moderator_token.key}',
+            'content_type': 'application/json',
+        }
+        data = {'from_category': self.category1.id, 'to_category': self.category2.id}
+        response = self.client.put(self.url, data=json.dumps(data), **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['moved_posts'], 5)
+        self.assertEqual(self.category1.posts.count(), 0)
+        self.assertEqual(self.category2.posts.count(), 5)
+
+    def test_feeds_invalidated(self):
+        reposter = User.objects.create(username="reposter", password="passwordreposter")
+        RepostRequest.objects.create(requester_id=reposter, post_id=self.posts[1], status='approved')
+        for user in (self.blogger, reposter, self.moderator):
+            cache.set(feed_cache_key(user.id), ['cached'])
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.moderator_token.key}',
+            'content_type': 'application/json',
+        }
+        data = {'from_category': self.category1.id, 'to_category': self.category2.id}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(self.url, data=json.dumps(data), **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(feed_cache_key(self.blogger.id)))
+        self.assertIsNone(cache.get(feed_cache_key(reposter.id)))
+        self.assertEqual(cache.get(feed_cache_key(self.moderator.id)), ['cached'])
+
+    def test_move_posts_in_chunks(self):
+        moved = self.category1.move_posts(self.category2, post_ids=[p.id for p in self.posts[:3]], chunk_size=2)
+        self.assertEqual(moved, 3)
+        self.assertCountEqual(self.category1.posts.all(), self.posts[3:])
+        self.assertCountEqual(self.category2.posts.all(), self.posts[:3])
+
+    def test_same_category(self):
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.moderator_token.key}',
+            'content_type': 'application/json',
+        }
+        data = {'from_category': self.category1.id, 'to_category': self.category1.id}
+        response = self.client.put(self.url, data=json.dumps(data), **headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recategorize_by_blogger(self):
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        data = {'from_category': self.category1.id, 'to_category': self.category2.id}
+        response = self.client.put(self.url, data=json.dumps(data), **headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.category1.posts.count(), 5)
+
+
+class PostsByCategoryTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        self.blogger = User.objects.create(username="blogger", password="passwordblogger")
+        self.blogger_token = Token.objects.create(user=self.blogger)
+        self.blogger_role = Role.objects.create(user=self.blogger, is_blogger=True)
+
+        self.category = Category.objects.create(category_name='iOS')
+        self.post = Post.objects.create(
+            title='Test Post',
+            body='Test Body',
+            user_id=self.blogger,
+            status='published',
+            description='Test Description',
+        )
+        self.post.category.add(self.category)
+
+    def test_lookup_is_case_insensitive(self):
+        for name in ['iOS', 'ios', 'IOS']:
+            url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': name})
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([post['id'] for post in response.data], [self.post.id])
+
+    def test_query_budget(self):
+        def add_rows(count):
+            for number in range(count):
+                author = User.objects.create(username=f'author{number}', password='password')
+                Role.objects.create(user=author, is_blogger=True)
+                post = Post.objects.create(
+                    title=f'Budget post {number}', body=f'Budget body {number}', user_id=author,
+                    status='published', description='Budget description',
+                )
+                post.category.add(self.category, Category.objects.create(category_name=f'Budget {number}'))
+
+        url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': 'ios'})
+        self.assertListQueryBudget('category_posts', lambda: self.client.get(url), add_rows)
+
+    def test_category_not_found(self):
+        url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': 'Android'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_empty_category(self):
+        Category.objects.create(category_name='Android')
+        url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': 'android'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_no_category_lookup(self):
+        url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': 'IOS'})
+        # the posts joined on the category key, then the categories of the posts
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual([post['id'] for post in response.data], [self.post.id])
+
+    def test_created_category_found_after_miss(self):
+        url = reverse('not_a_boring_blog:category_posts', kwargs={'category_name': 'ai'})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token}',
+            'content_type': 'application/json',
+        }
+        response = self.client.post(
+            reverse('not_a_boring_blog:create_category'), data=json.dumps({'category_name': 'AI'}), **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_create_category_in_other_case(self):
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token}',
+            'content_type': 'application/json',
+        }
+        response = self.client.post(
+            reverse('not_a_boring_blog:create_category'), data=json.dumps({'category_name': 'IOS'}), **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -8,10 +8,11 @@ from rest_framework.test import APIClient
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 import json
+from .query_budget import QueryBudgetMixin
 
 
 
-class PostCommentListTest(TestCase):
+class PostCommentListTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='user', password='passworduser')
@@ -25,7 +26,6 @@ class PostCommentListTest(TestCase):
             body='Sample Body',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Sample Description'
         )     
 
@@ -50,6 +50,27 @@ class PostCommentListTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+    def test_replies_count(self):
+        comment = Comment.objects.create(post_id=self.post, author=self.blogger, body='Comment')
+        for number in range(2):
+            Comment.objects.create(post_id=self.post, author=self.blogger, body=f'Reply {number}', parent_id=comment)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['replies_count'], 2)
+        self.assertEqual(len(response.data[0]['replies']), 2)
+
+    def test_query_budget(self):
+        def add_rows(count):
+            for _ in range(count):
+                number = User.objects.count()
+                author = User.objects.create(username=f'author{number}', password='password')
+                replier = User.objects.create(username=f'replier{number}', password='password')
+                comment = Comment.objects.create(post_id=self.post, author=author, body=f'Comment {number}')
+                Comment.objects.create(post_id=self.post, author=replier, body=f'Reply {number}', parent_id=comment)
+
+        add_rows(1)
+        self.assertListQueryBudget('comments', lambda: self.client.get(self.url), add_rows)
+
     def test_list_comments_no_comments(self):
         Comment.objects.filter(post_id_id=self.post.id).delete()
 
@@ -72,7 +93,6 @@ class CreateCommentTest(TestCase):
             body='Sample Body',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Sample Description'
         )     
         self.url = reverse('not_a_boring_blog:create_comment', kwargs={'post_id': self.post.id})
@@ -122,7 +142,6 @@ class CreateReplyTest(TestCase):
             body='Sample Body',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Sample Description'
         )     
         
@@ -197,7 +216,6 @@ class UpdateCommentTest(TestCase):
             body='Sample Body',
             user_id=self.blogger,
             status='published',
-            min_read='5 mins',
             description='Sample Description'
         )    
         self.comment = Comment.objects.create(
@@ -0,0 +1,165 @@
+import gzip
+import json
+import threading
+from unittest import mock
+
+import brotli
+import zstandard
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from ..benchmarks.compression import CompressionBenchmark
+from ..metrics import CACHE_REQUESTS
+from ..middleware.compression import CompressionMiddleware, negotiate
+from ..models.post import Post
+from ..models.user import Role
+
+DECOMPRESS = {
+    'gzip': gzip.decompress,
+    'br': brotli.decompress,
+    'zstd': lambda content: zstandard.ZstdDecompressor().decompressobj().decompress(content),
+}
+BIG = {'posts': [{'title': f'Post {number}', 'body': 'Some body text ' * 20} for number in range(20)]}
+
+
+class NegotiateTest(SimpleTestCase):
+    def test_negotiate(self):
+        encodings = ('zstd', 'br', 'gzip')
+        for header, expected in [
+            ('', None),
+            ('identity', None),
+            ('gzip, deflate', 'gzip'),
+            ('gzip, deflate, br', 'br'),
+            ('gzip, deflate, br, zstd', 'zstd'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('GZIP;q=0.8', 'gzip'),
+            ('*', 'zstd'),
+            ('*, zstd;q=0', 'br'),
+            ('gzip;q=0', None),
+            ('gzip;q=bad, br', 'br'),
+        ]:
+            with self.subTest(header):
+                self.assertEqual(negotiate(header, encodings), expected)
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, encoding, method='get'):
+        request = getattr(self.factory, method)('/', headers={'Accept-Encoding': encoding})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_encodings(self):
+        content = JsonResponse(BIG).content
+        for encoding in DECOMPRESS:
+            with self.subTest(encoding):
+                response = self.process(JsonResponse(BIG), encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(int(response['Content-Length']), len(response.content))
+                self.assertEqual(DECOMPRESS[encoding](response.content), content)
+
+    def test_left_uncompressed(self):
+        for name, response, method in [
+            ('small', JsonResponse({'title': 'Post'}), 'get'),
+            ('post', JsonResponse(BIG), 'post'),
+            ('binary', HttpResponse(b'\0' * 2000, content_type='image/png'), 'get'),
+            ('encoded', HttpResponse(b'x' * 2000, headers={'Content-Encoding': 'gzip'}), 'get'),
+            ('no-transform', JsonResponse(BIG, headers={'Cache-Control': 'no-transform'}), 'get'),
+        ]:
+            with self.subTest(name):
+                content = response.content
+                response = self.process(response, 'gzip', method)
+                self.assertEqual(response.content, content)
+
+    def test_strong_etag_weakened(self):
+        response = self.process(JsonResponse(BIG, headers={'ETag': '"abc"'}), 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_streaming(self):
+        chunks = [json.dumps(post).encode() for post in BIG['posts']]
+        for encoding in DECOMPRESS:
+            with self.subTest(encoding):
+                response = self.process(StreamingHttpResponse(iter(chunks), content_type='application/json'), encoding)
+                parts = list(response.streaming_content)
+                # flushed per chunk, every post is sent as soon as it is rendered
+                self.assertGreaterEqual(len(parts), len(chunks))
+                self.assertFalse(response.has_header('Content-Length'))
+                self.assertEqual(DECOMPRESS[encoding](b''.join(parts)), b''.join(chunks))
+
+    async def test_async_streaming(self):
+        async def chunks():
+            for post in BIG['posts']:
+                yield json.dumps(post).encode()
+
+        async def get_response(request):
+            return StreamingHttpResponse(chunks(), content_type='application/json')
+
+        request = self.factory.get('/', headers={'Accept-Encoding': 'gzip'})
+        response = await CompressionMiddleware(get_response)(request)
+        content = b''.join([part async for part in response.streaming_content])
+        self.assertEqual(gzip.decompress(content), b''.join([json.dumps(post).encode() for post in BIG['posts']]))
+
+    async def test_async_compressed_off_the_loop(self):
+        async def get_response(request):
+            return JsonResponse(BIG)
+
+        threads = []
+        compress = CompressionMiddleware.compress
+
+        def record_thread(middleware, encoder, response):
+            threads.append(threading.get_ident())
+            return compress(middleware, encoder, response)
+
+        request = self.factory.get('/', headers={'Accept-Encoding': 'gzip'})
+        with mock.patch.object(CompressionMiddleware, 'compress', record_thread):
+            response = await CompressionMiddleware(get_response)(request)
+        self.assertEqual(gzip.decompress(response.content), JsonResponse(BIG).content)
+        self.assertNotEqual(threads, [threading.get_ident()])
+        self.assertEqual(len(threads), 1)
+
+    @override_settings(COMPRESSION_ENCODINGS=[])
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            CompressionMiddleware(lambda request: None)
+
+
+class CompressedFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=blogger, is_blogger=True, bio='Bio')
+        for number in range(5):
+            Post.objects.create(
+                title=f'Post {number}', body='Body text ' * 100, user_id=blogger, status='published',
+                description='Description',
+            )
+
+    def test_api_response_compressed(self):
+        url = reverse('not_a_boring_blog:get-public-posts')
+        expected = self.client.get(url).content
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), expected)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cached_feed_compressed_once(self):
+        url = reverse('not_a_boring_blog:only-user-posts', kwargs={'username': 'blogger'})
+        hits = CACHE_REQUESTS.values.get(('compressed', 'hit'), 0)
+        misses = CACHE_REQUESTS.values.get(('compressed', 'miss'), 0)
+        first = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        second = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(CACHE_REQUESTS.values[('compressed', 'miss')], misses + 1)
+        self.assertEqual(CACHE_REQUESTS.values[('compressed', 'hit')], hits + 1)
+        self.assertEqual(json.loads(gzip.decompress(second.content))[0]['author'], 'blogger')
+
+    def test_benchmark_report(self):
+        report = CompressionBenchmark(posts=5, iterations=2).run()
+        self.assertEqual(set(report['encodings']), {'identity', *DECOMPRESS})
+        self.assertLess(report['encodings']['gzip']['bytes'], report['encodings']['identity']['bytes'])
@@ -0,0 +1,119 @@
+import threading
+import unittest
+
+from django.conf import settings
+from django.db import connection
+from django.db.utils import load_backend
+from django.test import SimpleTestCase, TransactionTestCase
+from ..db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+    def test_connection_reused(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        first = pool.get()
+        pool.put(first)
+        self.assertIs(pool.get(), first)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_closed_connection_replaced(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        first = pool.get()
+        first.closed = 1
+        pool.put(first)
+        self.assertIsNot(pool.get(), first)
+
+    def test_discarded_connection_closed(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        first = pool.get()
+        pool.put(first, discard=True)
+        self.assertTrue(first.closed)
+        # the slot is free again
+        self.assertIsNot(pool.get(), first)
+
+    def test_waits_for_free_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=5)
+        first = pool.get()
+        threading.Timer(0.05, pool.put, [first]).start()
+        self.assertIs(pool.get(), first)
+
+    def test_timeout_when_exhausted(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0.01)
+        pool.get()
+        with self.assertRaises(PoolTimeout):
+            pool.get()
+
+    def test_idle_connection_checked(self):
+        checked = []
+
+        def check(connection):
+            checked.append(connection)
+            return False
+
+        pool = ConnectionPool(self.connect, max_size=2, check=check, check_after=0)
+        first = pool.get()
+        pool.put(first)
+        second = pool.get()
+        self.assertEqual(checked, [first])
+        self.assertTrue(first.closed)
+        self.assertIsNot(second, first)
+
+    def test_failed_connect_frees_slot(self):
+        def connect():
+            raise OSError('server down')
+
+        pool = ConnectionPool(connect, max_size=1, timeout=0.01)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.get()
+
+
+class ConnectionSettingsTest(SimpleTestCase):
+    def test_persistent_checked_connections(self):
+        database = settings.DATABASES['default']
+        self.assertEqual(database['CONN_MAX_AGE'], settings.DB_CONN_MAX_AGE)
+        self.assertEqual(database['CONN_HEALTH_CHECKS'], settings.DB_CONN_HEALTH_CHECKS)
+
+
+class PooledBackendSettingsTest(SimpleTestCase):
+    def test_pool_options_not_sent_to_server(self):
+        backend = load_backend('not_a_boring_blog.db.backends.postgresql_pool')
+        wrapper = backend.DatabaseWrapper({
+            **settings.DATABASES['default'],
+            'ENGINE': 'not_a_boring_blog.db.backends.postgresql_pool',
+            'NAME': 'blog', 'USER': 'blog', 'PASSWORD': '', 'HOST': 'localhost', 'PORT': '',
+            'OPTIONS': {'pool_max_size': 4, 'pool_timeout': 1, 'sslmode': 'require'},
+        })
+        self.addCleanup(backend.close_pools)
+        params = wrapper.get_connection_params()
+        self.assertEqual(params['sslmode'], 'require')
+        self.assertNotIn('pool_max_size', params)
+        self.assertNotIn('pool_timeout', params)
+        self.assertEqual(wrapper.get_pool(params).max_size, 4)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql' and settings.DB_POOL, 'needs the PostgreSQL pool backend')
+class PooledBackendTest(TransactionTestCase):
+    def test_connection_back_in_pool(self):
+        connection.ensure_connection()
+        raw = connection.connection
+        pool = connection.pool
+        connection.close()
+        self.assertIn(raw, [idle for idle, _ in pool.idle])
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from ..models.comment import Comment
+from ..models.post import Category, Post
+from ..models.user import Role
+from ..serializers.category import CategoriesSerializer, CategorySerializer
+from ..serializers.comment import CommentSerializer
+from ..serializers.fast import fast_data, get_plan
+from ..serializers.posts import PostSerializer
+from ..serializers.user import UserListSerializer
+
+
+class CustomRepresentationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['category_name']
+
+    def to_representation(self, instance):
+        return {'name': instance.category_name.upper()}
+
+
+class FastSerializerTest(TestCase):
+    def setUp(self):
+        self.blogger = User.objects.create(username='blogger', password='blogger', email='blogger@mail.com')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Bio with ünïcödé')
+        self.reader = User.objects.create(username='reader', password='reader')
+        Role.objects.create(user=self.reader, is_blogger=True, bio='')
+        User.objects.create(username='no_role', password='no_role')
+
+        self.first = Category.objects.create(category_name='First')
+        Category.objects.create(category_name='Empty')
+        for number, status in enumerate(['published', 'published', 'editing']):
+            post = Post.objects.create(
+                title=f'Post {number}', body=f'Body {number}', user_id=self.blogger, status=status,
+                description=f'Description {number}',
+            )
+            if number:
+                post.category.add(self.first)
+        self.post = post
+        comment = Comment.objects.create(post_id=self.post, author=self.reader, body='Comment')
+        Comment.objects.create(post_id=self.post, author=self.blogger, body='Reply', parent_id=comment)
+        Comment.objects.create(post_id=self.post, author=self.blogger, body='Lonely comment')
+
+    def assertSameAsDRF(self, serializer_class, rows):
+        rows = list(rows)
+        expected = JSONRenderer().render(serializer_class(rows, many=True).data)
+        self.assertEqual(JSONRenderer().render(fast_data(serializer_class, rows)), expected)
+
+    def test_same_output_as_drf(self):
+        categories = Category.objects.annotate(
+            num_posts=Count('posts'), num_published_posts=Count('posts', filter=Q(posts__status='published')),
+        ).order_by('id')
+        for serializer_class, rows in [
+            (PostSerializer, PostSerializer.setup_eager_loading(Post.objects.all())),
+            (CommentSerializer, CommentSerializer.setup_eager_loading(Comment.objects.filter(parent_id=None))),
+            (UserListSerializer, User.objects.filter(username__in=['blogger', 'reader'])),
+            (CategoriesSerializer, categories),
+            (CategoriesSerializer, categories.values('id', 'category_name', 'num_posts', 'num_published_posts')),
+            (CategorySerializer, Category.objects.values('category_name')),
+        ]:
+            with self.subTest(serializer_class.__name__):
+                self.assertSameAsDRF(serializer_class, rows)
+
+    def test_datetimes_in_current_timezone(self):
+        posts = PostSerializer.setup_eager_loading(Post.objects.all())
+        with timezone.override('America/New_York'):
+            self.assertSameAsDRF(PostSerializer, posts)
+        with override_settings(USE_TZ=False):
+            self.assertSameAsDRF(PostSerializer, posts)
+
+    def test_missing_relations_as_drf(self):
+        # a user without a role, nested serializers render it as None
+        self.assertSameAsDRF(UserListSerializer, User.objects.all())
+        self.assertSameAsDRF(UserListSerializer, [])
+
+    def test_manager_rows(self):
+        self.assertEqual(fast_data(CategorySerializer, self.post.category), [{'category_name': 'First'}])
+
+    def test_custom_representation_rendered_by_drf(self):
+        self.assertIsNone(get_plan(CustomRepresentationSerializer))
+        self.assertEqual(
+            fast_data(CustomRepresentationSerializer, Category.objects.filter(pk=self.first.pk)), [{'name': 'FIRST'}]
+        )
+
+    @override_settings(FAST_SERIALIZERS=False)
+    def test_disabled(self):
+        data = fast_data(CategorySerializer, Category.objects.filter(pk=self.first.pk))
+        self.assertIsInstance(data, serializers.ReturnList)
+        self.assertEqual(data, [{'category_name': 'First'}])
+
+    def test_no_extra_queries(self):
+        posts = list(PostSerializer.setup_eager_loading(Post.objects.all()))
+        with self.assertNumQueries(0):
+            fast_data(PostSerializer, posts)
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..metrics import CACHE_REQUESTS, REQUESTS, REQUEST_QUERIES, Registry, registry
+from ..models.post import Post
+from ..models.user import Role
+
+
+class RegistryTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.registry = Registry()
+        self.requests = self.registry.counter('requests_total', 'Requests.', ['view'])
+        self.latency = self.registry.histogram('latency_seconds', 'Latency.', ['view'], buckets=(0.1, 1))
+        self.workers = self.registry.gauge('busy_workers', 'Busy workers.')
+
+    def test_render(self):
+        self.requests.inc(('posts',))
+        self.requests.inc(('posts',))
+        self.latency.observe(('posts',), 0.05)
+        self.latency.observe(('posts',), 0.5)
+        self.latency.observe(('posts',), 5)
+        self.workers.set((), 3)
+        lines = self.registry.render().splitlines()
+        self.assertIn('# TYPE requests_total counter', lines)
+        self.assertIn('requests_total{view="posts"} 2', lines)
+        self.assertIn('latency_seconds_bucket{view="posts",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{view="posts",le="1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{view="posts",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_sum{view="posts"} 5.55', lines)
+        self.assertIn('latency_seconds_count{view="posts"} 3', lines)
+        self.assertIn('busy_workers 3', lines)
+
+    def test_label_values_escaped(self):
+        self.requests.inc(('say "hi"\n',))
+        self.assertIn('requests_total{view="say \\"hi\\"\\n"} 1', self.registry.render())
+
+    def test_processes_added_up(self):
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        other = Registry()
+        other.counter('requests_total', 'Requests.', ['view']).inc(('posts',), 5)
+        other.histogram('latency_seconds', 'Latency.', ['view'], buckets=(0.1, 1)).observe(('posts',), 0.5)
+        other.gauge('busy_workers', 'Busy workers.').set((), 2)
+        snapshot = json.dumps(other.snapshot())
+        # a live worker (the parent of this process) and one that has exited
+        for pid in [os.getppid(), finished.pid]:
+            Path(self.directory, f'metrics_{pid}.json').write_text(snapshot)
+
+        self.requests.inc(('posts',))
+        self.workers.set((), 1)
+        with override_settings(METRICS_DIR=self.directory):
+            lines = self.registry.render().splitlines()
+        # counters of every worker, gauges of the live ones only
+        self.assertIn('requests_total{view="posts"} 11', lines)
+        self.assertIn('latency_seconds_count{view="posts"} 2', lines)
+        self.assertIn('busy_workers 3', lines)
+        self.assertTrue(Path(self.directory, f'metrics_{os.getpid()}.json').exists())
+
+    def test_callback_gauge_not_added_up(self):
+        queue = self.registry.gauge('queue_depth', 'Queue depth.', callback=lambda: 7)
+        other = Registry()
+        other.register(type(queue)('queue_depth', 'Queue depth.', callback=lambda: 7)).collect()
+        Path(self.directory, f'metrics_{os.getppid()}.json').write_text(json.dumps(other.snapshot()))
+        with override_settings(METRICS_DIR=self.directory):
+            self.assertIn('queue_depth 7\n', self.registry.render())
+
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True)
+        Post.objects.create(
+            title='Test Post',
+            body='Test Body',
+            user_id=self.blogger,
+            status='published',
+            description='Test Description',
+        )
+
+    def test_request_recorded(self):
+        labels = ('not_a_boring_blog:get-public-posts', 'GET', '200')
+        before = REQUESTS.values.get(labels, 0)
+        queries_before = REQUEST_QUERIES.values.get(labels[:1], [0] * 11)[:-1]
+        self.client.get(reverse('not_a_boring_blog:get-public-posts'))
+        self.assertEqual(REQUESTS.values[labels], before + 1)
+        # the 2 queries of the view land in the "le=2" bucket
+        queries_after = REQUEST_QUERIES.values[labels[:1]][:-1]
+        self.assertEqual(queries_after[2], queries_before[2] + 1)
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_feed_cache_hits(self):
+        url = reverse('not_a_boring_blog:only-user-posts', kwargs={'username': 'blogger'})
+        hits = CACHE_REQUESTS.values.get(('user_feed', 'hit'), 0)
+        misses = CACHE_REQUESTS.values.get(('user_feed', 'miss'), 0)
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(CACHE_REQUESTS.values[('user_feed', 'miss')], misses + 1)
+        self.assertEqual(CACHE_REQUESTS.values[('user_feed', 'hit')], hits + 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('not_a_boring_blog:get-public-posts'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn(b'# TYPE http_request_duration_seconds histogram', response.content)
+        self.assertIn(b'view_ingestion_buffer_depth 0', response.content)
+        self.assertEqual(registry.metrics['http_requests_total'], REQUESTS)
+
+    def test_metrics_endpoint_allowlist(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['203.0.113.0/24']):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    async def test_queries_counted_under_asgi(self):
+        # the ORM runs in another thread than the middleware, sync and async views alike
+        for name in ('async-public-posts', 'get-public-posts'):
+            view = f'not_a_boring_blog:{name}'
+            before = REQUEST_QUERIES.values.get((view,), [0] * 11)[:-1]
+            response = await AsyncClient().get(reverse(view))
+            self.assertEqual(response.status_code, 200)
+            after = REQUEST_QUERIES.values[(view,)][:-1]
+            self.assertEqual(after[0], before[0], name)
+            self.assertGreater(sum(after), sum(before), name)
@@ -0,0 +1,119 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models.post import Category, Post, PostContent
+from ..models.user import Role
+
+
+def url(name, **kwargs):
+    return reverse(f'not_a_boring_blog:{name}', kwargs=kwargs)
+
+
+class PostContentTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Bio')
+        self.token = Token.objects.create(user=self.blogger)
+        self.category = Category.objects.create(category_name='Content')
+        self.post = Post.objects.create(
+            title='Post', body='Long body', user_id=self.blogger, status='published',
+            description='Description',
+        )
+        self.post.category.add(self.category)
+
+    def test_body_in_content_table(self):
+        self.assertEqual(PostContent.objects.get(post=self.post).body, 'Long body')
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.body, 'Long body')
+        post.body = 'New body'
+        post.save()
+        self.assertEqual(PostContent.objects.get(post=self.post).body, 'New body')
+
+    def test_unchanged_body_not_written(self):
+        post = Post.objects.select_related('content').get(pk=self.post.pk)
+        post.body = 'Long body'
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        self.assertNotIn('postcontent', ' '.join(query['sql'] for query in queries.captured_queries))
+
+    def test_deleted_with_the_post(self):
+        self.post.delete()
+        self.assertFalse(PostContent.objects.exists())
+
+    def test_lists_never_read_the_content(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        for name, kwargs in [
+            ('get-public-posts', {}),
+            ('only-user-posts', {'username': 'blogger'}),
+            ('my-posts', {}),
+            ('category_posts', {'category_name': 'Content'}),
+        ]:
+            with self.subTest(name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url(name, **kwargs))
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('body', response.json()[0])
+                self.assertNotIn('postcontent', ' '.join(query['sql'] for query in queries.captured_queries))
+
+    def test_detail_joins_the_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url('post-detail', pk=self.post.pk))
+        self.assertEqual(response.json()['body'], 'Long body')
+        post_queries = [query['sql'] for query in queries.captured_queries if 'postcontent' in query['sql']]
+        self.assertEqual(len(post_queries), 1)
+        self.assertIn('JOIN "not_a_boring_blog_postcontent"', post_queries[0])
+
+    def test_create_and_update(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = self.client.post(url('post-create'), {
+            'title': 'Created', 'category': [self.category.pk], 'status': 'published',
+            'description': 'Description', 'body': 'Created body',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        post = Post.objects.get(title='Created')
+        self.assertEqual(post.content.body, 'Created body')
+        response = self.client.put(url('post-detail', pk=post.pk), {
+            'title': 'Updated', 'category': [self.category.pk], 'status': 'published',
+            'description': 'Description', 'body': 'Updated body',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['body'], 'Updated body')
+        self.assertEqual(PostContent.objects.get(post=post).body, 'Updated body')
+
+
+class PostContentMigrationTest(TransactionTestCase):
+    before = [('not_a_boring_blog', '0021_category_category_key')]
+    after = [('not_a_boring_blog', '0022_postcontent')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_bodies_moved_and_back(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('auth', 'User').objects.create(username='author')
+        OldPost = apps.get_model('not_a_boring_blog', 'Post')
+        for number in range(3):
+            OldPost.objects.create(
+                title=f'Post {number}', body=f'Body {number}', user_id_id=user.pk, status='published',
+                min_read='5', description='Description',
+            )
+
+        apps = self.migrate(self.after)
+        contents = apps.get_model('not_a_boring_blog', 'PostContent').objects.order_by('post_id')
+        self.assertEqual([content.body for content in contents], ['Body 0', 'Body 1', 'Body 2'])
+
+        apps = self.migrate(self.before)
+        posts = apps.get_model('not_a_boring_blog', 'Post').objects.order_by('id')
+        self.assertEqual([post.body for post in posts], ['Body 0', 'Body 1', 'Body 2'])
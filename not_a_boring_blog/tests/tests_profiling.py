@@ -0,0 +1,73 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from ..models.post import Post
+from ..models.user import Role
+from ..middleware.profiling import LOG_NAME
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True)
+        Post.objects.create(
+            title='Test Post',
+            body='Test Body',
+            user_id=self.blogger,
+            status='published',
+            description='Test Description',
+        )
+        self.url = reverse('not_a_boring_blog:get-public-posts')
+
+    def records(self):
+        with open(Path(self.directory) / LOG_NAME) as file:
+            return [json.loads(line) for line in file]
+
+    def test_disabled_by_default(self):
+        response = APIClient().get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_sampled_request_recorded(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory):
+            response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;desc="2 queries";dur=[\d.]+$')
+
+        [record] = self.records()
+        self.assertEqual(record['view'], 'not_a_boring_blog:get-public-posts')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], 2)
+        self.assertEqual(len(record['slow_queries']), 2)
+        self.assertIsNone(record['profile'])
+
+    def test_cprofile_dump_over_threshold(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory,
+                               PROFILING_CPROFILE_THRESHOLD_MS=0, PROFILING_MAX_PROFILES=2):
+            client = APIClient()
+            for _ in range(3):
+                client.get(self.url)
+        records = self.records()
+        self.assertTrue(all(record['profiled'] for record in records))
+        # only the newest dumps are kept
+        self.assertEqual(len(list(Path(self.directory).glob('*.prof'))), 2)
+
+        output = StringIO()
+        call_command('profiling_report', dir=self.directory, profile=records[-1]['id'], stdout=output)
+        self.assertIn('function calls', output.getvalue())
+
+    def test_report(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory):
+            APIClient().get(self.url)
+        output = StringIO()
+        call_command('profiling_report', dir=self.directory, stdout=output)
+        self.assertIn('not_a_boring_blog:get-public-posts', output.getvalue())
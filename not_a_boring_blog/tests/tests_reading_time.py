@@ -0,0 +1,141 @@
+import random
+import sys
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models.post import Category, Post
+from ..models.user import Role
+from ..reading_time import count_words, count_words_batch, reading_minutes
+
+
+def url(name, **kwargs):
+    return reverse(f'not_a_boring_blog:{name}', kwargs=kwargs)
+
+
+def words(count):
+    return ' '.join(['word'] * count)
+
+
+class WordCountTest(SimpleTestCase):
+    def test_count_words(self):
+        self.assertEqual(count_words(''), 0)
+        self.assertEqual(count_words('  one\ttwo\n\nthree  '), 3)
+        self.assertEqual(count_words('déjà\x00vu'), 2)
+
+    def test_reading_minutes(self):
+        self.assertEqual([reading_minutes(count) for count in (0, 1, 200, 201, 1000)], [1, 1, 1, 2, 5])
+
+    def test_batch_matches_single_count(self):
+        rng = random.Random(7)
+        alphabet = ['a', 'é', ' ', '  ', '\n', '\t', '\x00', '\x1f', '\xa0', '-']
+        texts = [''.join(rng.choices(alphabet, k=rng.randint(0, 40))) for _ in range(300)]
+        expected = [count_words(text) for text in texts]
+        self.assertEqual(count_words_batch(texts), expected)
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            self.assertEqual(count_words_batch(texts), expected)
+        self.assertEqual(count_words_batch([]), [])
+
+
+class ReadingTimeTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Bio')
+        self.token = Token.objects.create(user=self.blogger)
+        self.category = Category.objects.create(category_name='Reading')
+        self.posts = {}
+        for minutes in (1, 3, 5):
+            post = Post.objects.create(
+                title=f'{minutes} minutes', body=f'{minutes} {words(minutes * 200 - 1)}', user_id=self.blogger,
+                status='published', description='Description',
+            )
+            post.category.add(self.category)
+            self.posts[minutes] = post
+
+    def test_computed_on_save(self):
+        self.assertEqual({minutes: post.min_read for minutes, post in self.posts.items()}, {1: 1, 3: 3, 5: 5})
+        post = self.posts[1]
+        post.body = words(401)
+        post.save()
+        self.assertEqual(Post.objects.get(pk=post.pk).min_read, 3)
+
+    def test_client_value_ignored(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = self.client.post(url('post-create'), {
+            'title': 'Created', 'category': [self.category.pk], 'status': 'published', 'min_read': '45 minutes',
+            'description': 'Description', 'body': words(250),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['min_read'], 2)
+        post = Post.objects.get(title='Created')
+        response = self.client.put(url('post-detail', pk=post.pk), {
+            'title': 'Updated', 'category': [self.category.pk], 'status': 'published', 'min_read': 45,
+            'description': 'Description', 'body': 'Short',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Post.objects.get(pk=post.pk).min_read, 1)
+
+    def titles(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [post['title'] for post in response.json()]
+
+    def test_filter_and_order(self):
+        for path in (url('get-public-posts'), url('category_posts', category_name='Reading')):
+            with self.subTest(path):
+                self.assertEqual(self.titles(path + '?min_read=2&max_read=5'), ['5 minutes', '3 minutes'])
+                self.assertEqual(self.titles(path + '?ordering=min_read'), ['1 minutes', '3 minutes', '5 minutes'])
+                self.assertEqual(self.titles(path + '?max_read=3&ordering=-min_read'), ['3 minutes', '1 minutes'])
+
+    def test_invalid_filter(self):
+        response = self.client.get(url('get-public-posts') + '?min_read=five&ordering=title')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'min_read', 'ordering'})
+
+    def test_backfill(self):
+        Post.objects.filter(pk=self.posts[5].pk).update(min_read=1)
+        Post.objects.filter(pk=self.posts[3].pk).update(min_read=9)
+        out = StringIO()
+        call_command('backfill_reading_time', chunk_size=2, stdout=out)
+        self.assertEqual(out.getvalue().strip(), '3 posts checked, 2 updated')
+        self.assertEqual(
+            dict(Post.objects.values_list('title', 'min_read')),
+            {'1 minutes': 1, '3 minutes': 3, '5 minutes': 5},
+        )
+
+
+class ReadingTimeMigrationTest(TransactionTestCase):
+    before = [('not_a_boring_blog', '0022_postcontent')]
+    after = [('not_a_boring_blog', '0023_post_min_read_integer')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_text_parsed_and_back(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('auth', 'User').objects.create(username='author')
+        OldPost = apps.get_model('not_a_boring_blog', 'Post')
+        for text in ('5', '12 mins', 'long'):
+            OldPost.objects.create(title=text, user_id_id=user.pk, status='published', min_read=text, description='')
+
+        apps = self.migrate(self.after)
+        posts = apps.get_model('not_a_boring_blog', 'Post').objects.order_by('id')
+        self.assertEqual([post.min_read for post in posts], [5, 12, 1])
+
+        apps = self.migrate(self.before)
+        posts = apps.get_model('not_a_boring_blog', 'Post').objects.order_by('id')
+        self.assertEqual([post.min_read for post in posts], ['5', '12', '1'])
@@ -0,0 +1,103 @@
+import datetime
+import decimal
+import uuid
+import zoneinfo
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from ..benchmarks.rendering import RenderingBenchmark
+from ..models.post import Post
+from ..models.user import Role
+from ..parsers import FastJSONParser
+from ..renderers import FastJSONRenderer, dumps
+
+SAMPLES = {
+    'datetimes': [
+        datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=zoneinfo.ZoneInfo('Europe/London')),
+        datetime.datetime(2024, 7, 2, 3, 4, 5, tzinfo=zoneinfo.ZoneInfo('Europe/London')),
+        datetime.datetime(2024, 1, 2, 3, 4, 5),
+        datetime.date(2024, 1, 2),
+        datetime.time(1, 2, 3, 4),
+        datetime.timedelta(minutes=5),
+    ],
+    'decimals': [decimal.Decimal('1.10'), decimal.Decimal('-0.5'), decimal.Decimal('12345678901234.5')],
+    'text': ['plain', 'ünïcödé ✓', 'line\u2028separator\u2029paragraph', 'quote " backslash \\', gettext_lazy('lazy')],
+    'other': [uuid.UUID(int=5), None, True, 1.5, 2 ** 70, {1: 'int key'}, ('tuple',)],
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertSameAsDRF(self, data, *args):
+        self.assertEqual(FastJSONRenderer().render(data, *args), JSONRenderer().render(data, *args))
+
+    def test_same_bytes_as_drf(self):
+        for name, values in SAMPLES.items():
+            with self.subTest(name):
+                self.assertSameAsDRF(values)
+                self.assertSameAsDRF({'nested': {'values': values}})
+
+    def test_indent_rendered_by_drf(self):
+        self.assertSameAsDRF({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertSameAsDRF({'a': [1, 2]}, None, {'indent': 2})
+
+    def test_none_is_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_without_orjson(self):
+        with mock.patch('not_a_boring_blog.renderers.orjson', None):
+            for name, values in SAMPLES.items():
+                with self.subTest(name):
+                    self.assertSameAsDRF(values)
+                    self.assertEqual(dumps(values), JSONRenderer().render(values))
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, parser, content):
+        return parser.parse(BytesIO(content), 'application/json', {'encoding': 'utf-8'})
+
+    def test_same_data_as_drf(self):
+        content = '{"title": "ünïcödé", "ids": [1, 2, 36893488147419103232], "ratio": 0.5, "none": null}'.encode()
+        self.assertEqual(self.parse(FastJSONParser(), content), self.parse(JSONParser(), content))
+
+    def test_errors_as_drf(self):
+        for content in [b'{"title": ', b'{"ratio": NaN}', b'']:
+            with self.subTest(content):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), content)
+                with self.assertRaises(ParseError) as error:
+                    self.parse(FastJSONParser(), content)
+                self.assertEqual(str(error.exception), str(expected.exception))
+
+    def test_other_encoding_parsed_by_drf(self):
+        content = '{"title": "ünïcödé"}'.encode('utf-16')
+        data = FastJSONParser().parse(BytesIO(content), 'application/json', {'encoding': 'utf-16'})
+        self.assertEqual(data, {'title': 'ünïcödé'})
+
+
+class RenderingBenchmarkTest(TestCase):
+    def test_report(self):
+        author = User.objects.create(username='author', password='author')
+        Role.objects.create(user=author, is_blogger=True)
+        for number in range(3):
+            Post.objects.create(
+                title=f'Post {number}', body='Body\u2028line', user_id=author, status='published',
+                description='Post',
+            )
+        report = RenderingBenchmark(posts=2, iterations=2).run()
+        self.assertEqual(report['posts'], 2)
+        self.assertEqual(set(report['render_ms']), {'json', 'fast'})
+        self.assertEqual(set(report['serialize_ms']), {'drf', 'fast'})
+        self.assertGreater(report['render_speedup'], 0)
+
+    def test_api_response_rendered(self):
+        response = self.client.get(reverse('not_a_boring_blog:list_categories'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
@@ -0,0 +1,132 @@
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..checks import check_replica_pin_cache
+from ..db.routers import ReplicaRouter, replica_reads, replica_reads_allowed
+from ..middleware.replicas import PIN_COOKIE, ReplicaRoutingMiddleware
+from ..models.post import Category, Post
+from ..models.user import Role
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        patcher = mock.patch('not_a_boring_blog.db.routers.replicas', return_value=['replica_1', 'replica_2'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_primary_outside_of_requests(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_replica_when_allowed(self):
+        with replica_reads():
+            self.assertIn(self.router.db_for_read(Post), ['replica_1', 'replica_2'])
+            # auth tables and writes stay on the primary
+            self.assertEqual(self.router.db_for_read(User), 'default')
+            self.assertEqual(self.router.db_for_read(Token), 'default')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_mirror_of_primary_skipped(self):
+        with mock.patch('not_a_boring_blog.db.routers.replicas', return_value=[]), replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_no_replicas_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]), replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_shared_cache_required(self):
+        local = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache'}}
+        with override_settings(CACHES=local):
+            self.assertEqual([error.id for error in check_replica_pin_cache(None)], ['not_a_boring_blog.E001'])
+            with override_settings(DATABASE_REPLICAS=[]):
+                self.assertEqual(check_replica_pin_cache(None), [])
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_replica_pin_cache(None), [])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.allowed = []
+        self.status = 200
+
+    def get_response(self, request):
+        self.allowed.append(replica_reads_allowed())
+        return HttpResponse(status=self.status)
+
+    def call(self, request):
+        return ReplicaRoutingMiddleware(self.get_response)(request)
+
+    def test_safe_request_reads_replica(self):
+        self.call(self.factory.get('/'))
+        self.assertEqual(self.allowed, [True])
+        self.assertFalse(replica_reads_allowed())
+
+    def test_unsafe_request_reads_primary(self):
+        response = self.call(self.factory.post('/'))
+        self.assertEqual(self.allowed, [False])
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+
+    def test_pinned_by_cookie_after_write(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.call(request)
+        self.assertEqual(self.allowed, [False])
+
+    def test_pinned_by_token_after_write(self):
+        self.call(self.factory.put('/', HTTP_AUTHORIZATION='Token abc'))
+        self.call(self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+        self.call(self.factory.get('/', HTTP_AUTHORIZATION='Token other'))
+        self.assertEqual(self.allowed, [False, False, True])
+
+    def test_failed_write_not_pinned(self):
+        self.status = 400
+        response = self.call(self.factory.post('/', HTTP_AUTHORIZATION='Token abc'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.call(self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+        self.assertEqual(self.allowed, [False, True])
+
+
+@unittest.skipUnless(
+    'replica_1' in settings.DATABASES and not settings.DATABASES['replica_1'].get('TEST', {}).get('MIRROR'),
+    'needs a replica with its own test database (DATABASE_REPLICA_TEST_MIRROR=false)',
+)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Primary and replica are two separate databases here, nothing replicates between them"""
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for database in ['default', 'replica_1']:
+            blogger = User.objects.db_manager(database).create(username='blogger', password='blogger')
+            Role.objects.using(database).create(user=blogger, is_blogger=True)
+            Category.objects.using(database).create(category_name=f'Category on {database}')
+        self.token = Token.objects.create(user=User.objects.get(username='blogger'))
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}', 'format': 'json'}
+
+    def category_names(self):
+        response = self.client.get(reverse('not_a_boring_blog:list_categories'), **self.headers)
+        return [category['category_name'] for category in response.data]
+
+    def test_get_reads_replica(self):
+        self.assertEqual(self.category_names(), ['Category on replica_1'])
+
+    def test_read_after_write_on_primary(self):
+        response = self.client.post(
+            reverse('not_a_boring_blog:create_category'), {'category_name': 'New'}, **self.headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertCountEqual(self.category_names(), ['Category on default', 'New'])
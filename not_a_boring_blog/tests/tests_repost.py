@@ -12,6 +12,12 @@ import json
 from django.contrib.auth.hashers import make_password
 from django.utils.timezone import now
 from ..models.repost_request import RepostRequest, STATUS
+from ..feeds import feed_cache_key
+from django.core.cache import cache
+from unittest import mock
+from django.db import connection, transaction, IntegrityError
+from django.test.utils import CaptureQueriesContext
+from .query_budget import QueryBudgetMixin
 
 
 
@@ -29,7 +35,6 @@ class CreateRepostRequestTest(TestCase):
             body='Test post Body',
             user_id=self.blogger,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         self.url = reverse('not_a_boring_blog:request_repost', kwargs={'post_id': self.post.id})
@@ -59,6 +64,42 @@ class CreateRepostRequestTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+    def test_create_repost_request_single_insert(self):
+        """Test that the happy path is one INSERT and no lookups of the post or existing requests"""
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'requester_id': self.blogger.id, 'post_id': self.post.id, 'status': 'requested'})
+        repost_queries = [q['sql'] for q in queries.captured_queries if 'repostrequest' in q['sql']]
+        self.assertEqual(len(repost_queries), 1, repost_queries)
+        self.assertTrue(repost_queries[0].startswith('INSERT'))
+        self.assertEqual(RepostRequest.objects.filter(requester_id=self.blogger, post_id=self.post).count(), 1)
+
+
+    def test_create_repost_request_post_not_found(self):
+        """Test requesting a repost of a post that does not exist"""
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        url = reverse('not_a_boring_blog:request_repost', kwargs={'post_id': self.post.id + 100})
+        response = self.client.post(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(RepostRequest.objects.exists())
+
+
+    def test_duplicate_repost_request_rejected_by_database(self):
+        """Test that the unique constraint rejects a second request for the same post"""
+        RepostRequest.objects.create(requester_id=self.blogger, post_id=self.post, status='requested')
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                RepostRequest.objects.create(requester_id=self.blogger, post_id=self.post, status='requested')
+
+
     def test_create_repost_request_unauthenticated(self):
         """Test creating a repost request without authentication"""
         response = self.client.post(self.url)
@@ -69,7 +110,7 @@ class CreateRepostRequestTest(TestCase):
 # there is no reason to check 404 error, while according to serializer default, there always be requested (201)
 
 
-class RepostRequestedReceivedListTest(TestCase):
+class RepostRequestedReceivedListTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='user', password='passworduser')
@@ -83,7 +124,6 @@ class RepostRequestedReceivedListTest(TestCase):
             body='Test post Body',
             user_id=self.blogger,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         self.url = reverse('not_a_boring_blog:requests_received')
@@ -104,6 +144,39 @@ class RepostRequestedReceivedListTest(TestCase):
         #print(response.content)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         #print(len(response.data)) # Assert that the serialized repost request is present in the response data
+        self.assertEqual(response.data['results'][0]['requester_username'], self.user.username)
+
+
+    def test_repost_requests_received_list_pagination(self):
+        """Test that the received list is served in cursor pages"""
+        for i in range(3):
+            requester = User.objects.create(username=f'requester{i}', password='password')
+            RepostRequest.objects.create(requester_id=requester, post_id=self.post, status='requested')
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        response = self.client.get(self.url, {'page_size': 2}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        next_page = self.client.get(response.data['next'], **headers)
+        self.assertEqual(next_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(next_page.data['results']), 1)
+        self.assertIsNone(next_page.data['next'])
+
+
+    def test_query_budget(self):
+        def add_rows(count):
+            for _ in range(count):
+                number = User.objects.count()
+                requester = User.objects.create(username=f'requester{number}', password='password')
+                RepostRequest.objects.create(requester_id=requester, post_id=self.post, status='requested')
+
+        add_rows(1)
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}'}
+        self.assertListQueryBudget('requests_received', lambda: self.client.get(self.url, **headers), add_rows)
 
 
     def test_repost_requests_received_list_unauthenticated(self):
@@ -113,7 +186,7 @@ class RepostRequestedReceivedListTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class RepostRequestsSentListTest(TestCase):
+class RepostRequestsSentListTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='user', password='passworduser')
@@ -127,7 +200,6 @@ class RepostRequestsSentListTest(TestCase):
             body='Test post Body',
             user_id=self.blogger,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         self.url = reverse('not_a_boring_blog:requests_sent')
@@ -148,7 +220,46 @@ class RepostRequestsSentListTest(TestCase):
         #print(response.content)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         #print(len(response.data))
-        self.assertEqual(len(response.data), 1) # Assert that the serialized repost request is present in the response data
+        self.assertEqual(len(response.data['results']), 1) # Assert that the serialized repost request is present in the response data
+        self.assertEqual(response.data['results'][0]['post_title'], self.post.title)
+
+
+    def test_repost_requests_sent_list_status_filter(self):
+        """Test filtering the sent repost requests by status"""
+        other_post = Post.objects.create(
+            title='Other post',
+            body='Other post Body',
+            user_id=self.user,
+            status='published',
+            description='Other post Description'
+        )
+        RepostRequest.objects.create(requester_id=self.blogger, post_id=self.post, status='requested')
+        RepostRequest.objects.create(requester_id=self.blogger, post_id=other_post, status='approved')
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+        response = self.client.get(self.url, {'status': 'approved'}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['post_id'] for r in response.data['results']], [other_post.id])
+
+        response = self.client.get(self.url, {'status': 'invalid_status'}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_query_budget(self):
+        def add_rows(count):
+            for _ in range(count):
+                number = Post.objects.count()
+                post = Post.objects.create(
+                    title=f'Budget post {number}', body=f'Budget body {number}', user_id=self.user,
+                    status='published', description='Budget description',
+                )
+                RepostRequest.objects.create(requester_id=self.blogger, post_id=post, status='requested')
+
+        add_rows(1)
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}'}
+        self.assertListQueryBudget('requests_sent', lambda: self.client.get(self.url, **headers), add_rows)
 
 
     def test_repost_requests_sent_list_unauthenticated(self):
@@ -173,7 +284,6 @@ class UpdateRepostRequestStatusTest(TestCase):
             body='Test post Body',
             user_id=self.blogger,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         
@@ -231,6 +341,127 @@ class UpdateRepostRequestStatusTest(TestCase):
 
 
 
+class BulkUpdateRepostRequestStatusTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password=make_password('bloggerpass'))
+        self.blogger_role = Role.objects.create(user=self.blogger, is_blogger=True)
+        self.blogger_token = Token.objects.create(user=self.blogger)
+
+        self.post = Post.objects.create(
+            title='Test post Post',
+            body='Test post Body',
+            user_id=self.blogger,
+            status='published',
+            description='Test post Description'
+        )
+        self.post2 = Post.objects.create(
+            title='Test post Post2',
+            body='Test post Body2',
+            user_id=self.blogger,
+            status='published',
+            description='Test post Description2'
+        )
+        self.requester = User.objects.create(username='requester', password='requesterpass')
+        self.requester2 = User.objects.create(username='requester2', password='requesterpass2')
+        self.request1 = RepostRequest.objects.create(requester_id=self.requester, post_id=self.post, status='requested')
+        self.request2 = RepostRequest.objects.create(requester_id=self.requester2, post_id=self.post, status='requested')
+        self.request3 = RepostRequest.objects.create(requester_id=self.requester, post_id=self.post2, status='denied')
+        self.url = reverse('not_a_boring_blog:bulk_request_update')
+        self.headers = {
+            'HTTP_AUTHORIZATION': f'Token {self.blogger_token.key}',
+            'content_type': 'application/json',
+        }
+
+    def test_bulk_update_by_ids(self):
+        """Test approving requests by id with per-id results"""
+        missing_id = self.request3.id + 100
+        data = {'status': 'approved', 'request_ids': [self.request1.id, self.request3.id, missing_id]}
+        response = self.client.put(self.url, data=json.dumps(data), **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['results'], [
+            {'id': self.request1.id, 'result': 'updated'},
+            {'id': self.request3.id, 'result': 'not_pending'},
+            {'id': missing_id, 'result': 'not_found'},
+        ])
+        self.request1.refresh_from_db()
+        self.request3.refresh_from_db()
+        self.assertEqual(self.request1.status, 'approved')
+        self.assertEqual(self.request3.status, 'denied')
+
+    def test_bulk_update_all_pending_for_post(self):
+        """Test denying every pending request of a post"""
+        data = {'status': 'denied', 'post_id': self.post.id}
+        response = self.client.put(self.url, data=json.dumps(data), **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(RepostRequest.objects.filter(post_id=self.post, status='denied').count(), 2)
+
+    def test_bulk_update_other_users_requests(self):
+        """Test that requests for posts of another user are not found"""
+        other = User.objects.create(username='other', password='otherpass')
+        other_token = Token.objects.create(user=other)
+        headers = {
+            'HTTP_AUTHORIZATION': f'Token {other_token.key}',
+            'content_type': 'application/json',
+        }
+        data = {'status': 'approved', 'request_ids': [self.request1.id]}
+        response = self.client.put(self.url, data=json.dumps(data), **headers)
+        self.assertEqual(response.data['results'], [{'id': self.request1.id, 'result': 'not_found'}])
+        self.request1.refresh_from_db()
+        self.assertEqual(self.request1.status, 'requested')
+
+    def test_bulk_update_invalid_body(self):
+        """Test that exactly one selector and a valid status are required"""
+        data = {'status': 'approved', 'request_ids': [self.request1.id], 'post_id': self.post.id}
+        response = self.client.put(self.url, data=json.dumps(data), **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        data = {'status': 'requested', 'post_id': self.post.id}
+        response = self.client.put(self.url, data=json.dumps(data), **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_approve_invalidates_feeds_once_per_user(self):
+        """Test that the cached feed of every approved reposter is dropped once"""
+        cache.set(feed_cache_key(self.requester.id), ['cached'])
+        cache.set(feed_cache_key(self.requester2.id), ['cached'])
+        post3 = Post.objects.create(
+            title='Test post Post3',
+            body='Test post Body3',
+            user_id=self.blogger,
+            status='published',
+            description='Test post Description3'
+        )
+        request4 = RepostRequest.objects.create(requester_id=self.requester, post_id=post3, status='requested')
+        data = {'status': 'approved', 'request_ids': [self.request1.id, self.request2.id, request4.id]}
+        with mock.patch('django.core.cache.cache.delete_many', wraps=cache.delete_many) as delete_many:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.put(self.url, data=json.dumps(data), **self.headers)
+        self.assertEqual(response.data['updated'], 3)
+        delete_many.assert_called_once()
+        self.assertCountEqual(
+            delete_many.call_args.args[0],
+            [feed_cache_key(self.requester.id), feed_cache_key(self.requester2.id)]
+        )
+        self.assertIsNone(cache.get(feed_cache_key(self.requester.id)))
+        self.assertIsNone(cache.get(feed_cache_key(self.requester2.id)))
+
+    def test_approved_repost_shows_in_cached_feed(self):
+        """Test that a feed cached before the approval shows the repost afterwards"""
+        feed_url = reverse('not_a_boring_blog:only-user-posts', kwargs={'username': self.requester.username})
+        response = self.client.get(feed_url)
+        self.assertEqual(response.data, {'detail': 'requester has no posts'})
+
+        data = {'status': 'approved', 'post_id': self.post.id}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.url, data=json.dumps(data), **self.headers)
+
+        response = self.client.get(feed_url)
+        self.assertEqual([post['id'] for post in response.data], [self.post.id])
+
+
+
 class DeleteRepostRequestViewTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -245,7 +476,6 @@ class DeleteRepostRequestViewTest(TestCase):
             body='Test post Body',
             user_id=self.blogger,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         
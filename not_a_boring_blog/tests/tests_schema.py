@@ -0,0 +1,91 @@
+import json
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from ..schema import clear_schema_cache
+
+
+class SchemaTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.schema_dir = Path(directory.name)
+        settings = override_settings(SCHEMA_DIR=self.schema_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+        self.url = reverse('schema')
+
+    def build(self, *args):
+        out = StringIO()
+        # drf-spectacular prints its warnings about the views to stderr
+        with redirect_stderr(StringIO()):
+            call_command('build_schema', *args, stdout=out)
+        return out.getvalue()
+
+    def test_served_from_the_artifact(self):
+        self.build()
+        with mock.patch.object(SchemaGenerator, 'get_schema', side_effect=AssertionError('generated')):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, (self.schema_dir / 'openapi.yaml').read_bytes())
+            self.assertEqual(response['Content-Type'], 'application/vnd.oai.openapi; charset=utf-8')
+            self.assertTrue(response['ETag'].startswith('"'))
+            self.assertIn('no-cache', response['Cache-Control'])
+
+            response = self.client.get(self.url, {'format': 'json'})
+            self.assertEqual(json.loads(response.content)['openapi'], '3.0.3')
+            self.assertEqual(response['Content-Type'], 'application/vnd.oai.openapi+json')
+
+    def test_not_modified(self):
+        self.build()
+        etag = self.client.get(self.url)['ETag']
+        for header in (etag, 'W/' + etag, f'"other", {etag}'):
+            with self.subTest(header):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_kept_in_memory(self):
+        self.build()
+        content = self.client.get(self.url).content
+        (self.schema_dir / 'openapi.yaml').write_bytes(b'changed')
+        self.assertEqual(self.client.get(self.url).content, content)
+        clear_schema_cache()
+        self.assertEqual(self.client.get(self.url).content, b'changed')
+
+    def test_not_built(self):
+        self.assertEqual(self.client.get(self.url).status_code, 503)
+        with self.settings(DEBUG=True), redirect_stderr(StringIO()):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'openapi: 3.0.3', response.content)
+
+    def test_artifacts_readable_by_all(self):
+        self.build()
+        for name in ('openapi.yaml', 'openapi.json'):
+            self.assertEqual((self.schema_dir / name).stat().st_mode & 0o777, 0o644)
+
+    def test_unreadable_artifact(self):
+        self.build()
+        with mock.patch.object(Path, 'read_bytes', side_effect=PermissionError(13, 'Permission denied')):
+            self.assertEqual(self.client.get(self.url).status_code, 503)
+
+    def test_check(self):
+        with self.assertRaisesMessage(CommandError, 'out of date'):
+            self.build('--check')
+        self.build()
+        self.assertIn('up to date', self.build('--check'))
+        (self.schema_dir / 'openapi.json').write_bytes(b'{}')
+        with self.assertRaisesMessage(CommandError, '(json)'):
+            self.build('--check')
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from ..serializers.posts import PostDetailSerializer
+from ..models.comment import Comment
+from ..models.post import Category, Post
+from ..models.user import Role
+
+
+def url(name, **kwargs):
+    return reverse(f'not_a_boring_blog:{name}', kwargs=kwargs)
+
+
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.blogger = User.objects.create(username='blogger', password='blogger', email='blogger@mail.com')
+        Role.objects.create(user=self.blogger, is_blogger=True, bio='Bio')
+        category = Category.objects.create(category_name='Sparse')
+        for number in range(3):
+            self.post = Post.objects.create(
+                title=f'Post {number}', body=f'Long body {number}', user_id=self.blogger, status='published',
+                description=f'Description {number}',
+            )
+            self.post.category.add(category)
+        comment = Comment.objects.create(post_id=self.post, author=self.blogger, body='Comment')
+        Comment.objects.create(post_id=self.post, author=self.blogger, body='Reply', parent_id=comment)
+
+    def get(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_fields(self):
+        # the author comes with the posts, no query per post for a deferred column
+        with self.assertNumQueries(1):
+            data, sql = self.get(url('get-public-posts') + '?fields=title,author,min_read,description')
+        self.assertEqual(data[0], {'title': 'Post 2', 'author': 'blogger', 'min_read': 1, 'description': 'Description 2'})
+        selected = sql.partition(' FROM ')[0]
+        self.assertNotIn('"status"', selected)
+        self.assertNotIn('"created_at"', selected)
+        self.assertNotIn('not_a_boring_blog_role', sql)
+        self.assertNotIn('not_a_boring_blog_category', sql)
+
+    def test_omit(self):
+        full, _ = self.get(url('get-public-posts'))
+        data, sql = self.get(url('get-public-posts') + '?omit=description,bio')
+        self.assertEqual(data, [{name: value for name, value in post.items() if name not in ('description', 'bio')} for post in full])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('not_a_boring_blog_role', sql)
+
+    def test_order_of_the_serializer(self):
+        data, _ = self.get(url('get-public-posts') + '?fields=description, id,,bio')
+        self.assertEqual(list(data[0]), ['id', 'bio', 'description'])
+
+    def test_unknown_field(self):
+        response = self.client.get(url('get-public-posts') + '?fields=title,password&omit=secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': ['Unknown field: password.', 'Unknown field: secret.']})
+
+    def test_comments(self):
+        data, sql = self.get(url('comments', post_id=self.post.id) + '?fields=id,author_username')
+        self.assertEqual(data, [{'id': data[0]['id'], 'author_username': 'blogger'}])
+        self.assertNotIn('parent_id" IN', sql)
+        with self.assertNumQueries(2):
+            data, _ = self.get(url('comments', post_id=self.post.id) + '?fields=replies_count')
+        self.assertEqual(data, [{'replies_count': 1}])
+
+    def test_users(self):
+        data, sql = self.get(url('users_list') + '?omit=role,email')
+        self.assertEqual(data, [{'id': self.blogger.id, 'username': 'blogger'}])
+        self.assertNotIn('not_a_boring_blog_role', sql)
+        data, _ = self.get(url('users_list') + '?fields=role')
+        self.assertEqual(data, [{'role': {'bio': 'Bio'}}])
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    def test_cached_feed(self):
+        path = url('only-user-posts', username='blogger')
+        full, _ = self.get(path)
+        data, sql = self.get(path + '?fields=id,title')
+        self.assertEqual(data, [{'id': post['id'], 'title': post['title']} for post in full])
+        self.assertNotIn('not_a_boring_blog_post', sql)
+
+    @override_settings(FAST_SERIALIZERS=False)
+    def test_rendered_by_drf(self):
+        data, sql = self.get(url('get-public-posts') + '?fields=title,category')
+        self.assertEqual(data[0], {'title': 'Post 2', 'category': ['Sparse']})
+        self.assertNotIn('"description"', sql)
+
+    def test_post_detail(self):
+        posts = PostDetailSerializer.setup_eager_loading(Post.objects.filter(pk=self.post.pk), ('title', 'body', 'body_html'))
+        with self.assertNumQueries(1):
+            post = posts.get()
+            data = PostDetailSerializer(post, fields=('title', 'body', 'body_html'), include=('body_html',)).data
+        self.assertEqual(data, {'title': 'Post 2', 'body': 'Long body 2', 'body_html': '<p>Long body 2</p>'})
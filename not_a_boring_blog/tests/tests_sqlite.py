@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, override_settings
+from ..db.sqlite import apply_pragmas
+
+TUNED = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 1024 * 1024,
+    'cache_size': -2000,
+}
+
+
+class SQLiteFile:
+    """Django connections to a SQLite file of a temporary directory, opened per thread"""
+
+    def __init__(self, test_case, timeout=0.1):
+        directory = tempfile.mkdtemp()
+        test_case.addCleanup(shutil.rmtree, directory)
+        self.name = os.path.join(directory, 'load.sqlite3')
+        self.handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.name, 'OPTIONS': {'timeout': timeout}},
+        })
+        test_case.addCleanup(self.handler.close_all)
+
+    @property
+    def connection(self):
+        return self.handler['default']
+
+    def execute(self, sql, params=()):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+@override_settings(SQLITE_PRAGMAS=TUNED)
+class SQLitePragmasTest(SimpleTestCase):
+    def test_pragmas_set_on_connect(self):
+        database = SQLiteFile(self)
+        self.assertEqual(database.execute('PRAGMA journal_mode'), [('wal',)])
+        self.assertEqual(database.execute('PRAGMA synchronous'), [(1,)])  # NORMAL
+        self.assertEqual(database.execute('PRAGMA busy_timeout'), [(5000,)])
+        self.assertEqual(database.execute('PRAGMA cache_size'), [(-2000,)])
+
+    def test_apply_pragmas_reports_values(self):
+        database = SQLiteFile(self)
+        database.connection.ensure_connection()
+        applied = apply_pragmas(database.connection.connection, {'journal_mode': 'WAL', 'busy_timeout': 1000})
+        self.assertEqual(applied, {'journal_mode': 'wal', 'busy_timeout': 1000})
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_disabled(self):
+        database = SQLiteFile(self)
+        self.assertEqual(database.execute('PRAGMA journal_mode'), [('delete',)])
+
+    def test_settings_profile(self):
+        if settings.SQLITE_TUNED:
+            self.assertEqual(settings.SQLITE_PRAGMAS['journal_mode'], 'WAL')
+            self.assertEqual(settings.SQLITE_PRAGMAS['synchronous'], 'NORMAL')
+            self.assertGreater(settings.SQLITE_PRAGMAS['busy_timeout'], 0)
+
+
+class SQLiteConcurrencyTest(SimpleTestCase):
+    """A writer holds the write lock in one thread while readers and writers run in others"""
+
+    def setUp(self):
+        self.database = SQLiteFile(self)
+        self.database.execute('CREATE TABLE view (id integer PRIMARY KEY, post integer)')
+        self.database.execute('INSERT INTO view (post) VALUES (1)')
+
+    def in_thread(self, function):
+        """Runs function in another thread with its own connection, returns its result or exception"""
+        outcome = {}
+
+        def run():
+            try:
+                outcome['result'] = function()
+            except Exception as error:
+                outcome['error'] = error
+            finally:
+                self.database.connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(10)
+        return outcome
+
+    def hold_write_lock(self):
+        self.database.execute('BEGIN EXCLUSIVE')
+        self.database.execute('INSERT INTO view (post) VALUES (2)')
+        self.addCleanup(self.database.execute, 'ROLLBACK')
+
+    def count(self):
+        return self.database.execute('SELECT count(*) FROM view')[0][0]
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'DELETE'})  # SQLite's default
+    def test_rollback_journal_blocks_readers(self):
+        self.database.connection.close()
+        self.database.connection.ensure_connection()
+        self.hold_write_lock()
+        outcome = self.in_thread(self.count)
+        self.assertIsInstance(outcome.get('error'), OperationalError)
+        self.assertIn('locked', str(outcome['error']))
+
+    @override_settings(SQLITE_PRAGMAS=TUNED)
+    def test_wal_readers_not_blocked(self):
+        self.database.connection.close()
+        self.database.connection.ensure_connection()  # switches the file to WAL
+        self.hold_write_lock()
+        # the reader sees the last committed rows, not the pending insert
+        self.assertEqual(self.in_thread(self.count), {'result': 1})
+
+    @override_settings(SQLITE_PRAGMAS=TUNED)
+    def test_concurrent_load(self):
+        self.database.connection.close()
+        writes, reads, errors = 50, 100, []
+
+        def writer():
+            for _ in range(writes):
+                self.database.execute('INSERT INTO view (post) VALUES (1)')
+
+        def reader():
+            for _ in range(reads):
+                self.count()
+
+        def run(function):
+            try:
+                function()
+            except OperationalError as error:
+                errors.append(error)
+            finally:
+                self.database.connection.close()
+
+        threads = [threading.Thread(target=run, args=[function]) for function in [writer] * 4 + [reader] * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.count(), 1 + 4 * writes)
@@ -0,0 +1,41 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+from ..benchmarks.startup import StartupProfile, boot, parse_importtime
+
+IMPORTTIME = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1500 |       1620 | django
+import time:        30 |         30 |     django.utils.version
+garbage line
+'''
+
+
+class StartupProfileTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        self.assertEqual(parse_importtime(IMPORTTIME), [
+            ('_io', 120, 120), ('django', 1500, 1620), ('django.utils.version', 30, 30),
+        ])
+
+    def test_boot_leaves_heavy_modules_out(self):
+        measures, imports = boot(os.environ['DJANGO_SETTINGS_MODULE'])
+        self.assertGreater(measures['boot_ms'], 0)
+        self.assertGreater(measures['rss_kb'], 0)
+        modules = {module for module, _, _ in imports}
+        self.assertIn('not_a_boring_blog.views.post', modules)
+        # NumPy is for the reading time backfill, boto3 for S3, both off the boot of a server process
+        self.assertEqual({'numpy', 'boto3', 'storages', 'nh3', 'dj_database_url'} & modules, set())
+
+    def test_boot_without_docs_and_admin(self):
+        with mock.patch.dict(os.environ, {'API_DOCS_ENABLED': 'false', 'ADMIN_ENABLED': 'false'}):
+            _, imports = boot(os.environ['DJANGO_SETTINGS_MODULE'])
+        # DRF's schema module imports admin helpers (admindocs) whatever the settings, only the docs are left out
+        self.assertNotIn('drf_spectacular', {module.split('.')[0] for module, _, _ in imports})
+
+    def test_report(self):
+        report = StartupProfile(os.environ['DJANGO_SETTINGS_MODULE'], runs=1, top=3).run()
+        self.assertEqual(len(report['packages']), 3)
+        self.assertEqual(len(report['slowest_modules']), 3)
+        self.assertLessEqual(sum(report['packages'].values()), report['import_ms'] + 0.001)
+        self.assertIn('django', report['packages'])
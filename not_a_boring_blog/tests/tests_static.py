@@ -0,0 +1,126 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import brotli
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from ..middleware.static import IMMUTABLE, StaticFilesMiddleware
+
+SCRIPT = 'function hello() { return "hello"; }\n' * 40
+
+
+def not_found(request):
+    return HttpResponse('not found', status=404)
+
+
+async def async_not_found(request):
+    return HttpResponse('not found', status=404)
+
+
+class StaticFilesTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        source = self.directory / 'source'
+        (source / 'js').mkdir(parents=True)
+        (source / 'js' / 'app.js').write_text(SCRIPT)
+        (source / 'logo.png').write_bytes(b'\x89PNG' + bytes(range(256)) * 4)
+        (source / 'tiny.css').write_text('body { margin: 0 }')
+        (self.directory / 'secret.txt').write_text('secret')
+        settings = override_settings(
+            STATIC_URL='static/',
+            STATIC_ROOT=str(self.directory / 'collected'),
+            STATICFILES_DIRS=[str(source)],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='not_a_boring_blog.staticfiles.CompressedManifestStaticFilesStorage',
+            STATIC_SERVE=True,
+            STATIC_MAX_AGE=60,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0, stdout=StringIO())
+        self.collected = self.directory / 'collected'
+        self.manifest = json.loads((self.collected / 'staticfiles.json').read_text())['paths']
+        self.factory = RequestFactory()
+        self.middleware = StaticFilesMiddleware(not_found)
+
+    def get(self, path, method='get', **headers):
+        return getattr(self.factory, method)(path, headers=headers)
+
+    def test_variants_written(self):
+        hashed = self.manifest['js/app.js']
+        for name in ('js/app.js', hashed):
+            self.assertEqual(gzip.decompress((self.collected / f'{name}.gz').read_bytes()).decode(), SCRIPT)
+            self.assertEqual(brotli.decompress((self.collected / f'{name}.br').read_bytes()).decode(), SCRIPT)
+        # not compressible, too small to gain anything
+        for name in ('logo.png', 'tiny.css'):
+            self.assertFalse((self.collected / f'{name}.gz').exists())
+
+    def test_hashed_name_immutable(self):
+        response = self.middleware(self.get('/static/' + self.manifest['js/app.js']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(b''.join(response.streaming_content).decode(), SCRIPT)
+        self.assertEqual(response['Content-Type'], 'text/javascript; charset=utf-8')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_plain_name_revalidated(self):
+        response = self.middleware(self.get('/static/js/app.js'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        response = self.middleware(self.get('/static/js/app.js', if_none_match=response['ETag']))
+        self.assertEqual(response.status_code, 304)
+
+    def test_precompressed_variants(self):
+        path = '/static/' + self.manifest['js/app.js']
+        response = self.middleware(self.get(path, accept_encoding='gzip, deflate, br'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)).decode(), SCRIPT)
+        gzipped = self.middleware(self.get(path, accept_encoding='gzip'))
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(gzipped.streaming_content)).decode(), SCRIPT)
+        self.assertNotEqual(response['ETag'], gzipped['ETag'])
+        # the ETag of one encoding does not validate another
+        response = self.middleware(self.get(path, accept_encoding='gzip', if_none_match=response['ETag']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_head(self):
+        response = self.middleware(self.get('/static/js/app.js', method='head', accept_encoding='gzip'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(int(response['Content-Length']), (self.collected / 'js/app.js.gz').stat().st_size)
+
+    def test_falls_through(self):
+        for path in ('/static/missing.js', '/static/../secret.txt', '/static/%2e%2e/secret.txt', '/static/js', '/api/'):
+            with self.subTest(path):
+                self.assertEqual(self.middleware(self.get(path)).status_code, 404)
+        self.assertEqual(self.middleware(self.factory.post('/static/js/app.js')).status_code, 404)
+
+    def test_only_found_files_kept(self):
+        for number in range(20):
+            self.middleware(self.get(f'/static/missing{number}.css'))
+        self.middleware(self.get('/static/js/app.js'))
+        self.assertEqual(list(self.middleware.files), ['js/app.js'])
+        # collected after a miss, found on the next request
+        (self.collected / 'late.css').write_text('body { margin: 0 }')
+        self.assertEqual(self.middleware(self.get('/static/late.css')).status_code, 200)
+
+    def test_asgi(self):
+        middleware = StaticFilesMiddleware(async_not_found)
+        response = async_to_sync(middleware)(self.get('/static/js/app.js', accept_encoding='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), SCRIPT)
+        response = async_to_sync(middleware)(self.get('/static/missing.js'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_not_used(self):
+        for settings in ({'STATIC_SERVE': False}, {'STATIC_URL': 'https://cdn.example.com/static/'}):
+            with self.subTest(settings), override_settings(**settings), self.assertRaises(MiddlewareNotUsed):
+                StaticFilesMiddleware(not_found)
@@ -0,0 +1,176 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from .. import tasks
+from ..metrics import TASK_RUNS, VIEW_BUFFER_DEPTH
+from ..models.post import Post
+from ..models.task import FAILED, PENDING, RUNNING, Task
+from ..models.user import Role
+from ..models.views import View
+from ..tasks import TaskType, Worker, claim, enqueue, requeue_stale, run_batch
+
+
+def keep_test_connection(test):
+    # like the test client: the worker must not close the connection holding the test's transaction
+    patcher = mock.patch.object(tasks, 'close_old_connections')
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+@override_settings(TASK_RETRY_DELAY=10, TASK_LOCK_TIMEOUT=300)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.fail = False
+        task_types = {
+            'collect': TaskType(self.collect, batch_size=2, max_attempts=2),
+            'other': TaskType(self.collect, batch_size=10, max_attempts=2),
+        }
+        patcher = mock.patch.dict(tasks.TASK_TYPES, task_types)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        keep_test_connection(self)
+
+    def collect(self, payloads):
+        if self.fail:
+            raise RuntimeError('boom')
+        self.calls.append([payload['n'] for payload in payloads])
+
+    def test_batches_per_name_oldest_first(self):
+        for n, name in enumerate(['collect', 'other', 'collect', 'collect', 'other']):
+            enqueue(name, {'n': n})
+        results = Worker(poll_interval=0).run(once=True)
+        self.assertEqual(self.calls, [[0, 2], [1, 4], [3]])
+        self.assertEqual(results, {'done': 5, 'retried': 0, 'failed': 0})
+        self.assertFalse(Task.objects.exists())
+
+    def test_unknown_or_delayed(self):
+        with self.assertRaises(ValueError):
+            enqueue('missing', {})
+        enqueue('collect', {'n': 0}, delay=60)
+        self.assertEqual(claim('worker'), (None, []))
+
+    def test_claimed_once(self):
+        for n in range(3):
+            enqueue('collect', {'n': n})
+        name, claimed = claim('one')
+        self.assertEqual((name, [task.payload['n'] for task in claimed]), ('collect', [0, 1]))
+        self.assertEqual({task.status for task in claimed}, {RUNNING})
+        _, claimed = claim('two')
+        self.assertEqual([task.payload['n'] for task in claimed], [2])
+        self.assertEqual(claim('three'), (None, []))
+
+    def test_retried_then_failed(self):
+        enqueue('collect', {'n': 0})
+        self.fail = True
+        before = TASK_RUNS.values.get(('collect', 'failed'), 0)
+        self.assertEqual(run_batch(*claim('worker')), 'retried')
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), (PENDING, 1))
+        self.assertIn('RuntimeError: boom', task.last_error)
+        self.assertGreater(task.run_after, timezone.now() + timedelta(seconds=9))
+
+        Task.objects.update(run_after=timezone.now())
+        self.assertEqual(run_batch(*claim('worker')), 'failed')
+        self.assertEqual(Task.objects.get().status, FAILED)
+        self.assertEqual(TASK_RUNS.values[('collect', 'failed')], before + 1)
+        self.assertEqual(claim('worker'), (None, []))
+
+    @skipIf(connection.features.has_select_for_update_skip_locked, 'claims with SELECT ... FOR UPDATE SKIP LOCKED')
+    def test_claimed_by_one_statement(self):
+        # no read then write in a transaction: two SQLite workers would deadlock upgrading their locks
+        for n in range(3):
+            enqueue('collect', {'n': n})
+        with CaptureQueriesContext(connection) as queries:
+            claim('worker')
+        writes = [query['sql'] for query in queries if not query['sql'].startswith('SELECT')]
+        self.assertEqual(len(writes), 1, writes)
+        self.assertTrue(writes[0].startswith('UPDATE'))
+
+    def test_database_errors_waited_out(self):
+        enqueue('collect', {'n': 0})
+        errors = [OperationalError('database is locked')] * 2
+        run_once = Worker.run_once
+
+        def locked(worker):
+            if errors:
+                raise errors.pop()
+            return run_once(worker)
+
+        with mock.patch.object(Worker, 'run_once', locked), mock.patch.object(tasks.time, 'sleep') as sleep:
+            results = Worker(poll_interval=0).run(once=True)
+        self.assertEqual(results['done'], 1)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [tasks.ERROR_DELAY, tasks.ERROR_DELAY * 2])
+
+    def test_stale_requeued(self):
+        enqueue('collect', {'n': 0})
+        claim('dead')
+        self.assertEqual(requeue_stale(), 0)
+        Task.objects.update(locked_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(requeue_stale(), 1)
+        _, claimed = claim('alive')
+        self.assertEqual(claimed[0].attempts, 2)
+
+    def test_command(self):
+        enqueue('collect', {'n': 0})
+        out = StringIO()
+        call_command('run_tasks', once=True, stdout=out)
+        self.assertEqual(out.getvalue().strip(), '1 tasks done, 0 retried, 0 failed')
+        self.assertEqual(self.calls, [[0]])
+
+
+class RecordViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create(username='author')
+        Role.objects.create(user=self.author, is_blogger=True)
+        self.reader = User.objects.create(username='reader')
+        self.token = Token.objects.create(user=self.reader)
+        self.post = Post.objects.create(
+            title='Post', body='Body', user_id=self.author, status='published', description='Description',
+        )
+        keep_test_connection(self)
+
+    def view(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return self.client.post(reverse('not_a_boring_blog:create_post_view', kwargs={'post_id': self.post.id}))
+
+    def test_deferred_to_worker(self):
+        self.assertEqual(self.view().status_code, 202)
+        # accepted again until the worker wrote the first view, the task drops the repeat
+        self.assertEqual(self.view().status_code, 202)
+        self.assertFalse(View.objects.exists())
+        VIEW_BUFFER_DEPTH.collect()
+        self.assertEqual(VIEW_BUFFER_DEPTH.values[()], 2)
+        Worker(poll_interval=0).run(once=True)
+        view = View.objects.get()
+        self.assertEqual((view.post_id, view.user_id), (self.post, self.reader))
+        VIEW_BUFFER_DEPTH.collect()
+        self.assertEqual(VIEW_BUFFER_DEPTH.values[()], 0)
+        self.assertEqual(self.view().status_code, 429)
+
+    def test_cooldown_and_deleted_rows(self):
+        other = Post.objects.create(title='Other', body='Body', user_id=self.author, status='published', description='')
+        at = timezone.now()
+        tasks.record_views([
+            {'post': self.post.id, 'user': self.reader.id, 'at': at.isoformat()},
+            # a second request before the first view was written
+            {'post': self.post.id, 'user': self.reader.id, 'at': (at + timedelta(seconds=5)).isoformat()},
+            {'post': self.post.id, 'user': self.reader.id, 'at': (at + timedelta(minutes=2)).isoformat()},
+            {'post': other.id + 1, 'user': self.reader.id, 'at': at.isoformat()},
+            {'post': other.id, 'user': self.reader.id + 100, 'at': at.isoformat()},
+        ])
+        self.assertEqual(
+            list(View.objects.order_by('timestamp').values_list('post_id', 'timestamp')),
+            [(self.post.id, at), (self.post.id, at + timedelta(minutes=2))],
+        )
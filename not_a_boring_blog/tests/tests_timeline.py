@@ -0,0 +1,191 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models.follow import Follow
+from ..models.post import Category, Post
+from ..models.repost_request import RepostRequest
+from ..models.timeline import TimelineEntry
+from ..models.user import Role
+from ..tasks import Worker
+from .tests_tasks import keep_test_connection
+
+
+def url(name, **kwargs):
+    return reverse(f'not_a_boring_blog:{name}', kwargs=kwargs)
+
+
+class TimelineTest(TestCase):
+    def setUp(self):
+        self.clients, self.users = {}, {}
+        for name in ('author', 'reader', 'reposter'):
+            user = self.users[name] = User.objects.create(username=name)
+            Role.objects.create(user=user, is_blogger=True)
+            self.clients[name] = APIClient()
+            self.clients[name].credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+        self.category = Category.objects.create(category_name='Timeline')
+        keep_test_connection(self)
+
+    def publish(self, title, user='author', status='published'):
+        response = self.clients[user].post(url('post-create'), {
+            'title': title, 'category': [self.category.pk], 'status': status,
+            'description': 'Description', 'body': f'Body of {title}',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return Post.objects.get(title=title)
+
+    def follow(self, user, author, method='post'):
+        return getattr(self.clients[user], method)(url('follow', username=author))
+
+    def timeline(self, user='reader', query=''):
+        response = self.clients[user].get(url('timeline') + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def titles(self, user='reader'):
+        return [(post['title'], post['reposted_by']) for post in self.timeline(user)['results']]
+
+    def run_tasks(self):
+        Worker(poll_interval=0).run(once=True)
+
+    def test_follow(self):
+        self.assertEqual(self.follow('reader', 'author').status_code, 201)
+        self.assertEqual(self.follow('reader', 'author').status_code, 200)
+        self.assertEqual(self.follow('reader', 'reader').status_code, 400)
+        self.assertEqual(self.follow('reader', 'nobody').status_code, 404)
+        self.assertEqual(Role.objects.get(user=self.users['author']).followers_count, 1)
+        self.assertEqual(self.follow('reader', 'author', 'delete').status_code, 204)
+        self.assertEqual(self.follow('reader', 'author', 'delete').status_code, 404)
+        self.assertEqual(Role.objects.get(user=self.users['author']).followers_count, 0)
+        self.assertEqual(APIClient().get(url('timeline')).status_code, 401)
+
+    def test_fan_out_on_publish(self):
+        self.publish('Before')
+        self.follow('reader', 'author')
+        self.publish('Published')
+        draft = self.publish('Draft', status='editing')
+        self.run_tasks()
+        # Before comes from the backfill of the follow
+        self.assertEqual(self.titles(), [('Published', None), ('Before', None)])
+
+        response = self.clients['author'].put(url('post-detail', pk=draft.pk), {
+            'title': 'Draft', 'category': [self.category.pk], 'status': 'published',
+            'description': 'Description', 'body': 'Body of Draft',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.run_tasks()
+        self.assertEqual([title for title, _ in self.titles()], ['Draft', 'Published', 'Before'])
+
+        # a hidden post leaves the timeline without its entries being touched
+        Post.objects.filter(title='Published').update(status='editing')
+        self.assertEqual([title for title, _ in self.titles()], ['Draft', 'Before'])
+
+        self.follow('reader', 'author', 'delete')
+        self.assertEqual(self.titles(), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_reposts(self):
+        self.follow('reader', 'reposter')
+        post = self.publish('Reposted')
+        repost = RepostRequest.objects.create(requester_id=self.users['reposter'], post_id=post, status='requested')
+        self.run_tasks()
+        self.assertEqual(self.titles(), [])
+
+        response = self.clients['author'].put(url('request_update', request_id=repost.pk), {'status': 'approved'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.run_tasks()
+        self.assertEqual(self.titles(), [('Reposted', 'reposter')])
+
+        response = self.clients['reposter'].delete(url('delete_repost_request', request_id=repost.pk))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.titles(), [])
+
+    def test_unfollow_keeps_other_sources(self):
+        self.follow('reader', 'author')
+        self.follow('reader', 'reposter')
+        post = self.publish('Twice')
+        repost = RepostRequest.objects.create(requester_id=self.users['reposter'], post_id=post, status='requested')
+        self.clients['author'].put(url('request_update', request_id=repost.pk), {'status': 'approved'})
+        self.run_tasks()
+        # once from its author, once from the reposter, newest first
+        self.assertEqual(self.titles(), [('Twice', 'reposter'), ('Twice', None)])
+
+        self.follow('reader', 'author', 'delete')
+        self.assertEqual(self.titles(), [('Twice', 'reposter')])
+        self.follow('reader', 'author')
+        self.run_tasks()
+        self.follow('reader', 'reposter', 'delete')
+        self.assertEqual(self.titles(), [('Twice', None)])
+
+    def test_bulk_approved_reposts(self):
+        self.follow('reader', 'reposter')
+        posts = [self.publish(f'Post {number}') for number in range(2)]
+        for post in posts:
+            RepostRequest.objects.create(requester_id=self.users['reposter'], post_id=post, status='requested')
+        response = self.clients['author'].put(url('bulk_request_update'), {
+            'status': 'approved', 'request_ids': list(RepostRequest.objects.values_list('id', flat=True)),
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.run_tasks()
+        self.assertEqual(sorted(self.titles()), [('Post 0', 'reposter'), ('Post 1', 'reposter')])
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=1)
+    def test_fan_out_on_read(self):
+        self.follow('reader', 'author')
+        self.follow('reposter', 'author')
+        self.publish('Read at request time')
+        self.run_tasks()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.titles('reader'), [('Read at request time', None)])
+        self.assertEqual(self.titles('reposter'), [('Read at request time', None)])
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=1)
+    def test_merged_pages(self):
+        # the reposter stays under the limit and is fanned out, the author passes it and is read
+        Follow.objects.create(follower=self.users['reader'], author=self.users['reposter'])
+        for user in ('reader', 'reposter'):
+            Follow.objects.create(follower=self.users[user], author=self.users['author'])
+        Role.objects.filter(user=self.users['author']).update(followers_count=2)
+        now = timezone.now()
+        for number in range(7):
+            user = 'reposter' if number % 2 else 'author'
+            post = Post.objects.create(
+                title=f'Post {number}', body=f'Body {number}', user_id=self.users[user], status='published',
+                description='',
+            )
+            # posts 5 and 6 share their creation time
+            Post.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=min(number, 5)))
+            if user == 'reposter':
+                TimelineEntry.objects.create(user=self.users['reader'], post=post, created_at=now - timedelta(minutes=number))
+        # fanned out before the author passed the limit: in both lists, shown once
+        TimelineEntry.objects.create(
+            user=self.users['reader'], post=Post.objects.get(title='Post 0'), created_at=now,
+        )
+
+        titles, query, page_queries = [], '?page_size=2', []
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                page = self.timeline(query=query)
+            page_queries.append(len(queries))
+            titles += [post['title'] for post in page['results']]
+            if page['next'] is None:
+                break
+            query = '?' + page['next'].split('?', 1)[1]
+        self.assertEqual(titles, [f'Post {number}' for number in (0, 1, 2, 3, 4, 6, 5)])
+        # a deep page costs what the first one does
+        self.assertEqual(len(set(page_queries)), 1, page_queries)
+
+    def test_page_fields_and_cursor(self):
+        self.follow('reader', 'author')
+        self.publish('Only')
+        self.run_tasks()
+        page = self.timeline(query='?fields=title,author')
+        self.assertEqual(page, {'next': None, 'results': [{'title': 'Only', 'author': 'author', 'reposted_by': None}]})
+        response = self.clients['reader'].get(url('timeline') + '?cursor=nonsense')
+        self.assertEqual(response.status_code, 404)
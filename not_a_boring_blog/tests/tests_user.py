@@ -9,6 +9,7 @@ from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 import json
 from django.contrib.auth.hashers import make_password
+from .query_budget import QueryBudgetMixin
 
 
 class ChangeUserPasswordTest(TestCase):
@@ -163,7 +164,7 @@ class UpdateUserRoleTest(TestCase):
 
 
 
-class UserListTest(TestCase):
+class UserListTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='user', password='passworduser')
@@ -217,6 +218,18 @@ class UserListTest(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_query_budget(self):
+        def add_rows(count):
+            for _ in range(count):
+                number = User.objects.count()
+                user = User.objects.create(username=f'user{number}', password='password')
+                Role.objects.create(user=user, is_blogger=True, bio=f'bio {number}')
+
+        response = self.client.get(self.url)
+        # a user without a role is listed with role None
+        self.assertIn({'id': self.user.id, 'username': 'user', 'email': '', 'role': None}, response.data)
+        self.assertListQueryBudget('users_list', lambda: self.client.get(self.url), add_rows)
+
 
 
 class RegisterUserTest(TestCase):
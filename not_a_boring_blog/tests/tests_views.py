@@ -12,6 +12,7 @@ import json
 from django.contrib.auth.hashers import make_password
 from django.utils.timezone import now
 from datetime import timedelta
+from .query_budget import QueryBudgetMixin
 
 
 
@@ -34,7 +35,6 @@ class CreatePostViewTest(TestCase):
             body='Test post Body',
             user_id=self.blogger2,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         self.url = reverse('not_a_boring_blog:create_post_view', kwargs={'post_id': self.post.id})
@@ -47,7 +47,7 @@ class CreatePostViewTest(TestCase):
             'content_type': 'application/json',
         }
         response = self.client.post(self.url, **headers)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
 
     def test_create_post_view_author_own_view(self):
@@ -85,11 +85,11 @@ class CreatePostViewTest(TestCase):
         }
         response = self.client.post(self.url, **headers)
         #print(response.content)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
 
 
 
-class GetPostViewsTest(TestCase):
+class GetPostViewsTest(QueryBudgetMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = User.objects.create(username='user', password='passworduser')
@@ -107,7 +107,6 @@ class GetPostViewsTest(TestCase):
             body='Test post Body',
             user_id=self.blogger2,
             status='published',
-            min_read='5',
             description='Test post Description'
         )
         self.url = reverse('not_a_boring_blog:post_views', kwargs={'post_id': self.post.id})
@@ -129,6 +128,14 @@ class GetPostViewsTest(TestCase):
         #print(response.content)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_query_budget(self):
+        def add_rows(count):
+            for _ in range(count):
+                View.objects.create(post_id=self.post, user_id=self.blogger)
+
+        add_rows(1)
+        self.assertListQueryBudget('post_views', lambda: self.client.get(self.url), add_rows)
+
     def test_get_post_views_post_not_found(self):
         """Test retrieving view count for a non-existent post."""
 
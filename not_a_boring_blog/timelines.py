@@ -0,0 +1,129 @@
+"""Home timelines: the published posts of the authors a user follows and the posts they reposted, newest first.
+
+Fan-out on write: when a post is published or a repost approved, a background task (tasks.py)
+writes a TimelineEntry into the timeline of every follower, so a page of a timeline is read from
+one index range however many authors the user follows.
+
+Fan-out on read: publishing for an author followed by more than TIMELINE_FANOUT_MAX_FOLLOWERS
+users would write that many rows, such an author is not fanned out. The timeline reads the recent
+published posts of these authors when it is read and merges them with the entries; their reposts
+are not shown.
+
+A post has an entry per way it reached a timeline, from its author and from each reposter, so it
+shows once per source (at the time of its creation, then of each approval) and unfollowing one of
+them deletes only the entries that came through that one.
+
+Pages are read with a keyset on (created_at, post id): the cursor of the next page holds the
+position of the last item, so a deep page costs the same as the first one.
+"""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+
+from .models.follow import Follow
+from .models.post import Post
+from .models.timeline import TimelineEntry
+from .models.user import Role
+
+# followers read and timeline rows written per query by a fan-out
+FANOUT_CHUNK = 1000
+
+
+def is_fanned_out(author_id):
+    """False for an author with too many followers, whose posts are read with the timelines instead"""
+    return not Role.objects.filter(
+        user_id=author_id, followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    ).exists()
+
+
+def fan_out(author_id, post_id, created_at, reposted_by_id=None):
+    """Writes the post into the timeline of every follower of author_id, returns the number of followers"""
+    followers = Follow.objects.filter(author_id=author_id).order_by('follower_id').values_list('follower_id', flat=True)
+    reached = 0
+    last_follower_id = 0
+    while True:
+        chunk = list(followers.filter(follower_id__gt=last_follower_id)[:FANOUT_CHUNK])
+        if not chunk:
+            break
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=follower_id, post_id=post_id, reposted_by_id=reposted_by_id, created_at=created_at)
+                for follower_id in chunk
+            ],
+            ignore_conflicts=True,
+        )
+        reached += len(chunk)
+        last_follower_id = chunk[-1]
+    return reached
+
+
+def backfill(follower_id, author_id):
+    """Copies the last TIMELINE_BACKFILL_POSTS published posts of a newly followed author into the timeline"""
+    posts = Post.objects.filter(user_id=author_id, status='published').order_by('-created_at', '-id')
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follower_id, post_id=post_id, created_at=created_at)
+            for post_id, created_at in posts.values_list('id', 'created_at')[:settings.TIMELINE_BACKFILL_POSTS]
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def entries_from(follower_id, author_id):
+    """The entries a user got from an author: the author's posts and reposts"""
+    return TimelineEntry.objects.filter(user_id=follower_id).filter(
+        Q(reposted_by_id=author_id) | Q(reposted_by=None, post__user_id=author_id)
+    )
+
+
+def remove_repost(post_id, reposter_id):
+    """Takes a repost that is not approved anymore out of the timelines it was fanned out to"""
+    TimelineEntry.objects.filter(post_id=post_id, reposted_by_id=reposter_id).delete()
+
+
+def read_timeline(user_id, size, position=None):
+    """Returns up to size (created_at, post id, reposter username) items older than position, newest first,
+    and whether more items follow.
+
+    position is the (created_at, post id) of the last item of the previous page.
+    """
+    entries = TimelineEntry.objects.filter(user_id=user_id, post__status='published').order_by('-created_at', '-post_id')
+    not_fanned_out = Follow.objects.filter(
+        follower_id=user_id, author__role__followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS
+    ).values('author_id')
+    posts = Post.objects.filter(user_id__in=not_fanned_out, status='published').order_by('-created_at', '-id')
+    if position is not None:
+        created_at, post_id = position
+        entries = entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lt=post_id))
+        posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+    entry_items = list(entries.values_list('created_at', 'post_id', 'reposted_by__username')[:size + 1])
+    post_items = [(created_at, post_id, None) for created_at, post_id in posts.values_list('created_at', 'id')[:size + 1]]
+
+    items, seen = [], set()
+    # a post fanned out before its author passed the limit is in both lists, under the same key; so
+    # are reposts of one post approved together, the keyset could not tell them apart across pages
+    for item in sorted(entry_items + post_items, key=lambda item: item[:2], reverse=True):
+        if item[:2] not in seen:
+            seen.add(item[:2])
+            items.append(item)
+    more = len(items) > size or len(entry_items) > size or len(post_items) > size
+    return items[:size], more
+
+
+def encode_cursor(position):
+    created_at, post_id = position
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()} {post_id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(' ')
+        created_at, post_id = datetime.fromisoformat(created_at), int(post_id)
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+    if created_at.tzinfo is None:
+        raise NotFound('Invalid cursor')
+    return created_at, post_id
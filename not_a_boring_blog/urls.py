@@ -1,5 +1,6 @@
 from django.urls import path, include
 from .views.view import create_post_view, get_post_views
+from .views import asynchronous
 from .views.post import (
     PostList, 
     PostDetail, 
@@ -31,12 +32,15 @@ from .views.repost import (
     RepostRequestedReceivedList,
     RepostRequestsSentList,
     UpdateRepostRequestStatus,
+    BulkUpdateRepostRequestStatus,
     DeleteRepostRequestView,
 )
+from .views.follow import FollowAuthor, HomeTimeline
 from .views.category import (
     CreateCategory,
     ListCategories,
     PostsByCategory,
+    RecategorizePosts,
 )
 
 
@@ -47,6 +51,7 @@ urlpatterns = [
     path('category/create_category/', CreateCategory.as_view(), name='create_category'),
     path('category/list_categories/', ListCategories.as_view(), name='list_categories'),
     path('category/posts/<str:category_name>', PostsByCategory.as_view(), name='category_posts'),
+    path('category/recategorize/', RecategorizePosts.as_view(), name='recategorize_posts'),
 
     # post endpoints
     path('post/post_list/', PostList.as_view(), name='post-list'),
@@ -56,6 +61,7 @@ urlpatterns = [
     path('post/user_posts/<str:username>/', GetUserPublicPosts.as_view(), name='only-user-posts'),
     path('post/my_posts/', GetUserPosts.as_view(), name='my-posts'),
     path('post/hide_post/<int:pk>', HidePost.as_view(), name='hide-post'),
+    path('post/timeline/', HomeTimeline.as_view(), name='timeline'),
 
     #comments
     path('comment/comments/<int:post_id>/', PostCommentList.as_view(), name='comments'),
@@ -74,16 +80,25 @@ urlpatterns = [
     path('user/update_bio/', UpdateUserBio.as_view(), name='update_bio'),
     path('user/login/', LoginUser.as_view(), name='login'),
     path('user/logout/', LogoutUser.as_view(), name='logout'),
+    path('user/follow/<str:username>/', FollowAuthor.as_view(), name='follow'),
 
     # repost request
     path('repost_request/request_repost/<int:post_id>/', CreateRepostRequest.as_view(), name='request_repost'),
     path('repost_request/requests_received/', RepostRequestedReceivedList.as_view(), name='requests_received'),
     path('repost_request/requests_sent/', RepostRequestsSentList.as_view(), name='requests_sent'),
     path('repost_request/update_request/<int:request_id>/', UpdateRepostRequestStatus.as_view(), name='request_update'),
+    path('repost_request/bulk_update_requests/', BulkUpdateRepostRequestStatus.as_view(), name='bulk_request_update'),
     path('repost_request/delete_request/<int:request_id>/', DeleteRepostRequestView.as_view(), name='delete_repost_request'),
 
     # post views
     path('views/create_post_view/<int:post_id>/', create_post_view, name='create_post_view'),
     path('views/view_count/<int:post_id>/', get_post_views, name='post_views'),
 
+    # async versions of the read-heavy endpoints above, for ASGI deployments
+    path('async/category/list_categories/', asynchronous.list_categories, name='async-list-categories'),
+    path('async/post/post_detail/<int:pk>/', asynchronous.post_detail, name='async-post-detail'),
+    path('async/post/public_posts/', asynchronous.public_posts, name='async-public-posts'),
+    path('async/comment/comments/<int:post_id>/', asynchronous.post_comments, name='async-comments'),
+    path('async/views/view_count/<int:post_id>/', asynchronous.post_views, name='async-post-views'),
+
 ]
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""Async versions of the hottest read endpoints, served under async/ with the same JSON as the DRF views.
+
+DRF views are synchronous: under ASGI every request to them takes a thread for its whole
+duration. These are plain async Django views, the event loop waits on slow clients and only
+the queries (Django's async ORM) run in a worker thread, for as long as the query takes.
+Everything the serializers read is loaded up front, nothing is lazily loaded while rendering.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count, Q
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.authtoken.models import Token
+
+from ..models.comment import Comment
+from ..models.post import Category, Post
+from ..models.views import View
+from ..renderers import dumps
+from ..serializers.category import CategoriesSerializer
+from ..serializers.comment import CommentSerializer
+from ..serializers.fast import fast_data
+from ..serializers.posts import PostDetailSerializer, PostSerializer
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def json_response(data, status=200):
+    # the same bytes as the DRF views
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def get_only(view):
+    """require_GET for async views (Django 4.2's decorators only wrap sync views)"""
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+async def get_user(request):
+    """The user of the token (Authorization: Token <key>) or of the session, AnonymousUser otherwise"""
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword == 'Token':
+        token = await Token.objects.select_related('user').filter(key=key.strip()).afirst()
+        if token is None or not token.user.is_active:
+            raise InvalidToken
+        return token.user
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return AnonymousUser()
+    # the session backends are synchronous
+    return await sync_to_async(auth.get_user)(request)
+
+
+@get_only
+async def public_posts(request):
+    """Async GetPublicPosts: all published posts"""
+    posts = PostSerializer.setup_eager_loading(Post.objects.filter(status='published'))
+    return json_response(fast_data(PostSerializer, [post async for post in posts]))
+
+
+@get_only
+async def post_detail(request, pk):
+    """Async PostDetail.get: a published post, or an unpublished one to its author"""
+    post = await PostDetailSerializer.setup_eager_loading(Post.objects.filter(pk=pk)).afirst()
+    if post is None:
+        return HttpResponse(status=404)
+    if post.status != 'published':
+        # the user is only looked up when the post is not public
+        try:
+            user = await get_user(request)
+        except InvalidToken:
+            return json_response({"detail": "Invalid token."}, status=401)
+        if not user.is_authenticated or post.user_id_id != user.id:
+            return json_response({"detail": "Permission denied"}, status=403)
+    return json_response(PostDetailSerializer(post).data)
+
+
+@get_only
+async def post_comments(request, post_id):
+    """Async PostCommentList: the top-level comments of a post with their replies"""
+    comments = CommentSerializer.setup_eager_loading(Comment.objects.filter(post_id=post_id, parent_id=None))
+    return json_response(fast_data(CommentSerializer, [comment async for comment in comments]))
+
+
+@get_only
+async def post_views(request, post_id):
+    """Async get_post_views: the view count of a post"""
+    if not await Post.objects.filter(pk=post_id).aexists():
+        return json_response({"detail": "Not found."}, status=404)
+    view_count = await View.objects.filter(post_id=post_id).acount()
+    if view_count == 0:
+        return json_response({"detail": "No views found for this post"}, status=404)
+    return json_response({'view_count': view_count})
+
+
+@get_only
+async def list_categories(request):
+    """Async ListCategories: the categories with their post counts"""
+    categories = Category.objects.annotate(
+        num_posts=Count('posts'),
+        num_published_posts=Count('posts', filter=Q(posts__status='published')),
+    )
+    return json_response(fast_data(CategoriesSerializer, [category async for category in categories]))
@@ -1,16 +1,22 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from ..feeds import feed_users_for_posts, invalidate_user_feeds
 from ..models.post import Category
 from ..serializers.category import (
     CategoryFilterSerializer,
     CategorySerializer,
-    CategoriesSerializer
+    CategoriesSerializer,
+    RecategorizePostsSerializer,
 )
 from ..serializers.posts import PostSerializer
+from ..serializers.fast import fast_data
+from ..filters import filter_reading_time
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from ..permissions import IsAdminRole, IsModeratorRole
 from ..models.post import Post
-from django.db.models import Count
+from django.db.models import Count, Q
 
 
     
@@ -46,9 +52,9 @@ class CreateCategory(APIView):
     def post(self, request):
         serializer = CategorySerializer(data=request.data)
         if serializer.is_valid():
-            # Check if the category already exists
+            # Check if the category already exists, in any case ("AI" and "ai" are the same)
             name = serializer.validated_data['category_name']
-            existing_category = Category.objects.filter(category_name=name).first()
+            existing_category = Category.objects.filter(category_key=Category.normalize_name(name)).exists()
 
             if existing_category:
                 return Response({'detail': 'Category already exists.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -85,20 +91,69 @@ class ListCategories(APIView):
 
     def get(self, request):
         # Annotate each category with the count of related posts
-        categories = Category.objects.annotate(num_posts=Count('posts'), num_published_posts=Count('posts'))
+        categories = Category.objects.annotate(
+            num_posts=Count('posts'),
+            num_published_posts=Count('posts', filter=Q(posts__status='published')),
+        )
 
-        serializer = CategoriesSerializer(categories, many=True)
-        return Response(serializer.data, status=200)
+        return Response(fast_data(CategoriesSerializer, categories), status=200)
 
 
 class PostsByCategory(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, category_name):
-        try:
-            category = Category.objects.get(category_name=category_name.title())
-            posts = Post.objects.filter(category=category, status='published')
-            serializer = PostSerializer(posts, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Category.DoesNotExist:
+        # one query joined on the category key; only an empty page looks whether the category exists
+        key = Category.normalize_name(category_name)
+        fields = PostSerializer.requested_fields(request)
+        posts = filter_reading_time(Post.objects.filter(category__category_key=key, status='published'), request)
+        posts = PostSerializer.setup_eager_loading(posts, fields)
+        data = fast_data(PostSerializer, posts, fields)
+        if not data and not Category.objects.filter(category_key=key).exists():
             return Response({"detail": "Category not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class RecategorizePosts(APIView):
+    """***This API moves posts from one category to another.***
+
+    <b>Requirements</b>:
+    - The user must be authenticated and have a role of Admin or Moderator.
+    - Posts are moved in chunks, every chunk in its own transaction, so a merge of a big category
+    does not hold one long transaction.<p>
+    ------------------------------------------------------------<p>
+    ***HOW TO USE:***<p>
+    <ul><b>1. AUTHENTICATION</b><p>
+    <ul><b>1.1.</b> Apply the token, it should belong to <b>Admin</b> or <b>Moderator</b>. <p>
+    ---> click on the image of a <b>lock</b> in the right corner of your highlighted box, <p>
+    ---> choose <b><i>tokenAuth</i></b>,<p>
+    ---> insert <b>Token</b> <b><i>MODERATOR_OR_ADMIN_TOKEN_KEY</i></b> and <b>Authorize</b>.</ul></ul><p>
+    ------------------------------------------------------------<p>
+    <ul><b>2. BODY</b>:<p>
+    <ul><b>2.1.</b> In order to merge a category into another one, provide the category ids:<p>
+        <b><i>{"from_category": 1, "to_category": 2}</i></b><p>
+    <b>2.2.</b> In order to move only some of the posts, add their ids:<p>
+        <b><i>{"from_category": 1, "to_category": 2, "post_ids": [10, 11]}</i></b><p>
+    <b>2.3.</b>  Press the <b><i>Execute</i></b> button in order to send a <b>PUT</b> request to the API endpoint.<p>
+    -- If successful, the API will return the number of <i><u>moved_posts</u></i>. <p>
+    -- If there are any errors, appropriate error messages will be returned.</ul></ul>
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole | IsModeratorRole]
+    serializer_class = RecategorizePostsSerializer
+
+    @staticmethod
+    def invalidate_feeds(post_ids):
+        # the cached feeds show the categories of their posts
+        users = feed_users_for_posts(post_ids)
+        transaction.on_commit(lambda: invalidate_user_feeds(users))
+
+    def put(self, request):
+        serializer = RecategorizePostsSerializer(data=request.data)
+        if serializer.is_valid():
+            from_category = serializer.validated_data['from_category']
+            to_category = serializer.validated_data['to_category']
+            moved = from_category.move_posts(
+                to_category, post_ids=serializer.validated_data.get('post_ids'), on_moved=self.invalidate_feeds,
+            )
+            return Response({'detail': 'Posts moved successfully.', 'moved_posts': moved}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -11,6 +11,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from ..models.post import Post
 from ..models.user import User
+from ..serializers.fast import fast_data
 from django.http import Http404
 
 
@@ -31,9 +32,10 @@ class PostCommentList(APIView):
 
     def get(self, request, post_id):
 
+        fields = CommentSerializer.requested_fields(request)
         comments = Comment.objects.filter(post_id=post_id, parent_id=None)  # Retrieve top-level comments (not replies)
-        serializer = CommentSerializer(comments, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        comments = CommentSerializer.setup_eager_loading(comments, fields)
+        return Response(fast_data(CommentSerializer, comments, fields), status=status.HTTP_200_OK)
 
 
 class CreateComment(APIView):
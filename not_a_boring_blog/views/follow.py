@@ -0,0 +1,129 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from ..models.follow import Follow
+from ..models.post import Post
+from ..models.user import Role
+from ..pagination import RepostRequestCursorPagination
+from ..serializers.fast import fast_data
+from ..serializers.posts import PostSerializer
+from ..tasks import enqueue
+from ..timelines import decode_cursor, encode_cursor, entries_from, read_timeline
+
+
+class FollowAuthor(APIView):
+    '''***Follow or unfollow an author: the posts they publish and the posts they repost go to your timeline***<p>
+    <b>Requirements</b>:
+    - The user must be authenticated.
+    - The user will need to use their token.<p>
+
+    ***HOW TO USE:***<p>
+    <ul><b>1. AUTHENTICATION</b><p>
+    <ul><b>1.1.</b>  Before making a request to this endpoint, ensure that you are authenticated, using your token. <p>
+    ---> For this check <i><u>user/registration/</u></i> and <i><u>user/login/</u></i>.<p>
+    <b>1.2.</b> Apply the token, it should belong to the authenticated user.<p>
+    !!! For this follow the steps:<p>
+    ---> click on the image of a <b>lock</b> in the right corner of your highlighted box, <p>
+    ---> choose <b><i>tokenAuth</i></b>,<p>
+    ---> insert <b>Token</b> <b><i>YOUR_TOKEN_KEY</i></b> and <b>Authorize</b>.<p>
+    ------------------------------------------------------------<p>
+    <b>2. PARAMETERS</b>:<p>
+    <b>2.1.</b> Click on <b><i>Try it out</i></b> button.<p>
+    <b>2.2.</b> In the <b><i>username string path</i></b> provide the <b>username</b> of the author.<p>
+    <b>2.3.</b> Press the <b><i>Execute</i></b> button: <b>POST</b> follows the author, <b>DELETE</b> unfollows them.<p>
+    ---> If successful, the API will return a 201 message (200 when you already follow the author) or a 204 message. <p>
+    ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
+    '''
+    permission_classes = [IsAuthenticated]
+
+    def get_author(self, username):
+        return User.objects.filter(username=username).values_list('id', flat=True).first()
+
+    def post(self, request, username):
+        author_id = self.get_author(username)
+        if author_id is None:
+            return Response({"detail": f"{username} not found"}, status=status.HTTP_404_NOT_FOUND)
+        if author_id == request.user.id:
+            return Response({"detail": "You cannot follow yourself"}, status=status.HTTP_400_BAD_REQUEST)
+        # the unique constraint on (follower, author) rejects a second follow, no need to look for it first
+        try:
+            with transaction.atomic():
+                Follow.objects.create(follower_id=request.user.id, author_id=author_id)
+                Role.objects.filter(user_id=author_id).update(followers_count=F('followers_count') + 1)
+                # the recent posts of the author are copied into the timeline by the worker
+                enqueue('backfill_timelines', {'follower': request.user.id, 'author': author_id})
+        except IntegrityError:
+            return Response({"detail": f"You already follow {username}"}, status=status.HTTP_200_OK)
+        return Response({"detail": f"You follow {username}"}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, username):
+        author_id = self.get_author(username)
+        with transaction.atomic():
+            deleted, _ = Follow.objects.filter(follower_id=request.user.id, author_id=author_id).delete()
+            if not deleted:
+                return Response({"detail": f"You do not follow {username}"}, status=status.HTTP_404_NOT_FOUND)
+            Role.objects.filter(user_id=author_id, followers_count__gt=0).update(followers_count=F('followers_count') - 1)
+            entries_from(request.user.id, author_id).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class HomeTimeline(APIView):
+    '''***Your home timeline: the published posts of the authors you follow and the posts they reposted, newest first***<p>
+    <b>Requirements</b>:
+    - The user must be authenticated.
+    - The user will need to use their token.<p>
+
+    ***HOW TO USE:***<p>
+    <ul><b>1. AUTHENTICATION</b><p>
+    <ul><b>1.1.</b>  Before making a request to this endpoint, ensure that you are authenticated, using your token. <p>
+    ---> For this check <i><u>user/registration/</u></i> and <i><u>user/login/</u></i>.<p>
+    <b>1.2.</b> Apply the token, it should belong to the authenticated user.<p>
+    !!! For this follow the steps:<p>
+    ---> click on the image of a <b>lock</b> in the right corner of your highlighted box, <p>
+    ---> choose <b><i>tokenAuth</i></b>,<p>
+    ---> insert <b>Token</b> <b><i>YOUR_TOKEN_KEY</i></b> and <b>Authorize</b>.<p>
+    ------------------------------------------------------------<p>
+    <b>2. PARAMETERS</b>:<p>
+    <b>2.1.</b> Click on <b><i>Try it out</i></b> button, optionally set <b><i>page_size</i></b> (25 by default, 100 at most).<p>
+    <b>2.2.</b> Press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
+    ---> If successful, the API will return a 200 message along with a page of posts (<i>results</i>, each with
+    <i>reposted_by</i>, the username of the reposter or null) and the link to the <i>next</i> page.<p>
+    <b>2.3.</b> <b><i>?fields=</i></b> and <b><i>?omit=</i></b> select the fields of the posts as in the other post lists.<p>
+    ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
+    '''
+    permission_classes = [IsAuthenticated]
+    # the page sizes of the other keyset-paginated lists
+    pagination = RepostRequestCursorPagination
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.pagination.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.pagination.page_size
+        if page_size < 1:
+            return self.pagination.page_size
+        return min(page_size, self.pagination.max_page_size)
+
+    def get(self, request):
+        fields = PostSerializer.requested_fields(request)
+        cursor = request.query_params.get('cursor')
+        position = decode_cursor(cursor) if cursor else None
+        items, more = read_timeline(request.user.id, self.get_page_size(request), position)
+
+        posts = PostSerializer.setup_eager_loading(Post.objects.filter(id__in=[item[1] for item in items]), fields)
+        rows = {post.id: post for post in posts}
+        # in the order of the timeline, without the posts deleted since the page was read
+        found = [(rows[post_id], reposted_by) for _, post_id, reposted_by in items if post_id in rows]
+        results = fast_data(PostSerializer, [row for row, _ in found], fields)
+        for post, (_, reposted_by) in zip(results, found):
+            post['reposted_by'] = reposted_by
+
+        next_url = None
+        if more and items:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(items[-1][:2]))
+        return Response({'next': next_url, 'results': results}, status=status.HTTP_200_OK)
@@ -0,0 +1,22 @@
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from ..metrics import CONTENT_TYPE, registry
+
+
+def allowed(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
+
+
+@require_GET
+def metrics(request):
+    """Metrics of all the server processes in the Prometheus text format, for the METRICS_ALLOWED_IPS only"""
+    if not allowed(request.META.get('REMOTE_ADDR', '')):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
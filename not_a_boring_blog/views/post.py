@@ -6,6 +6,7 @@ from ..models.post import Post
 from ..models.repost_request import RepostRequest
 from ..serializers.posts import (
     PostSerializer, 
+    PostDetailSerializer,
     PostCreateSerializer, 
     PostUpdateSerializer,
     HidePostSerializer,
@@ -16,6 +17,10 @@ from ..models.user import Role, User
 from rest_framework.generics import ListAPIView
 from django.shortcuts import get_object_or_404, get_list_or_404
 from django.db.models import Q
+from ..feeds import get_cached_feed, set_cached_feed, invalidate_post_feeds, invalidate_user_feeds
+from ..serializers.fast import fast_data
+from ..filters import filter_reading_time
+from ..tasks import enqueue
 
 class PostList(APIView):
     """***This API lists all posts irrespective of their status***<p>
@@ -38,9 +43,9 @@ class PostList(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole | IsModeratorRole]
 
     def get(self, request):
-        posts = Post.objects.all()
-        serializer = PostSerializer(posts, many=True)
-        return Response(serializer.data, status=200) # or status=200
+        fields = PostSerializer.requested_fields(request)
+        posts = PostSerializer.setup_eager_loading(filter_reading_time(Post.objects.all(), request), fields)
+        return Response(fast_data(PostSerializer, posts, fields), status=200) # or status=200
 
 
 class PostCreate(APIView):
@@ -67,7 +72,6 @@ class PostCreate(APIView):
                 "title": "string",
                 "category": [1, 3],
                 "status": "published",
-                "min_read": "string",
                 "description": "string",
                 "body": "unique text"
                 }</i></b><p>
@@ -82,7 +86,10 @@ class PostCreate(APIView):
         user_id = request.user.id  # Get the user_id from the request
         serializer = PostCreateSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user_id_id=user_id)
+            post = serializer.save(user_id_id=user_id)
+            invalidate_user_feeds([user_id])
+            if post.status == 'published':
+                enqueue('fan_out_posts', {'post': post.id})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -107,7 +114,8 @@ class PostDetail(APIView):
 
     def get_post(self, pk):        
         try:
-            return Post.objects.get(pk=pk)
+            # the body is read by the update, it comes with the post
+            return Post.objects.select_related('content').get(pk=pk)
         except Post.DoesNotExist:
             return None
 
@@ -122,13 +130,15 @@ class PostDetail(APIView):
     <b>1.2.</b> In the <b><i>id integer path</i></b> provide an <b>id number</b> of the existing post. <p>
     <b>1.3.</b>  Press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
     ---> If successful, the API will return a 200 message along with the code itself. <p>
-    ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
+    ---> If there are any errors, appropriate error messages will be returned.<p>
+    <b>1.4.</b> <b><i>?include=body_html</i></b> adds the body rendered from Markdown to sanitized HTML.</ul></ul>
         '''      
-        post = self.get_post(pk)
+        include = PostDetailSerializer.included_fields(request)
+        post = PostDetailSerializer.setup_eager_loading(Post.objects.filter(pk=pk)).first()
         if post:
             if not IsOwnerOrReadOnly().has_object_permission(request, self, post):
                 return Response({"detail": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-            serializer = PostSerializer(post)            
+            serializer = PostDetailSerializer(post, include=include)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -147,11 +157,14 @@ class PostDetail(APIView):
         if post:
             if str(request.user) != str(post.user_id):
                 return Response({"detail": "Permission denied"}, status=403)
+            was_published = post.status == 'published'
             serializer = PostUpdateSerializer(post, data=request.data)
             if serializer.is_valid():
-                serializer.save()
-                categories = request.data['category']
-                post.update_categories(categories)
+                serializer.save()  # also updates the categories, see PostUpdateSerializer.update
+                invalidate_post_feeds(post)
+                if post.status == 'published' and not was_published:
+                    # a hidden post published again is already in the timelines, the fan-out skips those
+                    enqueue('fan_out_posts', {'post': post.id})
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         return Response(status=status.HTTP_404_NOT_FOUND)
@@ -167,6 +180,8 @@ class PostDetail(APIView):
     
         post = self.get_post(pk)
         if post and post.user_id == request.user:
+            # collected before the delete, the approved repost requests cascade with the post
+            invalidate_post_feeds(post)
             post.delete()
             return Response({"detail": "Deletion is done"}, status=status.HTTP_204_NO_CONTENT)
         return Response({"detail": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
@@ -181,14 +196,18 @@ class GetPublicPosts(APIView):
     <ul><b>1.1.</b> In order to get a <b>json</b> list of all public posts, click on <b><i>Try it out</i></b> button.<p>
     <b>1.2.</b>  Press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
     ---> If successful, the API will return a 200 message along with the json list of posts.<p>
-    ---> If there are any errors, appropriate error messages will be returned.</ul></ul>'''
-    
+    ---> If there are any errors, appropriate error messages will be returned.<p>
+    <b>1.3.</b> Reading time: <b><i>?min_read=3&max_read=10</i></b> keeps the posts read in 3 to 10 minutes,
+    <b><i>?ordering=min_read</i></b> (or <b><i>-min_read</i></b>) sorts them by reading time.</ul></ul>'''
+
     permission_classes = [AllowAny]
 
     def get(self, request):
-        public_posts = Post.objects.filter(status='published')
-        serializer = PostSerializer(public_posts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = PostSerializer.requested_fields(request)
+        public_posts = PostSerializer.setup_eager_loading(
+            filter_reading_time(Post.objects.filter(status='published'), request), fields
+        )
+        return Response(fast_data(PostSerializer, public_posts, fields), status=status.HTTP_200_OK)
 
 
 class GetUserPublicPosts(APIView):
@@ -206,28 +225,38 @@ class GetUserPublicPosts(APIView):
     permission_classes = [AllowAny]
 
 
-    def get_queryset(self):
-        username = self.kwargs['username']
+    def get_queryset(self, user):
+        user_posts = Post.objects.filter(user_id=user, status='published')
+        # a subquery, the reposted posts come with the same query as the own ones
+        reposted_post_ids = RepostRequest.objects.filter(
+            requester_id=user, status='approved'
+        ).values('post_id')
+        queryset = user_posts | Post.objects.filter(Q(id__in=reposted_post_ids))
+
+        return PostSerializer.setup_eager_loading(queryset)
 
+    def get(self, request, *args, **kwargs):
+        fields = self.serializer_class.requested_fields(request)
+        username = self.kwargs['username']
         try:
             user = User.objects.get(username=username)
         except User.DoesNotExist:
             return Response({"detail": f"{username} not found"}, status.HTTP_404_NOT_FOUND)
-        user_posts = Post.objects.filter(user_id=user, status='published')
-        approved_repost_requests = RepostRequest.objects.filter(requester_id=user, status='approved')
-        reposted_posts = [repost_request.post_id for repost_request in approved_repost_requests]
-        reposted_post_ids = [post.id for post in reposted_posts]
-        reposted_posts_query = Q(id__in=reposted_post_ids)
-        queryset = user_posts | Post.objects.filter(reposted_posts_query)
-
-        return queryset
 
-    def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        if not queryset:
-            return Response({"detail": f"{self.kwargs['username']} has no posts"}, status=status.HTTP_200_OK)
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # the feed is cached per user and dropped whenever a post or an approved repost in it changes
+        data = get_cached_feed(user.id)
+        if data is None:
+            data = fast_data(self.serializer_class, self.get_queryset(user))
+            set_cached_feed(user.id, data)
+        if not data:
+            return Response({"detail": f"{username} has no posts"}, status=status.HTTP_200_OK)
+        if fields is not None:
+            # the cache holds the whole feed, a sparse fieldset is cut from it
+            data = [{name: post[name] for name in fields} for post in data]
+        response = Response(data, status=status.HTTP_200_OK)
+        # the same feed renders to the same bytes, its compressed body is cached too
+        response.cache_compressed = True
+        return response
 
 
 class GetUserPosts(ListAPIView):
@@ -249,16 +278,15 @@ class GetUserPosts(ListAPIView):
     """
     serializer_class = PostSerializer
     
-    def get_queryset(self):
+    def get_queryset(self, fields=None):
         user = self.request.user
-        queryset = Post.objects.filter(user_id=user)
-        get_list_or_404(queryset)
-        return queryset
+        return PostSerializer.setup_eager_loading(Post.objects.filter(user_id=user), fields)
     
     def get(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = self.serializer_class.requested_fields(request)
+        # evaluated once, the 404 check and the serializer share the rows
+        posts = get_list_or_404(self.get_queryset(fields))
+        return Response(fast_data(self.serializer_class, posts, fields), status=status.HTTP_200_OK)
 
 
 class HidePost(generics.UpdateAPIView):
@@ -280,5 +308,6 @@ class HidePost(generics.UpdateAPIView):
         serializer = HidePostSerializer(post, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            invalidate_post_feeds(post)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework.views import APIView
+from rest_framework.generics import ListAPIView
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -7,9 +8,48 @@ from ..models.repost_request import RepostRequest, Post, User
 from ..serializers.repost import (
     RepostSerializer,
     RepostRequestListSerializer,
+    RepostRequestFilterSerializer,
     UpdateRepostRequestSerializer,
+    BulkUpdateRepostRequestSerializer,
 )
+from ..pagination import RepostRequestCursorPagination
+from ..feeds import invalidate_user_feeds
+from ..tasks import enqueue, enqueue_many
+from ..timelines import remove_repost
 from django.shortcuts import get_object_or_404
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+
+
+class RepostRequestInboxMixin:
+    '''Shared listing for the repost request inboxes: status filter, cursor pages and
+    the post title / requester username loaded in the same query'''
+    serializer_class = RepostRequestListSerializer
+    pagination_class = RepostRequestCursorPagination
+    # the field holding the authenticated user in the requests of the inbox
+    inbox_owner_lookup = None
+
+    def get_queryset(self):
+        requests = RepostRequest.objects.filter(**{self.inbox_owner_lookup: self.request.user.id})
+        return requests.select_related('post_id', 'requester_id').only(
+            'id', 'status', 'created_at',
+            'post_id__id', 'post_id__title',
+            'requester_id__id', 'requester_id__username',
+        )
+
+    def get(self, request, *args, **kwargs):
+        filters = RepostRequestFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        request_status = filters.validated_data.get('status')
+        if request_status:
+            queryset = queryset.filter(status=request_status)
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class CreateRepostRequest(APIView):
@@ -39,35 +79,29 @@ class CreateRepostRequest(APIView):
     serializer_class = RepostSerializer
 
     def post(self, request, post_id):
-        # Check if the user has already created a repost request for the same post
-        post = get_object_or_404(Post, id=post_id)
-
-        existing_request = RepostRequest.objects.filter(
-            requester_id=request.user.id,
-            post_id=post_id,
-        ).first()
-
-        if existing_request:
+        # A single insert: the unique constraint on (requester_id, post_id) rejects duplicates,
+        # no need to read the post or an existing request first
+        try:
+            with transaction.atomic():
+                created = RepostRequest.create_requested(request.user.id, post_id)
+        except IntegrityError:
             return Response(
                 {"detail": "You have already created a repost request for this post."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create a serializer instance with the provided request data
+        if not created:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
         serializer_data = {
-            #**request.data,
             'requester_id': request.user.id,
             'post_id': post_id,
+            'status': 'requested',
         }
-        serializer = RepostSerializer(data=serializer_data)
-
-        if serializer.is_valid():
-            # Create the repost request
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer_data, status=status.HTTP_201_CREATED)
 
 
-class RepostRequestedReceivedList(APIView):
+class RepostRequestedReceivedList(RepostRequestInboxMixin, ListAPIView):
     """***This API returns requests to post author***<p>
     <b>Requirements</b>:
     - The user must be authenticated.
@@ -85,22 +119,17 @@ class RepostRequestedReceivedList(APIView):
     ------------------------------------------------------------<p>
     <b>2. PARAMETERS</b>:<p>
     <b>2.1.</b> In order to get a list of your posts for a repost, click on <b><i>Try it out</i></b> button.<p>
-    <b>2.2.</b>  Then press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
-    ---> If successful, the API will return a 200 message along with the list of posts with some info which were asked for a repost. <p>
+    <b>2.2.</b> Optionally filter by <b><i>status</i></b> (<b>requested</b>, <b>approved</b> or <b>denied</b>) and set <b><i>page_size</i></b> (max 100).<p>
+    <b>2.3.</b>  Then press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
+    ---> If successful, the API will return a 200 message along with a page of requests (<i>results</i>) and the <i>next</i> / <i>previous</i> page links. <p>
     ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
     """
 
-    def get(self, request):
-        # Get the authenticated user (post owner)
-        user = self.request.user
-        # Filter repost requests for posts owned by the user
-        queryset = RepostRequest.objects.filter(post_id__user_id=user.id)
-        # Serialize the queryset
-        serializer = RepostRequestListSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    # repost requests for posts owned by the authenticated user (post owner)
+    inbox_owner_lookup = 'post_id__user_id'
 
 
-class RepostRequestsSentList(APIView):
+class RepostRequestsSentList(RepostRequestInboxMixin, ListAPIView):
     '''***This API returns requests sent by the user***<p>
     <b>Requirements</b>:
     - The user must be authenticated.
@@ -118,18 +147,14 @@ class RepostRequestsSentList(APIView):
     ------------------------------------------------------------<p>
     <b>2. PARAMETERS</b>:<p>
     <b>2.1.</b> In order to get a list of repost requests you've done, click on <b><i>Try it out</i></b> button.<p>
-    <b>2.2.</b>  Then press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
-    ---> If successful, the API will return a 200 message along with the list of posts which you asked for a repost. <p>
+    <b>2.2.</b> Optionally filter by <b><i>status</i></b> (<b>requested</b>, <b>approved</b> or <b>denied</b>) and set <b><i>page_size</i></b> (max 100).<p>
+    <b>2.3.</b>  Then press the <b><i>Execute</i></b> button in order to send a <b>GET</b> request to the API endpoint.<p>
+    ---> If successful, the API will return a 200 message along with a page of requests (<i>results</i>) and the <i>next</i> / <i>previous</i> page links. <p>
     ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
     '''
 
-    def get(self, request):
-        user = self.request.user
-        # Filter repost requests for requests owned by the user
-        queryset = RepostRequest.objects.filter(requester_id=user.id)
-        # Serialize the queryset
-        serializer = RepostRequestListSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    # repost requests sent by the user
+    inbox_owner_lookup = 'requester_id'
 
 
 class UpdateRepostRequestStatus(APIView):
@@ -176,8 +201,17 @@ class UpdateRepostRequestStatus(APIView):
             # Update the status if it's a valid choice ("approved" or "denied")
             new_status = serializer.validated_data['status'].lower()
             if new_status in ['approved', 'denied']:
+                old_status = repost_request.status
                 repost_request.status = new_status
                 repost_request.save()
+                invalidate_user_feeds([repost_request.requester_id_id])
+                if new_status == 'approved' and old_status != 'approved':
+                    enqueue('fan_out_reposts', {
+                        'post': repost_request.post_id_id, 'reposter': repost_request.requester_id_id,
+                        'at': timezone.now().isoformat(),
+                    })
+                elif old_status == 'approved' and new_status != 'approved':
+                    remove_repost(repost_request.post_id_id, repost_request.requester_id_id)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             else:
                 return Response({"detail": "Invalid status choice"}, status=status.HTTP_400_BAD_REQUEST)
@@ -185,6 +219,82 @@ class UpdateRepostRequestStatus(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkUpdateRepostRequestStatus(APIView):
+    '''***Post author can approve or deny many pending repost requests at once***<p>
+    <b>Requirements</b>:
+    - The user must be authenticated.
+    - The user will need to use their token.
+    - Only requests for posts of the user which are still <b>requested</b> are changed.<p>
+
+    ***HOW TO USE:***<p>
+    <ul><b>1. AUTHENTICATION</b><p>
+    <ul><b>1.1.</b>  Before making a request to this endpoint, ensure that you are authenticated, using your token. <p>
+    ---> For this check <i><u>user/registration/</u></i> and <i><u>user/login/</u></i>.<p>    
+    <b>1.2.</b> Apply the token, it should belong to the authenticated owner of the posts.<p>
+    !!! For this follow the steps:<p>
+    ---> click on the image of a <b>lock</b> in the right corner of your highlighted box, <p> 
+    ---> choose <b><i>tokenAuth</i></b>,<p> 
+    ---> insert <b>Token</b> <b><i>YOUR_TOKEN_KEY</i></b> and <b>Authorize</b>.<p>
+    ------------------------------------------------------------<p>
+    <b>2. BODY</b>:<p>
+    <b>2.1.</b> In order to change the status of many requests, click on <b><i>Try it out</i></b> button.<p>
+    <b>2.2.</b> In the request body (application/json), provide either a list of request ids:<p>
+        <b><i>{"status": "approved", "request_ids": [1, 2, 3]}</i></b><p>
+    or a post id, to change all the pending requests of that post:<p>
+        <b><i>{"status": "denied", "post_id": 7}</i></b><p>
+    <b>2.3.</b>  Press the <b><i>Execute</i></b> button in order to send a <b>PUT</b> request to the API endpoint.<p>
+    ---> If successful, the API will return a 200 message along with the result for every request id
+    (<b>updated</b>, <b>not_pending</b> or <b>not_found</b>). <p>
+    ---> If there are any errors, appropriate error messages will be returned.</ul></ul>
+    '''
+    serializer_class = BulkUpdateRepostRequestSerializer
+
+    def put(self, request):
+        serializer = BulkUpdateRepostRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        new_status = serializer.validated_data['status']
+        request_ids = serializer.validated_data.get('request_ids')
+
+        # Only requests for posts owned by the authenticated user can be changed
+        queryset = RepostRequest.objects.filter(post_id__user_id=request.user.id)
+        if request_ids is not None:
+            queryset = queryset.filter(id__in=request_ids)
+        else:
+            queryset = queryset.filter(post_id=serializer.validated_data['post_id'], status='requested')
+
+        with transaction.atomic():
+            # lock the selected rows so the results below match what the UPDATE changes
+            rows = list(
+                queryset.select_for_update(of=('self',)).order_by().values_list('id', 'requester_id', 'status', 'post_id')
+            )
+            pending = {request_id: (requester_id, post_id) for request_id, requester_id, request_status, post_id in rows
+                       if request_status == 'requested'}
+            updated = RepostRequest.objects.filter(id__in=pending, status='requested').update(status=new_status)
+            if new_status == 'approved':
+                reposters = {requester_id for requester_id, _ in pending.values()}
+                transaction.on_commit(lambda: invalidate_user_feeds(reposters))
+                approved_at = timezone.now().isoformat()
+                enqueue_many('fan_out_reposts', [
+                    {'post': post_id, 'reposter': requester_id, 'at': approved_at}
+                    for requester_id, post_id in pending.values()
+                ])
+
+        found = {request_id: request_status for request_id, _, request_status, _ in rows}
+        results = []
+        for request_id in (request_ids if request_ids is not None else sorted(found)):
+            if request_id in pending:
+                result = 'updated'
+            elif request_id in found:
+                result = 'not_pending'
+            else:
+                result = 'not_found'
+            results.append({'id': request_id, 'result': result})
+
+        return Response({'status': new_status, 'updated': updated, 'results': results}, status=status.HTTP_200_OK)
+
+
 class DeleteRepostRequestView(APIView):
     '''***This API requester can delete a request by its id***<p>
     <b>Requirements</b>:
@@ -222,6 +332,9 @@ class DeleteRepostRequestView(APIView):
         if isinstance(repost_request, RepostRequest):
             # Delete the repost request
             repost_request.delete()
+            invalidate_user_feeds([repost_request.requester_id_id])
+            if repost_request.status == 'approved':
+                remove_repost(repost_request.post_id_id, repost_request.requester_id_id)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         return Response({"detail": "Invalid repost request"}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
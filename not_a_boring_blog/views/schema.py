@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework import status
+from rest_framework.response import Response
+from ..schema import load_schema
+
+
+def strip_weak(tag):
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+class SchemaView(SpectacularAPIView):
+    """OpenApi3 schema for this API, built by "manage.py build_schema". Format can be selected via content negotiation.
+
+    - YAML: application/vnd.oai.openapi
+    - JSON: application/vnd.oai.openapi+json
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        artifact = load_schema(renderer.format)
+        if artifact is None:
+            if settings.DEBUG:
+                return super().get(request, *args, **kwargs)
+            return Response(
+                {"detail": "The API schema has not been built or cannot be read, run manage.py build_schema."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        content, etag = artifact
+        # weak comparison: the compression middleware turns the ETag into a weak one
+        if etag in {strip_weak(tag) for tag in parse_etags(request.headers.get('If-None-Match', ''))}:
+            response = HttpResponseNotModified()
+        else:
+            content_type = f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type
+            response = HttpResponse(content, content_type=content_type)
+            response.headers['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+            # the same bytes for everyone until the next deploy, compressed once per encoding
+            response.cache_compressed = True
+        response.headers['ETag'] = etag
+        # cached, but checked again on every use: a deploy can change the schema at any time
+        patch_cache_control(response, no_cache=True)
+        return response
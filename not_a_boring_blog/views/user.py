@@ -24,6 +24,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth import update_session_auth_hash
 from django.db.models import Q
 from not_a_boring_blog.permissions import IsAdminRole
+from not_a_boring_blog.serializers.fast import fast_data
 
 
 class UserList(APIView):
@@ -50,9 +51,9 @@ class UserList(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        users = User.objects.all()
-        serializer = UserListSerializer(users, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = UserListSerializer.requested_fields(request)
+        users = UserListSerializer.setup_eager_loading(User.objects.all(), fields)
+        return Response(fast_data(UserListSerializer, users, fields), status=status.HTTP_200_OK)
 
 
 class UpdateUserRole(APIView):
@@ -1,4 +1,3 @@
-from ..models.user import User
 from ..models.post import Post
 from ..models.views import View
 from django.shortcuts import get_object_or_404
@@ -7,22 +6,28 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 from datetime import datetime, timedelta, timezone
 from not_a_boring_blog.serializers.view import ViewCountSerializer
+from ..tasks import enqueue
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_post_view(request, post_id):
-    """Creates an entry in view table when the user goes to post detail"""
+    """Records a view of the post when the user goes to post detail.
+
+    The view is written by the record_views background task, the request only stores the task and
+    answers 202. The cooldown is checked against the views already written: a repeat request before
+    the worker ran is accepted too, the task drops it then (no second view within min_read minutes).
+    """
     user = request.user
-    post = get_object_or_404(Post, pk=post_id)
-    cooldown_period = timedelta(minutes=int(post.min_read))
-    if post.user_id == user:
+    post = get_object_or_404(Post.objects.only('user_id', 'min_read'), pk=post_id)
+    cooldown_period = timedelta(minutes=post.min_read)
+    if post.user_id_id == user.id:
         return Response({"message": "Author's own view is not counted"}, status=403)
-    last_view = View.objects.filter(post_id=post.id, user_id=user.id).order_by('-timestamp').first()
-    if not last_view or (datetime.now(timezone.utc) - last_view.timestamp) > cooldown_period:
-        user = get_object_or_404(User, id=user.id)
-        View.objects.create(post_id=post, user_id=user)
-        return Response({"message": "View recorded successfully"}, status = status.HTTP_200_OK)
+    last_viewed = View.objects.filter(post_id=post.id, user_id=user.id).order_by('-timestamp').values_list('timestamp', flat=True).first()
+    now = datetime.now(timezone.utc)
+    if not last_viewed or (now - last_viewed) > cooldown_period:
+        enqueue('record_views', {'post': post.id, 'user': user.id, 'at': now.isoformat()})
+        return Response({"message": "View queued, it is counted once the background tasks run"}, status=status.HTTP_202_ACCEPTED)
     return Response({"error": "Cooldown period not elapsed"}, status=429)
 
 
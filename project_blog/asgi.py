@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_blog.settings')
+# Under ASGI every request runs its queries in a different thread, a persistent connection per
+# thread would pile up; DB_POOL=true reuses connections instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
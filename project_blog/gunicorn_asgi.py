@@ -0,0 +1,24 @@
+"""Gunicorn settings for serving project_blog.asgi with uvicorn workers.
+
+==> gunicorn -c project_blog/gunicorn_asgi.py project_blog.asgi:application
+
+Each worker is one process with one event loop: slow clients wait on the loop, not on a thread,
+so a few workers (about one per core) serve many concurrent connections. The async endpoints
+(not_a_boring_blog/views/asynchronous.py) stay on the loop; the DRF views still run in a thread
+each. Every setting can be overridden with the usual GUNICORN_CMD_ARGS or command-line flags.
+"""
+import multiprocessing
+import os
+
+# not PORT, that one is the database port (see README)
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# seconds without a heartbeat before a worker is restarted, and to finish requests on reload/stop
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# restart workers now and then, a leak in a long-lived process stays bounded
+max_requests = 10000
+max_requests_jitter = 1000
+accesslog = '-'
@@ -12,18 +12,24 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
-import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def env_bool(name, default=False):
+    """Reads a boolean from the environment, "1", "true", "yes" and "on" are true (any case)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get("SECRET_KEY")
-print(SECRET_KEY)
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get("DEBUG", False)
 
@@ -47,8 +53,13 @@ else:
 
 # Application definition
 
+# The Django admin on admin/. Processes that only serve the API can leave it out, they boot faster
+ADMIN_ENABLED = env_bool("ADMIN_ENABLED", True)
+# The OpenAPI schema, swagger-ui and redoc (drf-spectacular), left out the same way
+API_DOCS_ENABLED = env_bool("API_DOCS_ENABLED", True)
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    *(['django.contrib.admin'] if ADMIN_ENABLED else []),
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -58,12 +69,14 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
-    'drf_spectacular',
-    'drf_spectacular_sidecar',
+    *(['drf_spectacular', 'drf_spectacular_sidecar'] if API_DOCS_ENABLED else []),
 ]
 
 REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # DRF's own AutoSchema without the docs, resolving drf_spectacular's would import it on every view
+    'DEFAULT_SCHEMA_CLASS': (
+        'drf_spectacular.openapi.AutoSchema' if API_DOCS_ENABLED else 'rest_framework.schemas.openapi.AutoSchema'
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
@@ -72,15 +85,34 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES':[
         'rest_framework.permissions.IsAuthenticated', #  only Authenticated users are allowed
     ],
+    # orjson when it is installed, the same JSON as DRF's JSONRenderer/JSONParser
+    'DEFAULT_RENDERER_CLASSES': [
+        'not_a_boring_blog.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'not_a_boring_blog.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 MIDDLEWARE = [
+    # first, so the whole middleware chain is measured; drops itself when PROFILING_SAMPLE_RATE is 0
+    'not_a_boring_blog.middleware.profiling.ProfilingMiddleware',
+    'not_a_boring_blog.middleware.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # answers the static files before the compression, their variants are compressed already
+    'not_a_boring_blog.middleware.static.StaticFilesMiddleware',
+    # before anything that reads or changes the response body
+    'not_a_boring_blog.middleware.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # after the session and auth middleware, their reads stay on the primary either way
+    'not_a_boring_blog.middleware.replicas.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -117,10 +149,13 @@ if DATABASE_CHOICE == "sqlite":
     DATABASES = {
         'default': {
             'ENGINE':'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / "db.sqlite3"
+            'NAME': BASE_DIR / "db.sqlite3",
+            # seconds a statement waits for a lock held by another connection before "database is locked"
+            'OPTIONS': {'timeout': int(os.environ.get("SQLITE_TIMEOUT", 20))},
         }
     }
 elif DATABASE_CHOICE == "remote_db":
+    import dj_database_url
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get("DATABASE_URL")
@@ -139,6 +174,147 @@ else:
         }
     }
 
+# SQLITE_TUNED=true (default) sets WAL, synchronous=NORMAL, a busy timeout and a bigger page cache/mmap
+# on every SQLite connection, see not_a_boring_blog/db/sqlite.py; false keeps SQLite's defaults.
+SQLITE_TUNED = env_bool("SQLITE_TUNED", True)
+SQLITE_PRAGMAS = {
+    # stored in the database file, the other pragmas last as long as the connection
+    'journal_mode': 'WAL',
+    # fsync at checkpoints only: a power loss can drop the last commits, it cannot corrupt the file
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get("SQLITE_TIMEOUT", 20)) * 1000,  # ms
+    'mmap_size': 128 * 1024 * 1024,  # bytes
+    'cache_size': -20000,  # negative: KiB, about 20 MB of page cache per connection
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNED else {}
+
+# Read replicas, comma separated database URLs (parsed like DATABASE_URL). Safe requests read from them,
+# see not_a_boring_blog/db/routers.py; with none the primary serves everything.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# In tests the replicas are the primary (TEST MIRROR); false gives them their own test databases
+DATABASE_REPLICA_TEST_MIRROR = env_bool("DATABASE_REPLICA_TEST_MIRROR", True)
+DATABASE_REPLICAS = []
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+for number, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dj_database_url.parse(url)
+    if DATABASE_REPLICA_TEST_MIRROR:
+        DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['not_a_boring_blog.db.routers.ReplicaRouter']
+# Seconds a client keeps reading from the primary after a write, longer than the replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
+
+# Connections are kept open DB_CONN_MAX_AGE seconds between requests (0: closed after every request)
+# and checked before a request reuses them, a dropped connection is replaced instead of failing the request.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 60))
+DB_CONN_HEALTH_CHECKS = env_bool("DB_CONN_HEALTH_CHECKS", True)
+# DB_POOL=true takes the PostgreSQL connections from an in-process pool (threaded or async workers),
+# a connection goes back to the pool at the end of each request.
+DB_POOL = env_bool("DB_POOL")
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 10))
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    database['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+    if DB_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        database['ENGINE'] = 'not_a_boring_blog.db.backends.postgresql_pool'
+        database['OPTIONS'] = {'pool_max_size': DB_POOL_MAX_SIZE, **database.get('OPTIONS', {})}
+        database['CONN_MAX_AGE'] = 0
+
+
+# Read-only list endpoints render their serializers from a field plan compiled once per serializer
+# class (not_a_boring_blog/serializers/fast.py), same output as the serializers; false renders with DRF.
+FAST_SERIALIZERS = env_bool("FAST_SERIALIZERS", True)
+
+
+# Caching
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_URL puts the cache on a server shared by all the worker processes: redis://host:6379/0 (needs redis-py),
+# memcached://host:11211 (needs pymemcache) or file:///path/to/directory (the processes of one host). Unset: the
+# default per-process LocMemCache, which the other workers do not see, so an invalidation only reaches the
+# process that made it. Required with DATABASE_REPLICA_URLS.
+CACHE_URL = os.environ.get("CACHE_URL")
+if CACHE_URL:
+    if CACHE_URL.startswith("file://"):
+        CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len("file://"):],
+        }}
+    elif CACHE_URL.startswith("memcached://"):
+        CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_URL[len("memcached://"):],
+        }}
+    else:
+        CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+
+# Seconds a user's public feed (post/user_posts/<username>/) stays cached, 0 disables the cache.
+# Off by default without CACHE_URL: the workers that did not handle an edit would serve the old feed.
+FEED_CACHE_TIMEOUT = int(os.environ.get("FEED_CACHE_TIMEOUT", 60 if CACHE_URL else 0))
+
+
+# Compression
+# Response encodings, in order of preference when the client accepts several equally (br needs brotli,
+# zstd needs zstandard, the ones not installed are skipped); empty disables compression.
+COMPRESSION_ENCODINGS = [name.strip() for name in os.environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()]
+# Bodies smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+# Seconds the compressed body of a cached feed is kept, 0 compresses it on every request
+COMPRESSION_CACHE_TIMEOUT = int(os.environ.get("COMPRESSION_CACHE_TIMEOUT", 300))
+
+
+# Profiling
+# Fraction of the requests measured by ProfilingMiddleware (Server-Timing header + on-disk log), 0 disables it
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+# Sampled requests run under cProfile when set, the dumps of the ones slower than this are kept
+PROFILING_CPROFILE_THRESHOLD_MS = (
+    float(os.environ["PROFILING_CPROFILE_THRESHOLD_MS"]) if os.environ.get("PROFILING_CPROFILE_THRESHOLD_MS") else None
+)
+PROFILING_DIR = os.environ.get("PROFILING_DIR", BASE_DIR / "profiles")
+PROFILING_SLOW_QUERIES = 5
+PROFILING_LOG_MAX_BYTES = 10 * 1024 * 1024
+PROFILING_LOG_BACKUP_COUNT = 5
+PROFILING_MAX_PROFILES = 200
+
+
+# Metrics
+# Request, database and cache metrics served on /metrics in the Prometheus text format
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+# Addresses or networks (10.0.0.0/8) allowed to read /metrics, the address of the connection (REMOTE_ADDR) is
+# checked, not X-Forwarded-For; loopback only by default
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+# With several worker processes (gunicorn) each one writes its metrics here and /metrics adds them up,
+# empty the directory before the server starts. Unset: the metrics of the serving process only.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Seconds between two snapshots of a worker
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
+
+# Background tasks
+# Deferred work (the post views) is stored in the database and run by "manage.py run_tasks", see not_a_boring_blog/tasks.py
+# Times a task is tried before it is left 'failed'
+TASK_MAX_ATTEMPTS = int(os.environ.get("TASK_MAX_ATTEMPTS", 5))
+# Seconds before the first retry of a failed batch, doubled on every attempt
+TASK_RETRY_DELAY = float(os.environ.get("TASK_RETRY_DELAY", 10))
+# Seconds after which a task still running is considered lost with its worker and run again
+TASK_LOCK_TIMEOUT = int(os.environ.get("TASK_LOCK_TIMEOUT", 300))
+# Seconds an idle worker waits before looking for tasks again
+TASK_POLL_INTERVAL = float(os.environ.get("TASK_POLL_INTERVAL", 1))
+
+
+# Timelines
+# Authors followed by more users than this are not fanned out on publish, their posts are read along with the timelines
+TIMELINE_FANOUT_MAX_FOLLOWERS = int(os.environ.get("TIMELINE_FANOUT_MAX_FOLLOWERS", 10000))
+# Recent posts of an author copied into the timeline of a new follower
+TIMELINE_BACKFILL_POSTS = int(os.environ.get("TIMELINE_BACKFILL_POSTS", 20))
+
+
+# API schema
+# Directory of the OpenAPI schema written by "manage.py build_schema" and served by /api/schema/; until it is
+# built the schema is generated on each request with DEBUG and is a 503 without
+SCHEMA_DIR = os.environ.get("SCHEMA_DIR", BASE_DIR / "schema")
 
 
 # Password validation
@@ -183,12 +359,13 @@ MEDIA_ROOT = "collections/media"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-USE_S3_SETUP = os.environ.get("USE_S3_SETUP", True)
+# Static and uploaded files on S3 (django-storages, boto3); off, they are served from STATIC_ROOT and MEDIA_ROOT
+USE_S3_SETUP = env_bool("USE_S3_SETUP")
 if USE_S3_SETUP:
     AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID") # env
     AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")  # env
     AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME")  # env
-    DEFAULT_FILE_STORAGE = "storages.backend.s3boto3.S3BotoStorage"
+    DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
     AWS_S3_FILE_OVERWRITE = False
     AWS_S3_REGION_NAME = os.environ.get("AWS_S3_REGION_NAME")  # env
     AWS_S3_VERIFY = True
@@ -203,4 +380,11 @@ if USE_S3_SETUP:
 
 else:
     STATIC_URL = 'static/'
-    STATIC_ROOT = "collections/static_collection"
\ No newline at end of file
+    STATIC_ROOT = "collections/static_collection"
+    # collectstatic adds hashed names (staticfiles.json) and .br/.gz variants, see not_a_boring_blog/staticfiles.py
+    STATICFILES_STORAGE = 'not_a_boring_blog.staticfiles.CompressedManifestStaticFilesStorage'
+
+# Without S3, StaticFilesMiddleware serves STATIC_ROOT (run collectstatic first); false leaves it to a web server
+STATIC_SERVE = env_bool("STATIC_SERVE", True)
+# Seconds browsers cache the static files without a hash in their name, the hashed ones are cached for a year
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", 60))
\ No newline at end of file
@@ -14,16 +14,28 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from django.conf import settings
+from not_a_boring_blog.views.metrics import metrics
 
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    # drf_spectacular
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-    path('', include("not_a_boring_blog.urls", namespace="not_a_boring_blog")),
-]
+urlpatterns = []
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.API_DOCS_ENABLED:
+    # drf_spectacular, the schema is the one built by manage.py build_schema
+    from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+    from not_a_boring_blog.views.schema import SchemaView
+    urlpatterns += [
+        path('api/schema/', SchemaView.as_view(), name='schema'),
+        path('swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+        path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    ]
+
+urlpatterns.append(path('', include("not_a_boring_blog.urls", namespace="not_a_boring_blog")))
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics, name='metrics'))